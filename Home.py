@@ -10,6 +10,8 @@ import streamlit as st
 import base64
 from pathlib import Path
 
+from st_adapter import begin_rerun, performance_panel
+
 # Configurația paginii
 st.set_page_config(
     layout="wide",
@@ -18,6 +20,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Urmele instrumentării (F1_TRACE=1) pornesc de la zero la fiecare rerun
+begin_rerun()
+
 # Ascundem elementele implicite Streamlit
 hide_streamlit_style = """
     <style>
@@ -192,3 +197,6 @@ with img_col2:
         st.image(str(telemetry_path), caption="Predictive engine activ pe circuit", use_container_width=True)
     else:
         st.info("Adaugă imaginea predictive engine în `assets/imagine3.png`.")
+
+# Panoul de performanță (doar cu F1_TRACE=1)
+performance_panel()
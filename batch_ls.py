@@ -0,0 +1,193 @@
+"""
+Modul CMMP pe loturi
+====================
+Rezolvă simultan mai multe probleme de cele mai mici pătrate (de ex. câte
+una pentru fiecare pilot dintr-o sesiune) cu reflectori Householder
+vectorizați pe axa lotului.
+"""
+
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+from instrumentation import traced
+
+
+def stack_problems(
+    problems: Sequence[Tuple[np.ndarray, np.ndarray]]
+) -> Tuple[np.ndarray, np.ndarray, List[int], List[int]]:
+    """
+    Împachetează probleme (A_i, b_i) de dimensiuni diferite în tablouri 3D.
+    Coloanele lipsă sunt completate cu vectori unitate pe rânduri noi, astfel
+    încât coeficienții de umplutură să iasă 0, iar reziduul să nu se schimbe.
+    La fel se tratează coloanele complet nule (de ex. un compound pe care
+    pilotul nu l-a folosit): coeficientul lor iese 0 în loc de R singulară.
+    """
+    if len(problems) == 0:
+        raise ValueError("Lista de probleme este goală.")
+
+    ms = [A.shape[0] for A, _ in problems]
+    ns = [A.shape[1] for A, _ in problems]
+    for i, (m, n) in enumerate(zip(ms, ns)):
+        if m <= n:
+            raise ValueError(f"Problema {i}: sistemul trebuie să fie supradeterminat (m > n).")
+
+    n_max = max(ns)
+    zero_cols = [np.flatnonzero(~np.asarray(A).any(axis=0)) for A, _ in problems]
+    m_max = max(m + (n_max - n) + len(z) for m, n, z in zip(ms, ns, zero_cols))
+    P = len(problems)
+
+    A_s = np.zeros((P, m_max, n_max))
+    b_s = np.zeros((P, m_max))
+
+    for i, (A, b) in enumerate(problems):
+        m, n = A.shape
+        A_s[i, :m, :n] = A
+        b_s[i, :m] = b
+        # coloane de umplutură și coloane nule: câte un 1 pe un rând altfel gol
+        pad = np.concatenate([zero_cols[i], np.arange(n, n_max)])
+        A_s[i, m + np.arange(len(pad)), pad] = 1.0
+
+    return A_s, b_s, ms, ns
+
+
+def tort_householder_batched(A: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    TORT pe un lot de matrice A ∈ R^{P x m x n} și aplicarea simultană a
+    reflectorilor pe b ∈ R^{P x m}.
+    Returnează R (P x m x n) și d = Q^T b (P x m), cu aceeași convenție de
+    semn ca tort_householder.
+    """
+    A = A.astype(float).copy()
+    b = b.astype(float).copy()
+    P, m, n = A.shape
+    p = min(m - 1, n)
+
+    for k in range(p):
+        u = A[:, k:, k].copy()
+        norm_col = np.linalg.norm(u, axis=1)
+        # pentru a_kk = 0 alegem semnul + (altfel coloanele de umplutură,
+        # nule pe diagonală, ar rămâne netransformate)
+        sigma = np.where(u[:, 0] < 0, -1.0, 1.0) * norm_col
+
+        # beta = 0 înseamnă că reflectorul este identitatea
+        u[:, 0] += sigma
+        beta = sigma * u[:, 0]
+        active = beta != 0
+        inv_beta = np.zeros(P)
+        inv_beta[active] = 1.0 / beta[active]
+
+        A[active, k, k] = -sigma[active]
+        A[active, k+1:, k] = 0.0
+
+        if k + 1 < n:
+            tau = np.einsum('pi,pij->pj', u, A[:, k:, k+1:]) * inv_beta[:, None]
+            A[:, k:, k+1:] -= u[:, :, None] * tau[:, None, :]
+
+        tau_b = np.einsum('pi,pi->p', u, b[:, k:]) * inv_beta
+        b[:, k:] -= u * tau_b[:, None]
+
+    return A, b
+
+
+def back_substitution_batched(R: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """
+    Rezolvă simultan sistemele triunghiulare superioare R_p x_p = d_p.
+    """
+    P, n, _ = R.shape
+    x = np.zeros((P, n))
+
+    diag = np.diagonal(R, axis1=1, axis2=2)
+    singular = np.where((diag == 0).any(axis=1))[0]
+    if len(singular) > 0:
+        raise ValueError(f"Matrice R singulară pentru problemele {singular.tolist()}.")
+
+    for i in range(n - 1, -1, -1):
+        x[:, i] = (d[:, i] - np.einsum('pj,pj->p', R[:, i, i+1:], x[:, i+1:])) / diag[:, i]
+
+    return x
+
+
+@traced()
+def ls_batched(
+    problems: Sequence[Tuple[np.ndarray, np.ndarray]]
+) -> Tuple[List[np.ndarray], List[np.ndarray], np.ndarray]:
+    """
+    Rezolvă toate problemele min ||A_i x - b_i|| într-un singur apel.
+    Returnează listele de coeficienți și de factori R (n_i x n_i) și
+    vectorul normelor reziduale, echivalente cu ls_householder.
+    """
+    A_s, b_s, ms, ns = stack_problems(problems)
+    n_max = A_s.shape[2]
+
+    # Pas 1-2: TORT și d = Q^T b pentru tot lotul
+    R_s, d_s = tort_householder_batched(A_s, b_s)
+
+    # Pas 3: rezolvare triunghiulară pentru tot lotul
+    X_s = back_substitution_batched(R_s[:, :n_max, :n_max], d_s[:, :n_max])
+
+    residual_norms = np.linalg.norm(d_s[:, n_max:], axis=1)
+
+    X = [X_s[i, :n].copy() for i, n in enumerate(ns)]
+    R = [R_s[i, :n, :n].copy() for i, n in enumerate(ns)]
+
+    return X, R, residual_norms
+
+
+def _dependent_columns(A: np.ndarray) -> np.ndarray:
+    """Masca coloanelor aflate (numeric) în spațiul coloanelor dinaintea lor."""
+    diag = np.abs(np.diagonal(np.linalg.qr(A, mode="r")))
+    tol = max(A.shape) * np.finfo(float).eps * (diag.max() if len(diag) else 0.0)
+    return diag <= tol
+
+
+def fit_drivers_batched(
+    session,
+    driver_codes: Sequence[str],
+    selected_features: List[str],
+    weather_method: str = "asof"
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, float, List[str]]]:
+    """
+    Construiește matricea de feature-uri pentru fiecare pilot și rezolvă
+    toate modelele deodată. Dacă feature-urile cer date meteo, tururile se
+    aliniază cu vremea (weather_method, vezi weather.align_weather).
+    Coloanele dependente ale unui pilot (de ex. compound-uri nefolosite) au
+    coeficientul 0, ca toate modelele să păstreze aceleași coloane.
+    Returnează {pilot: (x, R, normă reziduală, nume feature-uri)}.
+    """
+    from data_loader import get_laps_data, required_datasets
+    from features import build_feature_matrix
+
+    if "weather" not in required_datasets(selected_features):
+        weather_method = None
+
+    codes = []
+    problems = []
+    names_per_driver = []
+
+    for code in driver_codes:
+        laps = get_laps_data(session, code, weather_method)
+        if laps is None:
+            continue
+        A, b, names = build_feature_matrix(laps, None, selected_features)
+        if A is None or A.shape[0] <= A.shape[1]:
+            continue
+        # coloanele din spațiul celor dinaintea lor (de ex. compound-uri nefolosite
+        # sau un singur compound, coliniar cu interceptul) primesc coeficientul 0
+        dependent = _dependent_columns(A)
+        if dependent.any():
+            A = A.copy()
+            A[:, dependent] = 0.0
+        codes.append(code)
+        problems.append((A, b))
+        names_per_driver.append(names)
+
+    if len(problems) == 0:
+        return {}
+
+    X, R, residual_norms = ls_batched(problems)
+
+    results = {
+        code: (X[i], R[i], float(residual_norms[i]), names_per_driver[i])
+        for i, code in enumerate(codes)
+    }
+    return results
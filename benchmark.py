@@ -0,0 +1,320 @@
+"""
+Benchmark solveri QR
+====================
+Rulează: py benchmark.py [--full] [--output rezultate.jsonl] [--compare vechi.jsonl]
+
+Măsoară timpul, memoria maximă și acuratețea (norma reziduală, pierderea de
+ortogonalitate) pentru solverii QR și pentru pipeline-ul de feature-uri, pe
+date sintetice (fără rețea), cu numpy.linalg.qr / lstsq ca referință.
+Rezultatele se scriu ca JSON lines, comparabile între commit-uri.
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from gram_schmidt import back_substitution, ls_gram_schmidt, qr_gram_schmidt
+
+
+# Dimensiunile implicite (rapide) și cele complete (de la un stint la mai multe sezoane)
+QUICK_SHAPES = [(50, 2), (50, 5), (500, 5), (5000, 5), (5000, 20), (50000, 5)]
+FULL_SHAPES = QUICK_SHAPES + [
+    (50000, 50), (200000, 5), (200000, 20), (1000000, 5), (1000000, 20), (20000, 300)
+]
+
+# Peste acest număr de elemente (m * n^2) solverii cu bucle Python se sar
+SLOW_SOLVER_LIMIT = 5e9
+
+
+def _load_householder():
+    """Modulul Householder (numele fișierului conține spații)."""
+    path = Path(__file__).resolve().parent / "householder (1).py"
+    spec = importlib.util.spec_from_file_location("householder", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_synthetic_laps(n_laps: int, n_drivers: int = 20, seed: int = 0) -> pd.DataFrame:
+    """
+    Generează tururi cu coloanele FastF1 folosite de pipeline: Driver,
+    LapNumber, Stint, TyreLife, LapTime (timedelta), LapStartTime, Time,
+    IsAccurate, plus TrackTemp, AirTemp, WindSpeed deja aliniate.
+    """
+    rng = np.random.default_rng(seed)
+    laps_per_driver = int(np.ceil(n_laps / n_drivers))
+
+    lap_number = np.tile(np.arange(1, laps_per_driver + 1), n_drivers)[:n_laps].astype(float)
+    driver = np.repeat([f"D{i:02d}" for i in range(n_drivers)], laps_per_driver)[:n_laps]
+    stint = np.minimum((lap_number - 1) // 20 + 1, 4)
+    tyre_life = (lap_number - 1) % 20 + 1
+
+    race_minutes = lap_number * 1.5
+    track_temp = 35 + 5 * np.sin(race_minutes / 40) + rng.normal(0, 0.3, n_laps)
+    air_temp = 24 + 0.4 * (track_temp - 35) + rng.normal(0, 0.2, n_laps)
+    wind_speed = np.abs(2 + rng.normal(0, 0.8, n_laps))
+
+    lap_time = (90 + 0.05 * tyre_life - 0.03 * lap_number + 0.08 * (track_temp - 35)
+                + 0.1 * wind_speed + rng.normal(0, 0.3, n_laps))
+    lap_start = (lap_number - 1) * 90.0
+
+    return pd.DataFrame({
+        'Driver': driver,
+        'LapNumber': lap_number,
+        'Stint': stint,
+        'TyreLife': tyre_life,
+        'LapTime': pd.to_timedelta(lap_time, unit='s'),
+        'LapStartTime': pd.to_timedelta(lap_start, unit='s'),
+        'Time': pd.to_timedelta(lap_start + lap_time, unit='s'),
+        'IsAccurate': rng.random(n_laps) > 0.05,
+        'TrackTemp': track_temp,
+        'AirTemp': air_temp,
+        'WindSpeed': wind_speed,
+    })
+
+
+def make_problem(m: int, n: int, seed: int = 0):
+    """Problemă CMMP sintetică: intercept + n-1 coloane de tip feature."""
+    rng = np.random.default_rng(seed)
+    A = np.column_stack([np.ones(m), rng.normal(size=(m, n - 1))]) if n > 1 else np.ones((m, 1))
+    x_true = rng.normal(size=n)
+    b = A @ x_true + rng.normal(0, 0.1, m)
+    return A, b
+
+
+def measure(fn: Callable, repeats: int = 3) -> Dict:
+    """
+    Cel mai bun timp din `repeats` rulări și memoria maximă (tracemalloc)
+    a unei rulări separate. Returnează și rezultatul funcției.
+    """
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"time_s": min(times), "peak_mem_bytes": peak, "result": result}
+
+
+def _orthogonality_loss(Q: np.ndarray) -> float:
+    n = Q.shape[1]
+    return float(np.linalg.norm(Q.T @ Q - np.eye(n)))
+
+
+class SolverCase(NamedTuple):
+    """
+    Un caz de benchmark: setup(A, b) pregătește argumentele (netemporizat),
+    solve(*args) e singurul apel temporizat, iar check(A, b, args, rezultat)
+    calculează, o dată, (x sau None, metrici de acuratețe).
+    """
+    setup: Callable
+    solve: Callable
+    check: Callable
+
+
+def _no_setup(A, b):
+    return A, b
+
+
+def _factorization_error(apply_qt):
+    """Eroarea ||Q^T A - R|| / ||A|| a factorizării (R, U, beta), fără a forma Q."""
+    def check(A, b, args, result):
+        R, U, beta = result
+        QtA = apply_qt(A, U, beta, A.shape[1])
+        return None, {"factorization_error": float(np.linalg.norm(QtA - R) / np.linalg.norm(A))}
+    return check
+
+
+def _coefficients(A, b, args, result):
+    return result[0], {}
+
+
+def _orthogonality(A, b, args, result):
+    Q, R = result
+    return None, {"orthogonality_loss": _orthogonality_loss(Q)}
+
+
+def _fixed_triangular(A, b):
+    """R triunghiular fix (bine condiționat) și membrul drept, pentru back_substitution."""
+    n = A.shape[1]
+    R = np.triu(np.random.default_rng(0).normal(size=(n, n))) + n * np.eye(n)
+    return R, b[:n].copy()
+
+
+def _triangular_residual(A, b, args, result):
+    R, d = args
+    return None, {"triangular_residual": float(np.linalg.norm(R @ result - d))}
+
+
+def _np_lstsq(A, b):
+    return np.linalg.lstsq(A, b, rcond=None)
+
+
+def solver_cases(hh) -> Dict[str, SolverCase]:
+    """Cazurile de benchmark; doar factorizarea / rezolvarea e temporizată."""
+    return {
+        "qr_gram_schmidt": SolverCase(lambda A, b: (A,), qr_gram_schmidt, _orthogonality),
+        "ls_gram_schmidt": SolverCase(_no_setup, ls_gram_schmidt, _coefficients),
+        "tort_householder": SolverCase(
+            lambda A, b: (A,), hh.tort_householder, _factorization_error(hh.apply_householders_to_b)),
+        "tort_householder_blocked": SolverCase(
+            lambda A, b: (A,), hh.tort_householder_blocked, _factorization_error(hh.apply_householders_wy)),
+        "ls_householder": SolverCase(_no_setup, hh.ls_householder, _coefficients),
+        "ls_householder_blocked": SolverCase(
+            _no_setup, lambda A, b: hh.ls_householder(A, b, block_size=32), _coefficients),
+        "back_substitution": SolverCase(_fixed_triangular, back_substitution, _triangular_residual),
+        "numpy.linalg.qr": SolverCase(lambda A, b: (A,), np.linalg.qr, _orthogonality),
+        "numpy.linalg.lstsq": SolverCase(_no_setup, _np_lstsq, _coefficients),
+    }
+
+
+# Cazurile implementate în Python pur (fără LAPACK), limitate de SLOW_SOLVER_LIMIT
+_PYTHON_LOOP_CASES = {
+    "qr_gram_schmidt", "ls_gram_schmidt", "tort_householder", "tort_householder_blocked",
+    "ls_householder", "ls_householder_blocked",
+}
+
+
+def run_solver_benchmarks(shapes, repeats: int) -> List[Dict]:
+    hh = _load_householder()
+    cases = solver_cases(hh)
+    records = []
+
+    for m, n in shapes:
+        if m <= n:
+            continue
+        A, b = make_problem(m, n)
+        x_ref = np.linalg.lstsq(A, b, rcond=None)[0]
+        ref_residual = float(np.linalg.norm(A @ x_ref - b))
+
+        for name, case in cases.items():
+            if name in _PYTHON_LOOP_CASES and m * n * n > SLOW_SOLVER_LIMIT:
+                continue
+            args = case.setup(A, b)
+            stats = measure(lambda: case.solve(*args), repeats)
+            x, accuracy = case.check(A, b, args, stats.pop("result"))
+            if x is not None:
+                residual = float(np.linalg.norm(A @ x - b))
+                accuracy["residual_norm"] = residual
+                accuracy["residual_rel_diff"] = abs(residual - ref_residual) / max(ref_residual, 1e-300)
+                accuracy["coef_rel_error"] = float(np.linalg.norm(x - x_ref) / np.linalg.norm(x_ref))
+            records.append({"kind": "solver", "name": name, "m": m, "n": n, **stats, **accuracy})
+            print(f"{name:28s} m={m:<8d} n={n:<4d} {stats['time_s'] * 1e3:10.2f} ms "
+                  f"{stats['peak_mem_bytes'] / 2**20:8.1f} MiB")
+
+    return records
+
+
+def run_pipeline_benchmarks(sizes, repeats: int) -> List[Dict]:
+    """build_feature_matrix (și alinierea vremii) pe tabele sintetice."""
+    from features import ALLOWED_FEATURES, build_feature_matrix
+    from weather import align_weather
+
+    records = []
+    for m in sizes:
+        laps = make_synthetic_laps(m)
+        weather = pd.DataFrame({
+            'Time': pd.to_timedelta(np.arange(0, laps['Time'].max().total_seconds() + 60, 60), unit='s'),
+        })
+        weather['TrackTemp'] = 35 + np.random.default_rng(1).normal(0, 1, len(weather))
+        weather['AirTemp'] = 24.0
+        weather['WindSpeed'] = 2.0
+
+        cases = {
+            "build_feature_matrix": lambda: build_feature_matrix(laps, None, ALLOWED_FEATURES),
+            "align_weather": lambda: align_weather(laps, weather, "mean"),
+        }
+        for name, case in cases.items():
+            stats = measure(case, repeats)
+            stats.pop("result")
+            records.append({"kind": "pipeline", "name": name, "m": m, "n": len(ALLOWED_FEATURES), **stats})
+            print(f"{name:28s} m={m:<8d} {stats['time_s'] * 1e3:10.2f} ms "
+                  f"{stats['peak_mem_bytes'] / 2**20:8.1f} MiB")
+
+    return records
+
+
+def environment_info() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).resolve().parent
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(records: List[Dict], path: str) -> None:
+    env = environment_info()
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps({**env, **record}) + "\n")
+
+
+def compare_results(old_path: str, records: List[Dict], threshold: float = 1.2) -> None:
+    """Afișează raportul timpilor față de o rulare anterioară."""
+    old = {}
+    with open(old_path) as f:
+        for line in f:
+            rec = json.loads(line)
+            old[(rec["kind"], rec["name"], rec["m"], rec["n"])] = rec
+
+    print(f"\n{'case':28s} {'m':>8s} {'n':>4s} {'old ms':>10s} {'new ms':>10s} {'ratio':>7s}")
+    for rec in records:
+        prev = old.get((rec["kind"], rec["name"], rec["m"], rec["n"]))
+        if prev is None:
+            continue
+        ratio = rec["time_s"] / prev["time_s"] if prev["time_s"] > 0 else float("inf")
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{rec['name']:28s} {rec['m']:8d} {rec['n']:4d} {prev['time_s'] * 1e3:10.2f} "
+              f"{rec['time_s'] * 1e3:10.2f} {ratio:7.2f}{flag}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the QR solvers and feature pipeline.")
+    parser.add_argument("--full", action="store_true", help="sweep up to season-scale shapes (m up to 1e6)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.jsonl")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--no-pipeline", action="store_true", help="skip the feature pipeline benchmarks")
+    args = parser.parse_args(argv)
+
+    shapes = FULL_SHAPES if args.full else QUICK_SHAPES
+    records = run_solver_benchmarks(shapes, args.repeats)
+
+    if not args.no_pipeline:
+        sizes = [1000, 100000, 1000000] if args.full else [1000, 100000]
+        records += run_pipeline_benchmarks(sizes, args.repeats)
+
+    write_results(records, args.output)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare_results(args.compare, records)
+
+
+if __name__ == "__main__":
+    main()
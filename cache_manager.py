@@ -0,0 +1,563 @@
+"""
+Manager cache
+=============
+Rulează: py cache_manager.py status | rebuild | evict [--budget 5G] | clear
+
+Ține un manifest (manifest.json în directorul de cache) cu sesiunile din
+cache: directorul FastF1 al sesiunii, tabelele din lap_store, mărimea și
+momentul ultimei folosiri. Peste bugetul de octeți (F1_CACHE_BUDGET, de ex.
+"10G"; "0" = nelimitat) se șterg sesiunile folosite cel mai demult (LRU).
+Cache-ul HTTP al FastF1 intră și el în buget și se golește dacă nici după
+evacuarea sesiunilor totalul nu scade sub buget.
+Manifestul se modifică doar sub un fișier de blocare, deci mai multe
+procese pot împărți același director.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import lap_store
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".manifest.lock"
+
+# Bugetul implicit, suprascris de F1_CACHE_BUDGET
+DEFAULT_BUDGET = 10 * 2**30
+
+# Ultima folosire se rescrie în manifest cel mult o dată pe interval (secunde)
+TOUCH_INTERVAL = 60.0
+
+# Blocarea: cât se așteaptă și după cât timp un lock e considerat abandonat
+LOCK_TIMEOUT = 30.0
+LOCK_STALE = 120.0
+
+# Cache-ul HTTP al FastF1 (requests-cache, sqlite): comun tuturor sesiunilor.
+# Intră în buget; cererile nu se pot șterge individual, deci se golește întreg
+# (ca fastf1.Cache.clear_cache(deep=True)) doar dacă evacuarea sesiunilor nu
+# ajunge. Cheia lui în lista de evacuări e HTTP_CACHE_NAME.
+HTTP_CACHE_NAME = "fastf1_http_cache.sqlite"
+_SQLITE_SUFFIXES = ("", "-journal", "-wal", "-shm")
+
+_UNITS = {"": 1, "k": 2**10, "m": 2**20, "g": 2**30, "t": 2**40}
+
+
+def parse_size(text: str) -> int:
+    """'500M', '10G', '1.5g' sau un număr de octeți."""
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([kmgt]?)i?b?\s*", str(text).lower())
+    if match is None:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def get_budget() -> Optional[int]:
+    """Bugetul în octeți (F1_CACHE_BUDGET) sau None pentru nelimitat."""
+    env_budget = os.getenv("F1_CACHE_BUDGET")
+    budget = parse_size(env_budget) if env_budget else DEFAULT_BUDGET
+    return budget or None
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += _dir_size(Path(entry.path))
+            else:
+                total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return total
+
+
+def _remove_dir(path: Path) -> None:
+    """
+    Redenumește directorul înainte de ștergere: alte procese văd sesiunea
+    fie completă, fie lipsă.
+    """
+    if not path.exists():
+        return
+    trash = path.with_name(f".{path.name}.evicted-{os.getpid()}-{time.time_ns()}")
+    os.replace(path, trash)
+    shutil.rmtree(trash, ignore_errors=True)
+    # directorul evenimentului rămas gol
+    try:
+        path.parent.rmdir()
+    except OSError:
+        pass
+
+
+class FileLock:
+    """
+    Blocare între procese printr-un fișier creat exclusiv (O_EXCL), fără
+    fcntl / msvcrt, deci portabilă. Fișierul conține un token unic al
+    deținătorului, iar un fir de fundal îi reîmprospătează mtime-ul cât timp
+    lock-ul e ținut (și în timpul unui rmtree lung). Un lock nereîmprospătat
+    de LOCK_STALE secunde (proces oprit brusc) se înlătură.
+    Crearea, eliberarea și înlăturarea lock-ului se fac doar sub un al
+    doilea lock scurt (gardă), deci verificarea tokenului și ștergerea nu se
+    pot intercala între procese.
+    """
+
+    # garda e ținută doar câteva microsecunde; mai veche de atât = proces mort
+    GUARD_STALE = 10.0
+
+    def __init__(self, path: Path, timeout: float = LOCK_TIMEOUT, stale: float = LOCK_STALE):
+        self.path = Path(path)
+        self.guard_path = self.path.with_name(self.path.name + ".guard")
+        self.timeout = timeout
+        self.stale = stale
+        self._token = None
+        self._heartbeat = None
+        self._stop = threading.Event()
+        # firele aceluiași proces se serializează înainte de fișier
+        self._thread_lock = threading.Lock()
+
+    # --- garda --------------------------------------------------------------
+
+    def _acquire_guard(self, deadline: float) -> None:
+        while True:
+            try:
+                os.close(os.open(self.guard_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                pass
+            try:
+                if time.time() - self.guard_path.stat().st_mtime > self.GUARD_STALE:
+                    os.remove(self.guard_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not acquire cache lock {self.path}")
+            time.sleep(0.005)
+
+    def _release_guard(self) -> None:
+        try:
+            os.remove(self.guard_path)
+        except FileNotFoundError:
+            pass
+
+    def _read_token(self) -> Optional[str]:
+        try:
+            return self.path.read_text()
+        except FileNotFoundError:
+            return None
+
+    # --- lock -----------------------------------------------------------------
+
+    def _try_acquire(self, token: str) -> bool:
+        """Sub gardă: ia lock-ul dacă e liber sau abandonat."""
+        try:
+            age = time.time() - self.path.stat().st_mtime
+        except FileNotFoundError:
+            age = None
+        if age is not None:
+            if age <= self.stale:
+                return False
+            logger.warning(f"Removing stale cache lock {self.path} (held by {self._read_token()})")
+            os.remove(self.path)
+
+        fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        try:
+            os.write(fd, token.encode())
+        finally:
+            os.close(fd)
+        return True
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.stale / 4):
+            try:
+                if self._read_token() == self._token:
+                    os.utime(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Could not acquire cache lock {self.path}")
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        try:
+            while True:
+                self._acquire_guard(deadline)
+                try:
+                    acquired = self._try_acquire(token)
+                finally:
+                    self._release_guard()
+                if acquired:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Could not acquire cache lock {self.path}")
+                time.sleep(0.05)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+        self._token = token
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+        self._heartbeat.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._heartbeat.join()
+        try:
+            # ștergem lock-ul doar dacă e încă al nostru
+            self._acquire_guard(time.monotonic() + self.timeout)
+            try:
+                if self._read_token() == self._token:
+                    os.remove(self.path)
+                else:
+                    logger.warning(f"Cache lock {self.path} was taken over while held")
+            finally:
+                self._release_guard()
+        finally:
+            self._token = None
+            self._thread_lock.release()
+
+
+def session_key(year: int, event_name: str, session_type: str) -> str:
+    """Cheia sesiunii în manifest (calea relativă din lap_store)."""
+    return lap_store.session_path(year, event_name, session_type).relative_to(
+        lap_store.get_store_dir()).as_posix()
+
+
+def _fastf1_session_dir(cache_dir: Path, session) -> Optional[Path]:
+    """Directorul FastF1 al sesiunii: <cache>/<api_path fără /static/>."""
+    session = getattr(session, "fastf1_session", None) or session
+    api_path = getattr(session, "api_path", None)
+    if not api_path:
+        return None
+    return cache_dir / api_path[len("/static/"):].strip("/")
+
+
+class CacheManager:
+    """
+    Manifestul unui director de cache. Manifestul se recitește doar când
+    fișierul s-a schimbat (un stat), așa că is_cached e O(1).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, budget: Optional[int] = None):
+        if cache_dir is None:
+            from data_loader import get_cache_dir
+            cache_dir = get_cache_dir()
+        self.cache_dir = Path(cache_dir)
+        # budget None = F1_CACHE_BUDGET / implicit, 0 = nelimitat
+        self.budget = get_budget() if budget is None else (budget or None)
+        self.manifest_path = self.cache_dir / MANIFEST_NAME
+        self._file_lock = FileLock(self.cache_dir / LOCK_NAME)
+        self._entries: Dict[str, dict] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    # --- manifest ---------------------------------------------------------
+
+    def _load(self) -> Dict[str, dict]:
+        with self._lock:
+            try:
+                st = self.manifest_path.stat()
+            except FileNotFoundError:
+                self._entries, self._mtime = {}, None
+                return self._entries
+            # os.replace creează un inode nou la fiecare scriere
+            mtime = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if mtime != self._mtime:
+                try:
+                    self._entries = json.loads(self.manifest_path.read_text()).get("sessions", {})
+                except (OSError, ValueError):
+                    # manifest corupt: pornim de la zero (rebuild îl reface)
+                    self._entries = {}
+                self._mtime = mtime
+            return self._entries
+
+    def _save(self, entries: Dict[str, dict]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=MANIFEST_NAME, suffix=".tmp")
+        os.close(fd)
+        try:
+            Path(tmp).write_text(json.dumps({"version": 1, "sessions": entries}, indent=1))
+            os.replace(tmp, self.manifest_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        st = self.manifest_path.stat()
+        with self._lock:
+            self._entries = entries
+            self._mtime = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.cache_dir.resolve()).as_posix()
+        except ValueError:
+            # lap_store în afara directorului de cache (F1_TABLE_STORE)
+            return str(path.resolve())
+
+    def _absolute(self, path: str) -> Path:
+        p = Path(path)
+        return p if p.is_absolute() else self.cache_dir / p
+
+    # --- interogări -------------------------------------------------------
+
+    def is_cached(self, year: int, event_name: str, session_type: str) -> bool:
+        """Sesiunea e în manifest (fără a deschide FastF1 sau tabelele)."""
+        return session_key(year, event_name, session_type) in self._load()
+
+    def entries(self) -> Dict[str, dict]:
+        return dict(self._load())
+
+    def http_cache_bytes(self) -> int:
+        """Mărimea cache-ului HTTP al FastF1 (sqlite și jurnalele lui)."""
+        total = 0
+        for suffix in _SQLITE_SUFFIXES:
+            try:
+                total += (self.cache_dir / (HTTP_CACHE_NAME + suffix)).stat().st_size
+            except OSError:
+                continue
+        return total
+
+    def total_bytes(self) -> int:
+        """Octeții care intră în buget: sesiunile plus cache-ul HTTP."""
+        return sum(e["bytes"] for e in self._load().values()) + self.http_cache_bytes()
+
+    # --- modificări -------------------------------------------------------
+
+    def record_session(self, year: int, event_name: str, session_type: str, session=None) -> List[str]:
+        """
+        Adaugă (sau actualizează) sesiunea în manifest cu directoarele și
+        mărimea ei, apoi aplică bugetul. Returnează cheile evacuate.
+        """
+        key = session_key(year, event_name, session_type)
+        paths = [lap_store.session_path(year, event_name, session_type)]
+        fastf1_dir = _fastf1_session_dir(self.cache_dir, session) if session is not None else None
+        if fastf1_dir is not None:
+            paths.append(fastf1_dir)
+        paths = [p for p in paths if p.exists()]
+
+        now = time.time()
+        with self._file_lock:
+            entries = dict(self._load())
+            previous = entries.get(key, {})
+            rel_paths = sorted(set(previous.get("paths", [])) | {self._relative(p) for p in paths})
+            entries[key] = {
+                "year": int(year),
+                "event_name": event_name,
+                "session_type": session_type,
+                "paths": rel_paths,
+                "bytes": sum(_dir_size(self._absolute(p)) for p in rel_paths),
+                "created": previous.get("created", now),
+                "last_access": now,
+            }
+            evicted = self._enforce_locked(entries, self.budget, keep=key)
+            self._save(entries)
+        return evicted
+
+    def touch(self, year: int, event_name: str, session_type: str) -> None:
+        """Marchează sesiunea ca folosită (rar scris pe disc, vezi TOUCH_INTERVAL)."""
+        key = session_key(year, event_name, session_type)
+        entry = self._load().get(key)
+        now = time.time()
+        if entry is None or now - entry["last_access"] < TOUCH_INTERVAL:
+            return
+        with self._file_lock:
+            entries = dict(self._load())
+            if key in entries:
+                entries[key] = {**entries[key], "last_access": now}
+                self._save(entries)
+
+    def _evict_locked(self, entries: Dict[str, dict], key: str) -> bool:
+        try:
+            for path in entries[key]["paths"]:
+                _remove_dir(self._absolute(path))
+        except OSError as e:
+            # de ex. fișiere deschise de alt proces pe Windows
+            logger.warning(f"Could not evict {key}: {e}")
+            return False
+        del entries[key]
+        return True
+
+    def _clear_http_cache_locked(self) -> bool:
+        try:
+            for suffix in _SQLITE_SUFFIXES:
+                path = self.cache_dir / (HTTP_CACHE_NAME + suffix)
+                if path.exists():
+                    os.remove(path)
+        except OSError as e:
+            # de ex. baza e deschisă de alt proces pe Windows
+            logger.warning(f"Could not clear the HTTP cache: {e}")
+            return False
+        return True
+
+    def _enforce_locked(self, entries: Dict[str, dict], budget: Optional[int],
+                        keep: Optional[str] = None) -> List[str]:
+        evicted = []
+        if not budget:
+            return evicted
+        http_bytes = self.http_cache_bytes()
+        total = sum(e["bytes"] for e in entries.values()) + http_bytes
+        http_cleared = False
+
+        # dacă nici evacuând toate sesiunile (în afară de keep) totalul nu intră
+        # în buget, golim întâi cache-ul HTTP, ca să nu pierdem sesiuni degeaba
+        keep_bytes = entries[keep]["bytes"] if keep in entries else 0
+        if http_bytes > 0 and http_bytes + keep_bytes > budget:
+            http_cleared = self._clear_http_cache_locked()
+            if http_cleared:
+                total -= http_bytes
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if total <= budget:
+                break
+            if key == keep:
+                continue
+            size = entries[key]["bytes"]
+            if self._evict_locked(entries, key):
+                total -= size
+                evicted.append(key)
+                logger.info(f"Evicted {key} ({size / 2**20:.1f} MiB) from the cache")
+        # sesiunile nu au ajuns (de ex. unele nu s-au putut șterge): golim și cache-ul HTTP
+        if not http_cleared and total > budget and http_bytes > 0:
+            http_cleared = self._clear_http_cache_locked()
+        if http_cleared:
+            evicted.append(HTTP_CACHE_NAME)
+            logger.info(f"Cleared the HTTP cache ({http_bytes / 2**20:.1f} MiB)")
+        return evicted
+
+    def enforce_budget(self, budget: Optional[int] = None) -> List[str]:
+        """
+        Evacuează sesiunile LRU (apoi, dacă nu ajunge, cache-ul HTTP) până la
+        buget. Returnează cheile evacuate.
+        """
+        with self._file_lock:
+            entries = dict(self._load())
+            evicted = self._enforce_locked(entries, budget if budget is not None else self.budget)
+            if evicted:
+                self._save(entries)
+        return evicted
+
+    def evict(self, year: int, event_name: str, session_type: str) -> bool:
+        key = session_key(year, event_name, session_type)
+        with self._file_lock:
+            entries = dict(self._load())
+            if key not in entries or not self._evict_locked(entries, key):
+                return False
+            self._save(entries)
+        return True
+
+    def rebuild(self) -> int:
+        """
+        Reface manifestul din disc: sesiunile din lap_store (meta.json) și
+        directoarele de sesiune FastF1 ale acestora. Returnează numărul de
+        sesiuni.
+        """
+        with self._file_lock:
+            old = dict(self._load())
+            entries = {}
+            for meta_path in lap_store.get_store_dir().glob("*/*/*/meta.json"):
+                try:
+                    meta = json.loads(meta_path.read_text())
+                except (OSError, ValueError):
+                    continue
+                key = session_key(meta["year"], meta["event_name"], meta["session_type"])
+                previous = old.get(key, {})
+                rel_paths = {self._relative(meta_path.parent)}
+                rel_paths |= {p for p in previous.get("paths", []) if self._absolute(p).exists()}
+                mtime = meta_path.stat().st_mtime
+                entries[key] = {
+                    "year": meta["year"],
+                    "event_name": meta["event_name"],
+                    "session_type": meta["session_type"],
+                    "paths": sorted(rel_paths),
+                    "bytes": sum(_dir_size(self._absolute(p)) for p in rel_paths),
+                    "created": previous.get("created", mtime),
+                    "last_access": previous.get("last_access", mtime),
+                }
+            self._save(entries)
+        return len(entries)
+
+    def clear(self) -> None:
+        """Evacuează toate sesiunile din manifest."""
+        with self._file_lock:
+            entries = dict(self._load())
+            for key in list(entries):
+                self._evict_locked(entries, key)
+            self._save(entries)
+
+    def status(self) -> dict:
+        entries = self._load()
+        session_bytes = sum(e["bytes"] for e in entries.values())
+        http_bytes = self.http_cache_bytes()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "sessions": len(entries),
+            "session_bytes": session_bytes,
+            "http_cache_bytes": http_bytes,
+            "total_bytes": session_bytes + http_bytes,
+            "budget_bytes": self.budget,
+        }
+
+
+_managers: Dict[str, CacheManager] = {}
+
+
+def get_cache_manager() -> CacheManager:
+    """Managerul directorului de cache curent (unul per director și proces)."""
+    from data_loader import get_cache_dir
+
+    cache_dir = get_cache_dir()
+    if cache_dir not in _managers:
+        _managers[cache_dir] = CacheManager(cache_dir)
+    return _managers[cache_dir]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect and trim the FastF1 / table cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="list cached sessions and sizes")
+    sub.add_parser("rebuild", help="rebuild the manifest from disk")
+    evict = sub.add_parser("evict", help="evict least recently used sessions down to the budget")
+    evict.add_argument("--budget", type=parse_size, help="byte budget, e.g. 5G (default: F1_CACHE_BUDGET)")
+    sub.add_parser("clear", help="evict every session in the manifest")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    manager = get_cache_manager()
+
+    if args.command == "status":
+        entries = sorted(manager.entries().items(), key=lambda kv: kv[1]["last_access"], reverse=True)
+        for key, entry in entries:
+            last = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_access"]))
+            print(f"{key:50s} {entry['bytes'] / 2**20:10.1f} MiB  last used {last}")
+        s = manager.status()
+        budget = f"{s['budget_bytes'] / 2**30:.1f} GiB" if s["budget_bytes"] else "unlimited"
+        print(f"\n{s['sessions']} sessions, {s['session_bytes'] / 2**20:.1f} MiB "
+              f"(+ {s['http_cache_bytes'] / 2**20:.1f} MiB HTTP cache), budget {budget}")
+    elif args.command == "rebuild":
+        print(f"{manager.rebuild()} sessions in manifest")
+    elif args.command == "evict":
+        evicted = manager.enforce_budget(args.budget)
+        sessions = [key for key in evicted if key != HTTP_CACHE_NAME]
+        cleared = " and cleared the HTTP cache" if HTTP_CACHE_NAME in evicted else ""
+        print(f"Evicted {len(sessions)} sessions{cleared}")
+    elif args.command == "clear":
+        manager.clear()
+
+
+if __name__ == "__main__":
+    main()
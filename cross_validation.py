@@ -0,0 +1,127 @@
+"""
+Modul de validare încrucișată
+=============================
+Validare leave-one-race-out / pe pilot / pe stint / k-fold fără refit:
+rândurile fiecărui fold se reduc o singură dată la un factor triunghiular
+al lui [A_g | b_g], iar modelul fără fold-ul g se obține combinând factorii
+celorlalte fold-uri (prefixe și sufixe). Leave-one-out folosește identitatea
+e_i / (1 - h_ii) cu h din factorul R.
+"""
+
+import numpy as np
+from typing import TYPE_CHECKING, List, Tuple
+
+from gram_schmidt import back_substitution
+from linalg_kernels import solve_triangular
+from metrics import compute_rmse
+from tsqr import combine_factors, tsqr_factor
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Coloanele care definesc fiecare tip de fold (prima existentă se folosește)
+FOLD_COLUMNS = {
+    "race": [["EventName"], ["RoundNumber"], ["Event"]],
+    "driver": [["Driver"], ["DriverNumber"]],
+    "stint": [["Driver", "Stint"], ["DriverNumber", "Stint"]],
+}
+
+
+def fold_labels(laps: "pd.DataFrame", by: str) -> np.ndarray:
+    """
+    Eticheta de fold a fiecărui tur: by = 'race', 'driver', 'stint' sau
+    numele unei coloane din laps.
+    """
+    candidates = FOLD_COLUMNS.get(by, [[by]])
+    for cols in candidates:
+        if all(c in laps.columns for c in cols):
+            if len(cols) == 1:
+                return laps[cols[0]].astype(str).to_numpy()
+            return laps[cols].astype(str).agg("/".join, axis=1).to_numpy()
+    raise ValueError(f"Cannot build '{by}' folds: columns {candidates} not found.")
+
+
+def kfold_labels(m: int, k: int = 5, seed: int = 0) -> np.ndarray:
+    """Etichete pentru k fold-uri aleatoare de mărimi egale."""
+    rng = np.random.default_rng(seed)
+    labels = np.arange(m) % k
+    rng.shuffle(labels)
+    return labels
+
+
+def _solve(Rt: np.ndarray) -> np.ndarray:
+    n = Rt.shape[0] - 1
+    return back_substitution(Rt[:n, :n], Rt[:n, n])
+
+
+def cross_validate(
+    A: np.ndarray,
+    b: np.ndarray,
+    labels: np.ndarray
+) -> Tuple[List, np.ndarray, np.ndarray]:
+    """
+    Pentru fiecare fold g: coeficienții fără rândurile lui g și RMSE pe g.
+    Returnează etichetele fold-urilor, RMSE pe fold și coeficienții (G x n).
+    """
+    labels = np.asarray(labels)
+    keys, inverse = np.unique(labels, return_inverse=True)
+    G = len(keys)
+    if G < 2:
+        raise ValueError("Sunt necesare cel puțin două fold-uri.")
+
+    # Pas 1: un singur factor triunghiular per fold (o trecere prin date)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.searchsorted(inverse[order], np.arange(G + 1))
+    rows = [order[bounds[g]:bounds[g + 1]] for g in range(G)]
+    factors = [tsqr_factor([(A[r], b[r])]) for r in rows]
+
+    # Pas 2: prefixe și sufixe, ca fiecare "toți fără g" să coste o combinare
+    prefix = [None] * G
+    suffix = [None] * G
+    for g in range(1, G):
+        prefix[g] = factors[g - 1] if prefix[g - 1] is None else combine_factors(prefix[g - 1], factors[g - 1])
+    for g in range(G - 2, -1, -1):
+        suffix[g] = factors[g + 1] if suffix[g + 1] is None else combine_factors(factors[g + 1], suffix[g + 1])
+
+    n = A.shape[1]
+    rmse = np.full(G, np.nan)
+    coefs = np.full((G, n), np.nan)
+
+    # Pas 3: modelul fără fold-ul g și eroarea pe fold-ul g
+    for g in range(G):
+        if prefix[g] is None:
+            Rt = suffix[g]
+        elif suffix[g] is None:
+            Rt = prefix[g]
+        else:
+            Rt = combine_factors(prefix[g], suffix[g])
+        try:
+            x = _solve(Rt)
+        except ValueError:
+            # fără fold-ul g problema nu mai are rang complet
+            continue
+        coefs[g] = x
+        rmse[g] = compute_rmse(A[rows[g]], x, b[rows[g]])
+
+    return list(keys), rmse, coefs
+
+
+def loo_cv(A: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Leave-one-out în formă închisă: reziduurile LOO e_i / (1 - h_ii),
+    cu h_ii = ||R^{-T} a_i||², și RMSE-ul lor.
+    """
+    Rt = tsqr_factor([(A, b)])
+    n = A.shape[1]
+    R = Rt[:n, :n]
+    x = back_substitution(R, Rt[:n, n])
+
+    # Q subțire = A R^{-1}: R^T Q^T = A^T, rezolvat pentru toate rândurile deodată
+    Qt = solve_triangular(R, A.T, trans=True)
+    leverage = np.sum(Qt ** 2, axis=0)
+
+    residuals = b - A @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loo_residuals = residuals / (1 - leverage)
+    return loo_residuals, float(np.sqrt(np.mean(loo_residuals ** 2)))
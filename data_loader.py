@@ -2,15 +2,30 @@
 Loader date F1
 ==============
 Încarcă sesiuni FastF1 cu suport de cache.
+Nu depinde de Streamlit: erorile se raportează prin logging și valori
+returnate (None), iar fastf1 se importă și cache-ul se pornește abia la
+prima încărcare de sesiune. Interfața Streamlit e în st_adapter.
 """
 
-import fastf1
-import streamlit as st
-from typing import Optional
+from typing import Iterable, Optional, Set, Tuple
 import pandas as pd
+import numpy as np
+import logging
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+import cache_manager
+import lap_store
+from features import FEATURE_REGISTRY, add_lap_context
+from weather import align_weather
+from telemetry import resample_laps
+from instrumentation import count, span, traced
+
+
+logger = logging.getLogger(__name__)
+
 
 def get_cache_dir() -> str:
     """
@@ -34,47 +49,319 @@ def get_cache_dir() -> str:
     return str(cache_dir)
 
 
-# Inițializăm cache-ul la import
+# Cache-ul FastF1 se pornește la prima folosire, nu la import
 _cache_initialized = False
 
 def _init_cache():
     """Initializează cache-ul FastF1."""
     global _cache_initialized
     if not _cache_initialized:
+        import fastf1
+
         cache_path = get_cache_dir()
         fastf1.Cache.enable_cache(cache_path)
         _cache_initialized = True
 
-# Pornim cache-ul
-_init_cache()
 
+def _fastf1():
+    """Modulul fastf1, cu cache-ul pornit."""
+    _init_cache()
+    import fastf1
+    return fastf1
+
+
+def set_offline_mode(enabled: bool) -> None:
+    """
+    Mod doar-cache: FastF1 nu mai trimite cereri în rețea, iar datele
+    lipsă din cache nu se încarcă.
+    """
+    _fastf1().Cache.offline_mode(enabled)
+
+
+# Subseturile de date FastF1: laps, weather, telemetry (car + poziții), messages
+ALL_DATASETS = ("laps", "weather", "telemetry", "messages")
+
+# Subseturile de care are nevoie fiecare feature
+FEATURE_DATASETS = {
+    'TyreLife': ("laps",),
+    'LapNumber': ("laps",),
+    'TrackTemp': ("laps", "weather"),
+    'AirTemp': ("laps", "weather"),
+    'WindSpeed': ("laps", "weather"),
+}
+
+# Proprietatea publică FastF1 a fiecărui subset; citirea ei ridică
+# DataNotLoadedError cât timp subsetul nu a fost încărcat
+_DATASET_PROPERTIES = {
+    "laps": "laps",
+    "weather": "weather_data",
+    "telemetry": "car_data",
+    "messages": "race_control_messages",
+}
+
+
+def _dataset_loaded(session, dataset: str) -> bool:
+    try:
+        getattr(session, _DATASET_PROPERTIES[dataset])
+    except Exception:
+        return False
+    return True
+
+
+def required_datasets(
+    selected_features: Iterable[str],
+    track_map: bool = False,
+    telemetry: bool = False
+) -> Tuple[str, ...]:
+    """
+    Stabilește ce subseturi FastF1 trebuie încărcate pentru o cerere:
+    laps pentru TyreLife/LapNumber, weather pentru TrackTemp/AirTemp/WindSpeed,
+    telemetry doar pentru harta circuitului sau telemetrie.
+    """
+    datasets: Set[str] = {"laps"}
+    for feature in selected_features:
+        if feature in FEATURE_DATASETS:
+            datasets.update(FEATURE_DATASETS[feature])
+        elif feature in FEATURE_REGISTRY:
+            datasets.update(FEATURE_REGISTRY[feature].datasets)
+    if track_map or telemetry:
+        datasets.add("telemetry")
+    return tuple(d for d in ALL_DATASETS if d in datasets)
+
+
+def _load_fastf1(year: int, event_name: str, session_type: str, datasets: Iterable[str]):
+    """Încarcă din FastF1 doar subseturile cerute."""
+    datasets = set(datasets)
+    session = _fastf1().get_session(year, event_name, session_type)
+    session.load(
+        laps="laps" in datasets or "telemetry" in datasets,
+        telemetry="telemetry" in datasets,
+        weather="weather" in datasets,
+        messages="messages" in datasets
+    )
+    return session
 
-@st.cache_data(ttl=3600)  # Cache o oră
-def load_session(year: int, event_name: str, session_type: str) -> Optional[fastf1.core.Session]:
+
+def ensure_datasets(session, datasets: Iterable[str]):
+    """
+    Completează la cerere subseturile care lipsesc dintr-o sesiune deja
+    încărcată, fără a reîncărca ce există.
+    """
+    datasets = set(datasets)
+
+    if isinstance(session, lap_store.StoredSession):
+        if "weather" in datasets and session.weather_data is None:
+            fastf1_session = get_fastf1_session(session, ("weather",))
+            try:
+                session.weather_data = fastf1_session.weather_data
+            except Exception:
+                # sesiunea nu are date meteo (FastF1 a eșuat „soft”)
+                session.weather_data = None
+            if session.weather_data is not None:
+                lap_store.write_table(session.year, session.event_name, session.session_type,
+                                      "weather", session.weather_data)
+        extra = datasets & {"telemetry", "messages"}
+        if extra:
+            get_fastf1_session(session, extra)
+        return session
+
+    missing = {d for d in datasets if d in _DATASET_PROPERTIES and not _dataset_loaded(session, d)}
+    if missing:
+        # Session.load (API public) încarcă doar subseturile marcate; cele deja
+        # încărcate rămân neatinse
+        session.load(
+            laps="laps" in missing,
+            telemetry="telemetry" in missing,
+            weather="weather" in missing,
+            messages="messages" in missing
+        )
+    return session
+
+
+def record_cached(year: int, event_name: str, session_type: str, session=None) -> None:
+    """Adaugă sesiunea în manifestul cache-ului și aplică bugetul."""
+    try:
+        cache_manager.get_cache_manager().record_session(year, event_name, session_type, session)
+    except Exception as e:
+        logger.warning(f"Could not update the cache manifest: {str(e)}")
+
+
+def _touch_cached(year: int, event_name: str, session_type: str) -> None:
+    try:
+        cache_manager.get_cache_manager().touch(year, event_name, session_type)
+    except Exception as e:
+        logger.warning(f"Could not update the cache manifest: {str(e)}")
+
+
+@traced()
+def load_session(
+    year: int,
+    event_name: str,
+    session_type: str,
+    use_store: bool = True,
+    datasets: Optional[Tuple[str, ...]] = None
+):
     """
     Încarcă o sesiune F1 cu cache.
+    Cu use_store, tururile și vremea se citesc din depozitul columnar
+    (lap_store) dacă sesiunea a mai fost încărcată; altfel sesiunea FastF1
+    se parsează o dată și se salvează acolo.
+    Cu datasets (vezi required_datasets) se încarcă doar subseturile cerute;
+    restul se aduc ulterior prin ensure_datasets.
+    Returnează None (cu eroarea în log) dacă sesiunea nu se poate încărca;
+    st_adapter.load_session adaugă cache-ul Streamlit.
+    Sesiunile salvate intră în manifestul cache_manager (buget + LRU).
     """
+    if datasets is None:
+        datasets = ALL_DATASETS
+
     try:
-        session = fastf1.get_session(year, event_name, session_type)
-        session.load()
+        if use_store:
+            stored = lap_store.read_session(year, event_name, session_type)
+            if stored is not None:
+                count("lap_store.hit")
+                _touch_cached(year, event_name, session_type)
+                return ensure_datasets(stored, set(datasets) & {"weather"})
+            count("lap_store.miss")
+
+        with span("data_loader.fastf1_load", datasets=",".join(datasets)):
+            session = _load_fastf1(year, event_name, session_type, datasets)
+
+        if use_store:
+            try:
+                lap_store.write_session(year, event_name, session_type, session)
+            except Exception as e:
+                logger.warning(f"Could not write session to the lap store: {str(e)}")
+            else:
+                record_cached(year, event_name, session_type, session)
         return session
     except Exception as e:
-        st.error(f"Error loading session: {str(e)}")
+        logger.error(f"Error loading session: {str(e)}")
         return None
 
 
-def get_laps_data(session: fastf1.core.Session, driver_code: str) -> Optional[pd.DataFrame]:
+def load_session_for_features(
+    year: int,
+    event_name: str,
+    session_type: str,
+    selected_features: Iterable[str],
+    track_map: bool = False
+):
+    """
+    Încarcă sesiunea doar cu subseturile cerute de feature-urile selectate.
+    """
+    datasets = required_datasets(selected_features, track_map=track_map)
+    return load_session(year, event_name, session_type, datasets=datasets)
+
+
+def get_fastf1_session(session, datasets: Iterable[str] = ("laps", "telemetry")):
+    """
+    Returnează sesiunea FastF1 propriu-zisă (pentru telemetrie și poziții),
+    cu subseturile cerute încărcate. Pentru o sesiune din depozitul columnar,
+    sesiunea FastF1 se încarcă la prima cerere și rămâne atașată.
+    """
+    if isinstance(session, lap_store.StoredSession):
+        if session.fastf1_session is None:
+            session.fastf1_session = _load_fastf1(
+                session.year, session.event_name, session.session_type, datasets
+            )
+            return session.fastf1_session
+        return ensure_datasets(session.fastf1_session, datasets)
+    return ensure_datasets(session, datasets)
+
+
+def pick_driver_laps(laps: pd.DataFrame, driver_code: str) -> pd.DataFrame:
+    """
+    Selectează tururile unui pilot după cod (VER) sau număr (1).
+    Funcționează atât pe fastf1.core.Laps, cât și pe un DataFrame simplu.
+    """
+    identifier = str(driver_code)
+    if identifier.isdigit():
+        return laps[laps['DriverNumber'] == identifier]
+    return laps[laps['Driver'] == identifier]
+
+
+def session_identity(session) -> Optional[Tuple[int, str, str]]:
+    """
+    Identitatea stabilă a unei sesiuni: (an, eveniment, nume sesiune), la fel
+    pentru sesiunea FastF1 și pentru StoredSession. None dacă nu se poate
+    stabili.
+    """
+    try:
+        event = session.event
+        return int(event.year), str(event["EventName"]), str(session.name)
+    except Exception:
+        return None
+
+
+# Tururile cu vremea aliniată, cheiate după (identitatea sesiunii, metodă):
+# st.cache_data întoarce la fiecare apel un obiect sesiune nou
+WEATHER_CACHE_SIZE = 8
+
+_weather_aligned: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_weather_aligned_lock = threading.Lock()
+
+
+def get_laps_with_weather(session, method: str = "asof") -> pd.DataFrame:
+    """
+    Returnează toate tururile sesiunii cu TrackTemp/AirTemp/WindSpeed
+    aliniate din session.weather_data (o singură aliniere pentru toți piloții).
+    Fără date meteo se întorc tururile simple, necache-uite, ca un apel
+    ulterior să reîncerce alinierea.
+    """
+    identity = session_identity(session)
+    key = (identity, method)
+    if identity is not None:
+        with _weather_aligned_lock:
+            if key in _weather_aligned:
+                _weather_aligned.move_to_end(key)
+                count("weather_aligned.hit")
+                return _weather_aligned[key]
+    count("weather_aligned.miss")
+
+    ensure_datasets(session, ("weather",))
+    try:
+        weather = session.weather_data
+    except Exception:
+        weather = None
+    if weather is None:
+        return session.laps
+
+    aligned = align_weather(session.laps, weather, method)
+    if identity is not None:
+        with _weather_aligned_lock:
+            _weather_aligned[key] = aligned
+            while len(_weather_aligned) > WEATHER_CACHE_SIZE:
+                _weather_aligned.popitem(last=False)
+    return aligned
+
+
+@traced()
+def get_laps_data(
+    session,
+    driver_code: str,
+    weather_method: Optional[str] = None
+) -> Optional[pd.DataFrame]:
     """
     Extrage datele pe tur pentru un pilot.
+    Cu weather_method ('asof', 'interpolate', 'mean') tururile primesc și
+    coloanele meteo aliniate (vezi weather.align_weather).
     """
     if session is None:
         return None
     
     try:
-        laps = session.laps.pick_driver(driver_code).copy()
+        if weather_method is not None:
+            all_laps = get_laps_with_weather(session, weather_method)
+        else:
+            all_laps = session.laps
+        laps = pick_driver_laps(all_laps, driver_code)
         if laps.empty:
-            st.warning(f"Driver {driver_code} not found in this session.")
+            logger.warning(f"Driver {driver_code} not found in this session.")
             return None
+
+        # stint-urile și lungimea cursei din toate tururile, înainte de filtrare
+        laps = add_lap_context(laps, session_laps=all_laps['LapNumber'].max())
         
         # Filtrăm tururile valide: LapTime nenul și IsAccurate dacă există
         valid_mask = laps['LapTime'].notna()
@@ -84,25 +371,47 @@ def get_laps_data(session: fastf1.core.Session, driver_code: str) -> Optional[pd
         laps_valid = laps[valid_mask].copy()
         
         if laps_valid.empty:
-            st.warning(f"No valid laps found for driver {driver_code}.")
+            logger.warning(f"No valid laps found for driver {driver_code}.")
             return None
         
         return laps_valid
     except Exception as e:
-        st.error(f"Error extracting lap data: {str(e)}")
+        logger.error(f"Error extracting lap data: {str(e)}")
         return None
 
 
-def get_telemetry_data(session: fastf1.core.Session, driver_code: str) -> Optional[pd.DataFrame]:
+@traced()
+def get_telemetry_data(
+    session,
+    driver_code: str,
+    distance_step: Optional[float] = None,
+    dtype=None,
+    aggregate: bool = False
+) -> Optional[pd.DataFrame]:
     """
     Extrage telemetria pentru un pilot.
+    Cu distance_step (metri) telemetria se parcurge tur cu tur și se
+    reeșantionează pe o grilă fixă de distanță; cu aggregate=True se
+    returnează doar agregate pe tur. dtype (de ex. np.float32) reduce
+    precizia canalelor reeșantionate.
     """
     if session is None:
         return None
     
     try:
-        telemetry = session.laps.pick_driver(driver_code).get_telemetry()
+        session = get_fastf1_session(session)
+        laps = session.laps.pick_driver(driver_code)
+
+        if distance_step is not None or aggregate:
+            return resample_laps(
+                laps,
+                step=distance_step or 10.0,
+                dtype=dtype or np.float64,
+                aggregate=aggregate
+            )
+
+        telemetry = laps.get_telemetry()
         return telemetry
     except Exception as e:
-        st.warning(f"Could not load telemetry for {driver_code}: {str(e)}")
+        logger.warning(f"Could not load telemetry for {driver_code}: {str(e)}")
         return None
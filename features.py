@@ -2,19 +2,210 @@
 Modul de feature engineering
 ============================
 Construiește matricea de feature-uri și vectorul țintă din datele F1.
-Suportă doar: TyreLife, TrackTemp, WindSpeed, AirTemp, LapNumber.
+Feature-urile se declară o singură dată în FEATURE_REGISTRY: cele de bază
+(TyreLife, TrackTemp, WindSpeed, AirTemp, LapNumber) și cele derivate
+(stint, tururi de la pit, compound one-hot, proxy de combustibil,
+TyreLife x TrackTemp), calculate vectorizat, pe grupuri, pe tot tabelul.
 """
 
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Optional
-import streamlit as st
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
 
+from instrumentation import traced
 
-# Feature-uri permise (doar aceste 5)
+
+logger = logging.getLogger(__name__)
+
+
+# Feature-urile de bază (coloane FastF1 / meteo aliniate)
 ALLOWED_FEATURES = ["TyreLife", "TrackTemp", "WindSpeed", "AirTemp", "LapNumber"]
 
+# Compound-urile, în ordinea coloanelor one-hot; primul (SOFT) e referința.
+# Coloanele sunt fixe, ca A să aibă aceeași lățime pentru orice sesiune / pilot
+COMPOUNDS = ["SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET"]
+
+# Coloanele care identifică o sesiune, un pilot și un stint (cele existente se folosesc)
+SESSION_KEYS = ["Year", "EventName", "SessionType"]
+DRIVER_KEYS = SESSION_KEYS + ["Driver"]
+
+
+class FeatureSpec:
+    """
+    Un feature din registru: compute(laps) întoarce valorile pentru toate
+    tururile (m sau m x k), columns() numele celor k coloane (fixe, nu
+    depind de date).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[pd.DataFrame], np.ndarray],
+        requires: Tuple[str, ...] = (),
+        datasets: Tuple[str, ...] = ("laps",),
+        columns: Optional[Sequence[str]] = None
+    ):
+        self.name = name
+        self.compute = compute
+        self.requires = requires
+        self.datasets = datasets
+        self._columns = list(columns) if columns is not None else [name]
+
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+
+# Ordinea din registru este ordinea coloanelor din A
+FEATURE_REGISTRY: Dict[str, FeatureSpec] = {}
+
+
+def register_feature(
+    name: str,
+    requires: Sequence[str] = (),
+    datasets: Sequence[str] = ("laps",),
+    columns: Optional[Sequence[str]] = None
+):
+    """Decorator: adaugă funcția compute(laps) în registru sub numele dat."""
+    def decorator(compute):
+        FEATURE_REGISTRY[name] = FeatureSpec(name, compute, tuple(requires), tuple(datasets), columns)
+        return compute
+    return decorator
+
+
+def _numeric(laps: pd.DataFrame, column: str) -> np.ndarray:
+    """Coloana ca float64 (fără copie dacă e deja float64)."""
+    return laps[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _group_ids(laps: pd.DataFrame, keys: Sequence[str]) -> np.ndarray:
+    """Un id întreg per grup (sesiune / pilot / stint), 0 dacă nu există chei."""
+    keys = [k for k in keys if k in laps.columns]
+    if not keys:
+        return np.zeros(len(laps), dtype=np.int64)
+    return laps.groupby(keys, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+
+
+# --- feature-urile de bază ----------------------------------------------------
+
+_WEATHER = {"TrackTemp", "WindSpeed", "AirTemp"}
+
+for _name in ALLOWED_FEATURES:
+    register_feature(
+        _name,
+        requires=(_name,),
+        datasets=("laps", "weather") if _name in _WEATHER else ("laps",)
+    )(lambda laps, _col=_name: _numeric(laps, _col))
+
+
+# --- feature-urile derivate ---------------------------------------------------
+
+def _stint_values(laps: pd.DataFrame) -> np.ndarray:
+    if "Stint" in laps.columns:
+        return _numeric(laps, "Stint")
+    if "PitOutTime" not in laps.columns:
+        return np.ones(len(laps))
+    # fără coloana Stint: fiecare ieșire de la boxe (PitOutTime) începe un stint
+    # nou, în afară de primul tur al pilotului
+    frame = pd.DataFrame({
+        "group": _group_ids(laps, DRIVER_KEYS),
+        "lap": _numeric(laps, "LapNumber"),
+        "pit_out": laps["PitOutTime"].notna().to_numpy(),
+    }).sort_values(["group", "lap"], kind="stable")
+    new_stint = frame["pit_out"] & frame["group"].duplicated()
+    stint = new_stint.groupby(frame["group"]).cumsum() + 1
+    return stint.sort_index().to_numpy(dtype=np.float64)
+
+
+@register_feature("Stint", requires=("LapNumber",))
+def stint_index(laps: pd.DataFrame) -> np.ndarray:
+    """Numărul stint-ului (1, 2, ...)."""
+    return _stint_values(laps)
+
+
+def _stint_start_lap(laps: pd.DataFrame) -> np.ndarray:
+    frame = pd.DataFrame({
+        "group": _group_ids(laps, DRIVER_KEYS),
+        "stint": _stint_values(laps),
+        "lap": _numeric(laps, "LapNumber"),
+    })
+    return frame.groupby(["group", "stint"], sort=False, dropna=False)["lap"].transform("min").to_numpy()
+
+
+def _session_laps(laps: pd.DataFrame) -> np.ndarray:
+    lap = _numeric(laps, "LapNumber")
+    return pd.Series(lap).groupby(_group_ids(laps, SESSION_KEYS)).transform("max").to_numpy()
+
+
+def add_lap_context(laps: pd.DataFrame, session_laps: Optional[float] = None) -> pd.DataFrame:
+    """
+    Adaugă coloanele StintStartLap (primul tur al stint-ului) și SessionLaps
+    (ultimul tur al sesiunii; session_laps dacă e dat, de ex. din tururile
+    tuturor piloților). Se apelează pe tabelul complet, înainte de a elimina
+    out-lap-urile și tururile inexacte, ca LapsSincePit și FuelLoad să nu
+    pornească de la primul / ultimul tur valid.
+    """
+    return laps.assign(
+        StintStartLap=_stint_start_lap(laps),
+        SessionLaps=_session_laps(laps) if session_laps is None else float(session_laps)
+    )
 
+
+@register_feature("LapsSincePit", requires=("LapNumber",))
+def laps_since_pit(laps: pd.DataFrame) -> np.ndarray:
+    """
+    Tururi de la începutul stint-ului (0 pentru primul tur al stint-ului).
+    Folosește StintStartLap (add_lap_context) dacă tururile sunt filtrate.
+    """
+    if "StintStartLap" in laps.columns:
+        first = _numeric(laps, "StintStartLap")
+    else:
+        first = _stint_start_lap(laps)
+    return _numeric(laps, "LapNumber") - first
+
+
+@register_feature(
+    "Compound",
+    requires=("Compound",),
+    columns=[f"Compound_{c}" for c in COMPOUNDS[1:]]
+)
+def compound_one_hot(laps: pd.DataFrame) -> np.ndarray:
+    """
+    Compound one-hot (m x 4) față de SOFT (referința, altfel coloanele ar fi
+    coliniare cu interceptul). Compound-urile nefolosite dau coloane nule;
+    cele necunoscute sau lipsă contează ca referința.
+    """
+    compound = laps["Compound"].astype(str).str.upper().to_numpy()
+    return compound[:, None] == np.array(COMPOUNDS[1:], dtype=object)[None, :]
+
+
+@register_feature("FuelLoad", requires=("LapNumber",))
+def fuel_load(laps: pd.DataFrame) -> np.ndarray:
+    """
+    Proxy pentru combustibil: fracțiunea de cursă rămasă,
+    1 - (LapNumber - 1) / ultimul tur al sesiunii (SessionLaps din
+    add_lap_context dacă tururile sunt filtrate).
+    """
+    lap = _numeric(laps, "LapNumber")
+    if "SessionLaps" in laps.columns:
+        last_lap = _numeric(laps, "SessionLaps")
+    else:
+        last_lap = _session_laps(laps)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 1.0 - (lap - 1.0) / last_lap
+
+
+@register_feature("TyreLife_x_TrackTemp", requires=("TyreLife", "TrackTemp"), datasets=("laps", "weather"))
+def tyre_life_x_track_temp(laps: pd.DataFrame) -> np.ndarray:
+    """Interacțiunea uzură anvelope x temperatura pistei."""
+    return _numeric(laps, "TyreLife") * _numeric(laps, "TrackTemp")
+
+
+# Toate feature-urile selectabile
+FEATURES = list(FEATURE_REGISTRY)
+
+
+@traced()
 def build_feature_matrix(
     laps: pd.DataFrame,
     telemetry: Optional[pd.DataFrame],
@@ -22,75 +213,81 @@ def build_feature_matrix(
 ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
     """
     Construiește matricea A și vectorul țintă b din datele pe tur.
-    Suportă doar: TyreLife, TrackTemp, WindSpeed, AirTemp, LapNumber.
+    Feature-urile (vezi FEATURE_REGISTRY) se calculează pe tot tabelul și se
+    scriu direct într-o singură matrice float64 prealocată, în ordine Fortran.
     """
     warnings_list = []
-    
+
     # Ținta: LapTime în secunde
     if 'LapTime' not in laps.columns:
-        st.error("LapTime column not found in lap data.")
+        logger.error("LapTime column not found in lap data.")
         return None, None, []
-    
+
     # Convertim LapTime în secunde dacă este timedelta
     if pd.api.types.is_timedelta64_dtype(laps['LapTime']):
-        b = laps['LapTime'].dt.total_seconds().values
+        b = laps['LapTime'].dt.total_seconds().to_numpy(dtype=np.float64)
     else:
-        b = laps['LapTime'].values
-    
-    # Eliminăm tururile cu NaN
+        b = laps['LapTime'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Tururile cu NaN nu intră în A (feature-urile se calculează totuși pe toate,
+    # ca grupurile pe stint / sesiune să fie complete)
     valid_mask = ~np.isnan(b)
-    laps_clean = laps[valid_mask].copy()
-    b = b[valid_mask]
-    
+    rows = None if valid_mask.all() else np.flatnonzero(valid_mask)
+    if rows is not None:
+        b = b[rows]
+
     if len(b) == 0:
-        st.error("No valid lap times found.")
+        logger.error("No valid lap times found.")
         return None, None, []
-    
-    # Construim matricea de feature-uri
-    feature_list = []
-    feature_names = []
-    
-    # Mapare feature-uri (doar cele 5 permise)
-    basic_features = {
-        'TyreLife': 'TyreLife',
-        'TrackTemp': 'TrackTemp',
-        'WindSpeed': 'WindSpeed',
-        'AirTemp': 'AirTemp',
-        'LapNumber': 'LapNumber'
-    }
-    
-    # Păstrăm doar feature-urile permise
-    valid_selected = [f for f in selected_features if f in ALLOWED_FEATURES]
-    
-    for feature_key, col_name in basic_features.items():
-        if feature_key in valid_selected:
-            if col_name in laps_clean.columns:
-                feature_list.append(laps_clean[col_name].fillna(0).values)
-                feature_names.append(feature_key)
-            else:
-                warnings_list.append(f"Feature {feature_key} (column {col_name}) not available, skipping.")
-    
+
+    # Păstrăm feature-urile din registru, în ordinea registrului
+    plan = []
+    for name, spec in FEATURE_REGISTRY.items():
+        if name not in selected_features:
+            continue
+        missing = [c for c in spec.requires if c not in laps.columns]
+        if missing:
+            warnings_list.append(f"Feature {name} (column {', '.join(missing)}) not available, skipping.")
+            continue
+        plan.append((spec, spec.column_names()))
+
     # Semnalăm selecțiile invalide
-    invalid_features = [f for f in selected_features if f not in ALLOWED_FEATURES]
+    invalid_features = [f for f in selected_features if f not in FEATURE_REGISTRY]
     if invalid_features:
         warnings_list.append(f"Invalid features ignored: {', '.join(invalid_features)}")
-    
-    if len(feature_list) == 0:
-        st.error("No features could be extracted. Please select different features.")
+
+    if len(plan) == 0:
+        logger.error("No features could be extracted. Please select different features.")
         return None, None, []
-    
-    # Adăugăm termenul de intercept
-    feature_list.insert(0, np.ones(len(b)))
-    feature_names.insert(0, 'Intercept')
-    
-    # Formăm matricea
-    A = np.column_stack(feature_list)
-    
-    # Înlocuim NaN / Inf cu 0
-    A = np.nan_to_num(A, nan=0.0, posinf=0.0, neginf=0.0)
-    
-    # Afișăm eventualele avertismente
+
+    # Matricea prealocată: intercept + coloanele fiecărui feature
+    feature_names = ['Intercept'] + [n for _, names in plan for n in names]
+    A = np.empty((len(b), len(feature_names)), dtype=np.float64, order="F")
+    A[:, 0] = 1.0
+
+    j = 1
+    for spec, names in plan:
+        values = np.asarray(spec.compute(laps), dtype=np.float64)
+        block = A[:, j:j + len(names)]
+        if values.ndim == 1:
+            if rows is None:
+                block[:, 0] = values
+            else:
+                np.take(values, rows, out=block[:, 0])
+        else:
+            block[...] = values if rows is None else values[rows]
+        j += len(names)
+
+    # Înlocuim NaN / Inf cu 0, pe loc
+    np.nan_to_num(A, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+    # Coloanele nule (de ex. un compound nefolosit) fac A deficientă de rang
+    zero_columns = [feature_names[k] for k in np.flatnonzero(~A.any(axis=0))]
+    if zero_columns:
+        warnings_list.append(f"Columns {', '.join(zero_columns)} are all zero; A is rank deficient.")
+
+    # Raportăm eventualele avertismente
     for warning in warnings_list:
-        st.warning(warning)
-    
+        logger.warning(warning)
+
     return A, b, feature_names
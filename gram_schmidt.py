@@ -1,5 +1,8 @@
 import numpy as np
 
+from instrumentation import traced
+from linalg_kernels import solve_triangular
+
 
 def qr_gram_schmidt(A):
     """
@@ -29,35 +32,127 @@ def qr_gram_schmidt(A):
 
     return Q, R
 
-def back_substitution(R, d):
+def _panel_qr(W, dtype):
     """
-    Rezolvă sistem triunghiular superior R x = d.
+    QR al unui panou de coloane prin Gram–Schmidt clasic de două ori (CGS2),
+    coloană cu coloană. Panoul (m x k, mic) se calculează în float64 și
+    doar Q rezultat se stochează în dtype.
     """
-    n = R.shape[0]
-    x = np.zeros(n)
+    W = np.asarray(W, dtype=np.float64)
+    m, k = W.shape
+    Q = np.zeros((m, k))
+    R = np.zeros((k, k))
+
+    for j in range(k):
+        v = W[:, j].copy()
+        if j > 0:
+            # două treceri: a doua corectează pierderea de ortogonalitate
+            for _ in range(2):
+                s = Q[:, :j].T @ v
+                v = v - Q[:, :j] @ s
+                R[:j, j] += s
+
+        R[j, j] = np.linalg.norm(v)
+        if R[j, j] == 0:
+            raise ValueError("Coloane dependente liniar – matrice fără rang complet.")
+        Q[:, j] = v / R[j, j]
 
-    for i in range(n - 1, -1, -1):
-        if R[i, i] == 0:
-            raise ValueError("Matrice R singulară.")
-        x[i] = (d[i] - R[i, i+1:] @ x[i+1:]) / R[i, i]
+    return Q.astype(dtype, copy=False), R
 
-    return x
 
-def ls_gram_schmidt(A, b):
+def _cholesky_qr(W, dtype):
+    """
+    QR prin Cholesky: W^T W = R^T R, Q = W R^{-1}.
+    Stabil doar pentru W bine condiționat (aici: după prima trecere).
+    Matricea Gram, Cholesky și Q = W R^{-1} se calculează în float64;
+    Q se stochează în dtype.
+    """
+    W = np.asarray(W, dtype=np.float64)
+    G = W.T @ W
+    try:
+        R = np.linalg.cholesky(G).T
+    except np.linalg.LinAlgError:
+        raise ValueError("Coloane dependente liniar – matrice fără rang complet.")
+    Q = solve_triangular(R, W.T, trans=True).T
+    return Q.astype(dtype, copy=False), R
+
+
+def qr_block_gram_schmidt(A, block_size=32, dtype=np.float64):
+    """
+    Descompunere QR prin Gram–Schmidt clasic pe blocuri, de două ori (BCGS2).
+    Fiecare panou se ortogonalizează față de coloanele anterioare prin
+    produse matrice-matrice, apoi întreaga proiecție se repetă o dată.
+    Cu dtype=np.float32 doar Q se stochează în float32 (jumătate din
+    memorie); coeficienții proiecțiilor Q^T A, matricele Gram și R se
+    calculează și se acumulează în float64.
+    Returnează Q ∈ R^{m x n} (dtype), R ∈ R^{n x n} (float64)
+    """
+    m, n = A.shape
+
+    Q = np.zeros((m, n), dtype=dtype)
+    R = np.zeros((n, n))
+
+    for k0 in range(0, n, block_size):
+        k1 = min(k0 + block_size, n)
+        W = np.asarray(A[:, k0:k1], dtype=np.float64)
+        # blocurile anterioare, citite în float64 (fără copie dacă dtype e float64)
+        Qp = np.asarray(Q[:, :k0], dtype=np.float64)
+
+        # Trecerea 1: proiecție pe blocurile anterioare + QR de panou
+        S1 = Qp.T @ W
+        Q1, R1 = _panel_qr(W - Qp @ S1, dtype)
+
+        # Trecerea 2: reortogonalizare; panoul e deja aproape ortonormat,
+        # deci QR-ul lui prin Cholesky (produse matrice-matrice) e stabil
+        Q1 = np.asarray(Q1, dtype=np.float64)
+        S2 = Qp.T @ Q1
+        Q2, R2 = _cholesky_qr(Q1 - Qp @ S2, dtype)
+
+        # W = Qp (S1 + S2 R1) + Q2 (R2 R1)
+        R[:k0, k0:k1] = S1 + S2 @ R1
+        R[k0:k1, k0:k1] = R2 @ R1
+        Q[:, k0:k1] = Q2
+
+    return Q, R
+
+
+def back_substitution(R, d):
+    """
+    Rezolvă sistem triunghiular superior R x = d.
+    d poate fi și o matrice n x k (k membre drepte).
+    """
+    return solve_triangular(R, d)
+
+@traced()
+def ls_gram_schmidt(A, b, block_size=None, dtype=np.float64, cache=None):
     """
     Rezolvă problema celor mai mici pătrate:
         min ||Ax - b||
     folosind QR obținut prin Gram–Schmidt modificat.
+    Cu block_size setat se folosește varianta pe blocuri (BCGS2), opțional
+    cu dtype=np.float32.
+    Cu un cache (linalg_kernels.FactorizationCache) factorizarea lui A se
+    refolosește pentru alte ținte b.
     """
     m, n = A.shape
     if m <= n:
         raise ValueError("Sistemul trebuie să fie supradeterminat (m > n).")
 
     # Pas 1: QR
-    Q, R = qr_gram_schmidt(A)
-
-    # Pas 2: d = Q^T b
-    d = Q.T @ b
+    if block_size is None:
+        factor = lambda: qr_gram_schmidt(A)
+        method = "gram_schmidt"
+    else:
+        factor = lambda: qr_block_gram_schmidt(A, block_size, dtype)
+        method = f"bcgs2:{block_size}:{np.dtype(dtype).name}"
+
+    if cache is None:
+        Q, R = factor()
+    else:
+        Q, R = cache.get_or_compute(A, method, factor)
+
+    # Pas 2: d = Q^T b, acumulat în float64 și pentru Q stocat în float32
+    d = np.asarray(Q, dtype=np.float64).T @ np.asarray(b, dtype=np.float64)
 
     # Pas 3: R x = d
     x = back_substitution(R, d)
@@ -1,5 +1,8 @@
 import numpy as np
 
+from instrumentation import traced
+from linalg_kernels import solve_triangular
+
 def tort_householder(A):
     """
     Triangularizare cu reflectori Householder (TORT).
@@ -45,52 +48,156 @@ def tort_householder(A):
     return R, U, beta
 
 
+def tort_householder_blocked(A, block_size=32):
+    """
+    Triangularizare Householder pe blocuri (forma WY compactă).
+    Panoul curent de coloane se triangularizează ca în TORT, apoi reflectorii
+    lui se acumulează sub forma I - V T V^T și se aplică pe restul matricei
+    prin produse matrice-matrice.
+    Returnează aceleași R, U, beta ca tort_householder.
+    """
+    A = A.astype(float).copy()
+    m, n = A.shape
+    p = min(m - 1, n)
+
+    U = np.zeros((m, p))
+    beta = np.zeros(p)
+
+    for k0 in range(0, p, block_size):
+        k1 = min(k0 + block_size, p)
+
+        # triangularizăm panoul k0..k1 (doar coloanele din panou)
+        for k in range(k0, k1):
+            col = A[k:, k]
+            norm_col = np.linalg.norm(col)
+
+            if norm_col == 0:
+                beta[k] = 0.0
+                continue
+
+            sigma = np.sign(A[k, k]) * norm_col
+            if sigma == 0:
+                beta[k] = 0.0
+                continue
+
+            U[k, k] = A[k, k] + sigma
+            U[k+1:, k] = A[k+1:, k]
+
+            beta[k] = sigma * U[k, k]
+
+            A[k, k] = -sigma
+            A[k+1:, k] = 0.0
+
+            # reflectorul se aplică dintr-o dată pe restul panoului
+            if k + 1 < k1:
+                tau = (U[k:, k] @ A[k:, k+1:k1]) / beta[k]
+                A[k:, k+1:k1] -= np.outer(U[k:, k], tau)
+
+        # actualizăm matricea rămasă cu Q_bloc^T = I - V T^T V^T
+        if k1 < n:
+            V = U[k0:, k0:k1]
+            T = compact_wy_factor(V, beta[k0:k1])
+            C = A[k0:, k1:]
+            A[k0:, k1:] = C - V @ (T.T @ (V.T @ C))
+
+    R = A
+    return R, U, beta
+
+
+def compact_wy_factor(V, beta):
+    """
+    Construiește factorul triunghiular T din forma WY compactă:
+        H_0 H_1 ... H_{b-1} = I - V T V^T,  H_k = I - u_k u_k^T / beta_k.
+    """
+    b = V.shape[1]
+    T = np.zeros((b, b))
+
+    for j in range(b):
+        if beta[j] == 0:
+            continue
+        tau = 1.0 / beta[j]
+        T[j, j] = tau
+        if j > 0:
+            T[:j, j] = -tau * (T[:j, :j] @ (V[:, :j].T @ V[:, j]))
+
+    return T
+
+
 def apply_householders_to_b(b, U, beta, n):
     """
-    Aplică reflectorii Householder asupra vectorului b.
+    Aplică reflectorii Householder asupra lui b (vector sau matrice m x k).
     Calculează d = Q^T b (fără a forma Q).
     """
     b = b.astype(float).copy()
-    m = len(b)
+    m = b.shape[0]
 
     for k in range(n):
         if beta[k] == 0:
             continue
         tau = (U[k:m, k] @ b[k:m]) / beta[k]
-        b[k:m] -= tau * U[k:m, k]
+        b[k:m] -= np.multiply.outer(U[k:m, k], tau)
 
     return b
 
 
-def back_substitution(R, d):
+def apply_householders_wy(B, U, beta, n, block_size=32):
     """
-    Rezolvă sistem triunghiular superior R x = d.
+    Aplică reflectorii Householder pe blocuri asupra lui B (vector sau
+    matrice m x k, mai multe membre drepte deodată).
+    Calculează D = Q^T B folosind forma WY compactă.
     """
-    n = R.shape[0]
-    x = np.zeros(n)
+    B = B.astype(float).copy()
+    n = min(n, U.shape[1])
+
+    for k0 in range(0, n, block_size):
+        k1 = min(k0 + block_size, n)
+        V = U[k0:, k0:k1]
+        T = compact_wy_factor(V, beta[k0:k1])
+        C = B[k0:]
+        B[k0:] = C - V @ (T.T @ (V.T @ C))
 
-    for i in range(n - 1, -1, -1):
-        if R[i, i] == 0:
-            raise ValueError("Matrice R singulară.")
-        x[i] = (d[i] - R[i, i+1:] @ x[i+1:]) / R[i, i]
+    return B
 
-    return x
 
-def ls_householder(A, b):
+def back_substitution(R, d):
+    """
+    Rezolvă sistem triunghiular superior R x = d.
+    d poate fi și o matrice n x k (k membre drepte).
+    """
+    return solve_triangular(R, d)
+
+@traced("householder.ls_householder")
+def ls_householder(A, b, block_size=None, cache=None):
     """
     Rezolvă problema celor mai mici pătrate:
         min ||Ax - b||
     folosind Householder (TORT + CMMP).
+    b poate fi și o matrice m x k (k ținte rezolvate deodată).
+    Cu block_size setat se folosește varianta pe blocuri (WY compactă).
+    Cu un cache (linalg_kernels.FactorizationCache) reflectorii lui A se
+    refolosesc pentru alte ținte b.
     """
     m, n = A.shape
     if m <= n:
         raise ValueError("Sistemul trebuie să fie supradeterminat (m > n).")
 
     # Pas 1: TORT
-    R, U, beta = tort_householder(A)
+    if block_size is None:
+        factor = lambda: tort_householder(A)
+    else:
+        factor = lambda: tort_householder_blocked(A, block_size)
+
+    if cache is None:
+        R, U, beta = factor()
+    else:
+        # R, U, beta nu depind de block_size
+        R, U, beta = cache.get_or_compute(A, "householder", factor)
 
     # Pas 2: aplicăm reflectorii pe b
-    d = apply_householders_to_b(b, U, beta, n)
+    if block_size is None:
+        d = apply_householders_to_b(b, U, beta, n)
+    else:
+        d = apply_householders_wy(b, U, beta, n, block_size)
 
     # Pas 3: extragem sistemul triunghiular
     R0 = R[:n, :n]
@@ -0,0 +1,167 @@
+"""
+Modul QR incremental
+====================
+Actualizează soluția CMMP când se adaugă sau se elimină tururi, fără a
+refactoriza toată matricea: rotații Givens pentru adăugare și downdating
+(algoritmul LINPACK) pentru eliminare, O(n^2) pe modificare.
+"""
+
+import numpy as np
+from typing import Optional
+
+from gram_schmidt import back_substitution
+from linalg_kernels import solve_triangular
+
+
+class IncrementalLS:
+    """
+    Problemă CMMP actualizabilă rând cu rând.
+    Păstrează factorul triunghiular al matricei extinse [A | b]:
+        Rt = [[R, d], [0, rho]],  cu |rho| = ||Ax - b||.
+    """
+
+    def __init__(self, n_features: int):
+        self.n = n_features
+        self.Rt = np.zeros((n_features + 1, n_features + 1))
+        self.n_rows = 0
+        self._x: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_householder(cls, R: np.ndarray, d: np.ndarray) -> "IncrementalLS":
+        """
+        Pornește de la ieșirea ls_householder / tort_householder:
+        R (m x n, triunghiular sus) și d = Q^T b (lungime m).
+        """
+        n = R.shape[1]
+        model = cls(n)
+        model.Rt[:n, :n] = R[:n, :n]
+        model.Rt[:n, n] = d[:n]
+        model.Rt[n, n] = np.linalg.norm(d[n:])
+        model.n_rows = len(d)
+        return model
+
+    @property
+    def R(self) -> np.ndarray:
+        return self.Rt[:self.n, :self.n]
+
+    @property
+    def d(self) -> np.ndarray:
+        return self.Rt[:self.n, self.n]
+
+    @property
+    def residual_norm(self) -> float:
+        """Norma reziduală curentă ||Ax - b||₂."""
+        return float(abs(self.Rt[self.n, self.n]))
+
+    @property
+    def coefficients(self) -> np.ndarray:
+        """Coeficienții curenți x (R x = d)."""
+        if self._x is None:
+            self._x = back_substitution(self.R, self.d)
+        return self._x
+
+    def predict(self, A: np.ndarray) -> np.ndarray:
+        return A @ self.coefficients
+
+    def scale(self, factor: float) -> None:
+        """
+        Înmulțește toate rândurile de până acum cu factor (ponderare).
+        """
+        self.Rt *= factor
+        self._x = None
+
+    def add_row(self, a: np.ndarray, y: float) -> None:
+        """
+        Adaugă un tur (rândul a, ținta y) cu n+1 rotații Givens.
+        """
+        row = np.append(np.asarray(a, dtype=float), float(y))
+        Rt = self.Rt
+
+        for k in range(self.n + 1):
+            if row[k] == 0:
+                continue
+            r = np.hypot(Rt[k, k], row[k])
+            c = Rt[k, k] / r
+            s = row[k] / r
+
+            Rk = Rt[k, k:].copy()
+            Rt[k, k:] = c * Rk + s * row[k:]
+            row[k:] = -s * Rk + c * row[k:]
+
+        self.n_rows += 1
+        self._x = None
+
+    def delete_row(self, a: np.ndarray, y: float) -> None:
+        """
+        Elimină un tur adăugat anterior (de ex. IsAccurate devenit False).
+        Downdating Cholesky: Rt'^T Rt' = Rt^T Rt - z z^T, z = [a, y].
+        Dacă reziduul rho (înainte sau după eliminare) e numeric 0, Rt e
+        singular: se face downdating doar pe R, iar d și rho se recalculează
+        din ecuațiile normale.
+        """
+        a = np.asarray(a, dtype=float)
+        y = float(y)
+        Rt = self.Rt
+        n = self.n
+
+        if np.any(np.diag(self.R) == 0):
+            raise ValueError("Downdating imposibil: factorul R curent este singular.")
+
+        rho = Rt[n, n]
+        exact_fit = abs(rho) <= (n + 1) * np.finfo(float).eps * np.abs(np.diag(Rt)).max()
+        if not exact_fit:
+            try:
+                _downdate(Rt, np.append(a, y))
+            except ValueError:
+                # rho' = 0 (sau rândul nu e în problemă): decide calea pe R
+                exact_fit = True
+        if exact_fit:
+            R_old = self.R.copy()
+            d_old = self.d.copy()
+            _downdate(Rt[:n, :n], a)
+            # R'^T d' = R^T d - a y,  rho'^2 = ||b||^2 - y^2 - ||d'||^2
+            d_new = solve_triangular(self.R, R_old.T @ d_old - a * y, trans=True)
+            rho_sq = rho ** 2 + d_old @ d_old - y ** 2 - d_new @ d_new
+            tol = (n + 1) * np.finfo(float).eps * (d_old @ d_old + y ** 2)
+            if rho_sq < -tol:
+                raise ValueError("Downdating imposibil: rândul nu aparține problemei curente.")
+            Rt[:n, n] = d_new
+            Rt[n, n] = np.sqrt(max(rho_sq, 0.0))
+
+        self.n_rows -= 1
+        self._x = None
+
+
+def _downdate(T: np.ndarray, z: np.ndarray) -> None:
+    """
+    Downdating pe loc al factorului triunghiular T (LINPACK):
+    T'^T T' = T^T T - z z^T, cu T nesingular. La eroare T rămâne neschimbat.
+    """
+    N = T.shape[0]
+
+    # Pas 1: T^T p = z
+    p = solve_triangular(T, z, trans=True)
+
+    alpha_sq = 1.0 - p @ p
+    if alpha_sq <= 0:
+        raise ValueError("Downdating imposibil: rândul nu aparține problemei curente.")
+
+    # Pas 2: rotațiile care anulează p, de jos în sus
+    alpha = np.sqrt(alpha_sq)
+    c = np.zeros(N)
+    s = np.zeros(N)
+    for i in range(N - 1, -1, -1):
+        scale = alpha + abs(p[i])
+        a_ = alpha / scale
+        b_ = p[i] / scale
+        norm = np.hypot(a_, b_)
+        c[i] = a_ / norm
+        s[i] = b_ / norm
+        alpha = scale * norm
+
+    # Pas 3: aplicăm rotațiile pe rândurile lui T
+    xx = np.zeros(N)
+    for i in range(N - 1, -1, -1):
+        t = c[i] * xx + s[i] * T[i]
+        T[i] = c[i] * T[i] - s[i] * xx
+        xx = t
@@ -0,0 +1,358 @@
+"""
+Instrumentare
+=============
+Măsoară etapele pipeline-ului (încărcare sesiune, tururi, telemetrie,
+feature-uri, solveri QR, metrici, figuri): durata și memoria fiecărui span,
+plus numărători de cache hit / miss. Urmele se exportă ca JSON lines sau în
+formatul Chrome trace (chrome://tracing, Perfetto).
+
+Pornire: F1_TRACE=1 (F1_TRACE=memory adaugă tracemalloc), sau enable().
+Cu F1_TRACE_FILE=urme.json (.jsonl) urmele se scriu la ieșirea procesului.
+Oprit, fiecare span costă doar un test al unui flag global.
+Colectarea e a procesului; set_scope() etichetează span-urile și numărătorii
+contextului curent (de ex. o sesiune Streamlit), iar citirea, exportul și
+reset-ul pot fi restrânse la o etichetă. Vârful de memorie rămâne al
+întregului proces.
+Memoria urmelor e mărginită: fiecare etichetă (și span-urile fără etichetă,
+de ex. din firele prefetch, serviciul de predicție sau pool-ul de randare)
+păstrează cel mult F1_TRACE_MAX_SPANS span-uri recente, se țin cel mult
+MAX_SCOPES etichete (cea mai veche se renunță), iar o etichetă dispare la
+export sau la reset (noul rerun al sesiunii).
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+_enabled = False
+_memory = False
+
+# Câte span-uri recente păstrează fiecare etichetă și câte etichete se țin
+MAX_SPANS = int(os.getenv("F1_TRACE_MAX_SPANS", "10000"))
+MAX_SCOPES = 64
+
+_lock = threading.Lock()
+# etichetă -> span-uri / numărători; ordinea cheilor e cea a creării
+_spans: Dict[Optional[str], deque] = {}
+_counters: Dict[Optional[str], Dict[str, int]] = {}
+_local = threading.local()
+_origin_ns = time.perf_counter_ns()
+
+# Eticheta contextului curent (de ex. sesiunea Streamlit); None = fără etichetă
+_scope: ContextVar[Optional[str]] = ContextVar("f1_trace_scope", default=None)
+
+# Span-ul gol, refolosit când instrumentarea e oprită
+_NULL_SPAN = nullcontext()
+
+
+def enable(memory: bool = False) -> None:
+    """Pornește colectarea; cu memory=True și memoria (tracemalloc, mai lent)."""
+    global _enabled, _memory
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_scope(scope: Optional[str]) -> None:
+    """Etichetează span-urile și numărătorii contextului curent (fir / task)."""
+    _scope.set(scope)
+
+
+def get_scope() -> Optional[str]:
+    return _scope.get()
+
+
+def reset(scope: Optional[str] = None) -> None:
+    """
+    Golește span-urile și numărătorii; cu scope doar pe cei ai etichetei
+    (de ex. la fiecare rerun al unei sesiuni Streamlit).
+    """
+    global _origin_ns
+    with _lock:
+        if scope is None:
+            _spans.clear()
+            _counters.clear()
+            _origin_ns = time.perf_counter_ns()
+        else:
+            _drop_scope_locked(scope)
+
+
+def _drop_scope_locked(scope: Optional[str]) -> None:
+    _spans.pop(scope, None)
+    _counters.pop(scope, None)
+
+
+def _scope_spans_locked(scope: Optional[str]) -> deque:
+    """Span-urile etichetei (create la nevoie); renunță la etichetele vechi."""
+    records = _spans.get(scope)
+    if records is None:
+        records = _spans[scope] = deque(maxlen=MAX_SPANS)
+        labelled = [key for key in _spans if key is not None]
+        for old in labelled[:max(len(labelled) - MAX_SCOPES, 0)]:
+            _drop_scope_locked(old)
+    return records
+
+
+class _Span:
+    """Un interval măsurat; se înregistrează la ieșire."""
+
+    __slots__ = ("name", "attrs", "start_ns", "mem_start", "depth")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.depth = len(stack)
+        stack.append(self.name)
+
+        self.mem_start = None
+        if _memory and tracemalloc.is_tracing():
+            if self.depth == 0:
+                tracemalloc.reset_peak()
+            self.mem_start = tracemalloc.get_traced_memory()[0]
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        stack = _local.stack
+        stack.pop()
+
+        record = {
+            "name": self.name,
+            "start_us": (self.start_ns - _origin_ns) / 1e3,
+            "duration_ms": (end_ns - self.start_ns) / 1e6,
+            "thread": threading.get_ident(),
+            "depth": self.depth,
+            "parent": stack[-1] if stack else None,
+        }
+        scope = _scope.get()
+        if scope is not None:
+            record["scope"] = scope
+        if self.mem_start is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            record["mem_delta_bytes"] = current - self.mem_start
+            # vârful e corect doar pentru span-urile de nivel 0 (reset_peak) și e
+            # al întregului proces: cu mai multe fire include și alocările lor
+            if self.depth == 0:
+                record["mem_peak_bytes"] = peak - self.mem_start
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record["attrs"] = self.attrs
+
+        with _lock:
+            _scope_spans_locked(scope).append(record)
+        return False
+
+
+def span(name: str, **attrs):
+    """Context manager pentru un span; no-op când instrumentarea e oprită."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: fiecare apel al funcției devine un span."""
+    def decorator(fn: Callable) -> Callable:
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1) -> None:
+    """Incrementează un numărător (de ex. 'render_cache.hit')."""
+    if not _enabled:
+        return
+    scope = _scope.get()
+    with _lock:
+        _scope_spans_locked(scope)
+        values = _counters.setdefault(scope, {})
+        values[name] = values.get(name, 0) + n
+
+
+def spans(scope: Optional[str] = None) -> List[dict]:
+    """Span-urile înregistrate; cu scope doar cele ale etichetei."""
+    with _lock:
+        if scope is None:
+            return sorted((r for records in _spans.values() for r in records), key=lambda r: r["start_us"])
+        return list(_spans.get(scope, ()))
+
+
+def counters(scope: Optional[str] = None) -> Dict[str, int]:
+    """Numărătorii (însumați pe etichete); cu scope doar cei ai etichetei."""
+    result: Dict[str, int] = {}
+    with _lock:
+        for key_scope, values in _counters.items():
+            if scope is None or key_scope == scope:
+                for name, value in values.items():
+                    result[name] = result.get(name, 0) + value
+    return result
+
+
+def summary(scope: Optional[str] = None) -> List[dict]:
+    """
+    Span-urile agregate pe nume: apeluri, timp total / mediu / maxim și
+    timpul propriu (fără span-urile copil), ordonate după timpul total.
+    """
+    records = spans(scope)
+    child_ms: Dict[int, float] = {}
+    stats: Dict[str, dict] = {}
+
+    # timpul copiilor se scade din părinte (același fir, nivel + 1, în interval)
+    by_thread: Dict[int, List[dict]] = {}
+    for r in records:
+        by_thread.setdefault(r["thread"], []).append(r)
+    for thread_records in by_thread.values():
+        thread_records.sort(key=lambda r: r["start_us"])
+        open_spans: List[dict] = []
+        for r in thread_records:
+            end = r["start_us"] + r["duration_ms"] * 1e3
+            while open_spans and open_spans[-1]["start_us"] + open_spans[-1]["duration_ms"] * 1e3 < end:
+                open_spans.pop()
+            if open_spans:
+                parent = open_spans[-1]
+                child_ms[id(parent)] = child_ms.get(id(parent), 0.0) + r["duration_ms"]
+            open_spans.append(r)
+
+    for r in records:
+        s = stats.setdefault(r["name"], {
+            "name": r["name"], "calls": 0, "total_ms": 0.0, "self_ms": 0.0,
+            "max_ms": 0.0, "mem_peak_bytes": None,
+        })
+        s["calls"] += 1
+        s["total_ms"] += r["duration_ms"]
+        s["self_ms"] += r["duration_ms"] - child_ms.get(id(r), 0.0)
+        s["max_ms"] = max(s["max_ms"], r["duration_ms"])
+        if r.get("mem_peak_bytes") is not None:
+            s["mem_peak_bytes"] = max(s["mem_peak_bytes"] or 0, r["mem_peak_bytes"])
+
+    result = sorted(stats.values(), key=lambda s: s["total_ms"], reverse=True)
+    for s in result:
+        s["mean_ms"] = s["total_ms"] / s["calls"]
+    return result
+
+
+def _take(scope: Optional[str]) -> Tuple[List[dict], Dict[str, int]]:
+    """Span-urile și numărătorii etichetei (toți, fără scope), scoși din memorie."""
+    with _lock:
+        if scope is None:
+            records = sorted((r for rs in _spans.values() for r in rs), key=lambda r: r["start_us"])
+            totals: Dict[str, int] = {}
+            for values in _counters.values():
+                for name, value in values.items():
+                    totals[name] = totals.get(name, 0) + value
+            _spans.clear()
+            _counters.clear()
+            return records, totals
+        records = list(_spans.get(scope, ()))
+        totals = dict(_counters.get(scope, {}))
+        _drop_scope_locked(scope)
+        return records, totals
+
+
+def export_jsonl(path: str, scope: Optional[str] = None) -> None:
+    """
+    Adaugă span-urile și numărătorii în fișier, câte un obiect JSON pe linie.
+    Urmele exportate (ale etichetei sau toate) se scot din memorie.
+    """
+    records, totals = _take(scope)
+    pid = os.getpid()
+    with open(path, "a") as f:
+        for r in records:
+            f.write(json.dumps({"type": "span", "pid": pid, **r}) + "\n")
+        f.write(json.dumps({"type": "counters", "pid": pid, "counters": totals}) + "\n")
+
+
+def chrome_trace(scope: Optional[str] = None) -> dict:
+    """Urmele în formatul Chrome trace: evenimente complete 'X' și contoare 'C'."""
+    return _chrome_trace(spans(scope), counters(scope))
+
+
+def _chrome_trace(records: List[dict], totals: Dict[str, int]) -> dict:
+    pid = os.getpid()
+    events = []
+    last_us = 0.0
+    for r in records:
+        args = dict(r.get("attrs", {}))
+        for key in ("mem_delta_bytes", "mem_peak_bytes", "error"):
+            if key in r:
+                args[key] = r[key]
+        events.append({
+            "name": r["name"],
+            "ph": "X",
+            "ts": r["start_us"],
+            "dur": r["duration_ms"] * 1e3,
+            "pid": pid,
+            "tid": r["thread"],
+            "args": args,
+        })
+        last_us = max(last_us, r["start_us"] + r["duration_ms"] * 1e3)
+    for name, value in totals.items():
+        events.append({"name": name, "ph": "C", "ts": last_us, "pid": pid, "args": {"value": value}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path: str, scope: Optional[str] = None) -> None:
+    """
+    Scrie urmele în formatul Chrome trace (chrome://tracing, Perfetto).
+    Urmele exportate (ale etichetei sau toate) se scot din memorie.
+    """
+    trace = _chrome_trace(*_take(scope))
+    with open(path, "w") as f:
+        json.dump(trace, f)
+
+
+def export(path: str) -> None:
+    """Export după extensie: .jsonl -> JSON lines, altfel Chrome trace."""
+    if path.endswith(".jsonl"):
+        export_jsonl(path)
+    else:
+        export_chrome_trace(path)
+
+
+def _configure_from_env() -> None:
+    mode = os.getenv("F1_TRACE", "").strip().lower()
+    if mode in ("", "0", "false", "off"):
+        return
+    enable(memory=(mode == "memory"))
+    trace_file = os.getenv("F1_TRACE_FILE")
+    if trace_file:
+        atexit.register(export, trace_file)
+
+
+_configure_from_env()
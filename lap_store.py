@@ -0,0 +1,177 @@
+"""
+Depozit columnar pentru tururi
+==============================
+Salvează tabelele de tururi și de vreme ale unei sesiuni (an, eveniment,
+tip sesiune) pe disc, în format Arrow IPC necomprimat, și le citește înapoi
+prin memory mapping. Rulările ulterioare nu mai parsează cache-ul FastF1.
+"""
+
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+
+# Câmpurile din session.event păstrate alături de tabele
+EVENT_FIELDS = ["EventName", "Location", "Country", "RoundNumber"]
+
+
+def get_store_dir() -> Path:
+    """
+    Returnează (sau creează) directorul depozitului columnar.
+    Implicit: <cache FastF1>/tables, sau variabila de mediu F1_TABLE_STORE.
+    """
+    env_store = os.getenv("F1_TABLE_STORE")
+    if env_store:
+        store_dir = Path(env_store)
+    else:
+        from data_loader import get_cache_dir
+        store_dir = Path(get_cache_dir()) / "tables"
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    return store_dir
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+
+def session_path(year: int, event_name: str, session_type: str) -> Path:
+    """Directorul unei sesiuni în depozit."""
+    return get_store_dir() / str(year) / _slug(event_name) / _slug(session_type)
+
+
+def _write_atomic(path: Path, write_fn) -> None:
+    """
+    Scrie într-un fișier temporar din același director și îl redenumește,
+    ca alte procese să nu vadă niciodată un fișier pe jumătate scris.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    os.close(fd)
+    try:
+        write_fn(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# pyarrow se importă la prima citire/scriere, nu la importul modulului
+def _write_table(df: pd.DataFrame, path: Path) -> None:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(pd.DataFrame(df), preserve_index=False)
+    # necomprimat și într-un singur record batch, ca citirea prin memory map
+    # să nu copieze datele (coloanele în mai multe bucăți se concatenează)
+    _write_atomic(path, lambda tmp: feather.write_feather(
+        table, tmp, compression="uncompressed", chunksize=max(table.num_rows, 1)
+    ))
+
+
+def _read_table(path: Path) -> pd.DataFrame:
+    import pyarrow.feather as feather
+
+    table = feather.read_table(str(path), memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def has_session(year: int, event_name: str, session_type: str) -> bool:
+    """Verifică dacă sesiunea este deja în depozit."""
+    return (session_path(year, event_name, session_type) / "meta.json").exists()
+
+
+def write_table(year: int, event_name: str, session_type: str, name: str, df: pd.DataFrame) -> None:
+    """
+    Adaugă sau înlocuiește un singur tabel (de ex. 'weather') al unei sesiuni.
+    """
+    path = session_path(year, event_name, session_type)
+    path.mkdir(parents=True, exist_ok=True)
+    _write_table(df, path / f"{name}.arrow")
+
+
+def write_session(year: int, event_name: str, session_type: str, session) -> Path:
+    """
+    Salvează tururile, vremea și informațiile despre eveniment ale unei
+    sesiuni FastF1 încărcate.
+    """
+    path = session_path(year, event_name, session_type)
+    path.mkdir(parents=True, exist_ok=True)
+
+    _write_table(session.laps, path / "laps.arrow")
+
+    # vremea lipsește dacă sesiunea a fost încărcată fără weather=True
+    try:
+        weather = session.weather_data
+    except Exception:
+        weather = None
+    if weather is not None:
+        _write_table(weather, path / "weather.arrow")
+
+    event = {}
+    for field in EVENT_FIELDS:
+        try:
+            value = session.event[field]
+        except Exception:
+            continue
+        event[field] = value.item() if hasattr(value, "item") else value
+    event["year"] = int(year)
+
+    meta = {
+        "year": int(year),
+        "event_name": event_name,
+        "session_type": session_type,
+        "session_name": getattr(session, "name", session_type),
+        "event": event,
+    }
+    # meta.json se scrie ultimul: existența lui marchează sesiunea completă
+    _write_atomic(path / "meta.json", lambda tmp: Path(tmp).write_text(json.dumps(meta, default=str)))
+
+    return path
+
+
+class StoredSession:
+    """
+    Sesiune citită din depozit. Expune laps, weather_data și event la fel ca
+    fastf1.core.Session. Sesiunea FastF1 propriu-zisă (telemetrie, poziții)
+    se atașează doar la cerere, în fastf1_session.
+    """
+
+    def __init__(self, year: int, event_name: str, session_type: str,
+                 laps: pd.DataFrame, weather_data: Optional[pd.DataFrame], meta: dict):
+        self.year = year
+        self.event_name = event_name
+        self.session_type = session_type
+        self.laps = laps
+        self.weather_data = weather_data
+        self.name = meta.get("session_name", session_type)
+        self.event = pd.Series(meta.get("event", {}))
+        self.fastf1_session = None
+
+    def __getstate__(self):
+        # sesiunea FastF1 atașată nu se serializează împreună cu tabelele
+        state = self.__dict__.copy()
+        state["fastf1_session"] = None
+        return state
+
+
+def read_session(year: int, event_name: str, session_type: str) -> Optional[StoredSession]:
+    """
+    Citește sesiunea din depozit (memory-mapped) sau None dacă lipsește.
+    """
+    path = session_path(year, event_name, session_type)
+    meta_path = path / "meta.json"
+    if not meta_path.exists():
+        return None
+
+    meta = json.loads(meta_path.read_text())
+    laps = _read_table(path / "laps.arrow")
+    weather_path = path / "weather.arrow"
+    weather = _read_table(weather_path) if weather_path.exists() else None
+
+    return StoredSession(year, event_name, session_type, laps, weather, meta)
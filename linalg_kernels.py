@@ -0,0 +1,123 @@
+"""
+Nuclee de algebră liniară
+=========================
+Rezolvări triunghiulare comune tuturor solverilor (mai multe membre drepte
+deodată, cu R sau R^T) și un cache mic de factorizări, cheiat după
+conținutul lui A, pentru refit pe altă țintă fără refactorizare.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from instrumentation import count
+
+
+def solve_triangular(
+    R: np.ndarray,
+    B: np.ndarray,
+    trans: bool = False,
+    block_size: int = 64
+) -> np.ndarray:
+    """
+    Rezolvă R X = B (trans=False) sau R^T X = B (trans=True), cu R
+    triunghiular superior n x n și B vector (n) sau matrice (n x k).
+    Pe blocuri de rânduri: contribuția blocurilor deja rezolvate se scade
+    printr-un produs matrice-matrice, iar în interiorul blocului fiecare
+    rând se rezolvă pentru toate membrele drepte deodată.
+    """
+    n = R.shape[0]
+    diag = np.diag(R)
+    if np.any(diag == 0):
+        raise ValueError("Matrice R singulară.")
+
+    X = np.array(B, dtype=np.result_type(R, B, np.float64), copy=True)
+
+    if not trans:
+        # substituție înapoi, blocurile de jos în sus
+        for k1 in range(n, 0, -block_size):
+            k0 = max(k1 - block_size, 0)
+            if k1 < n:
+                X[k0:k1] -= R[k0:k1, k1:] @ X[k1:]
+            for i in range(k1 - 1, k0 - 1, -1):
+                if i + 1 < k1:
+                    X[i] -= R[i, i+1:k1] @ X[i+1:k1]
+                X[i] /= diag[i]
+    else:
+        # R^T e triunghiular inferior: substituție înainte, blocurile de sus în jos
+        for k0 in range(0, n, block_size):
+            k1 = min(k0 + block_size, n)
+            if k0 > 0:
+                X[k0:k1] -= R[:k0, k0:k1].T @ X[:k0]
+            for i in range(k0, k1):
+                if i > k0:
+                    X[i] -= R[k0:i, i] @ X[k0:i]
+                X[i] /= diag[i]
+
+    return X
+
+
+def array_hash(A: np.ndarray) -> str:
+    """Hash de conținut (formă, tip, octeți) al unui array."""
+    arr = np.ascontiguousarray(A)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{arr.dtype}{arr.shape}".encode())
+    h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+class FactorizationCache:
+    """
+    Cache LRU de factorizări (de ex. (R, U, beta) sau (Q, R)), cheiat după
+    metoda de factorizare și conținutul lui A.
+    Array-urile se păstrează read-only: sunt partajate între apelanți, deci o
+    modificare pe loc ar corupe rezultatele următoare (se copiază înainte).
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count("factor_cache.hit")
+                return self._entries[key]
+            self.misses += 1
+            count("factor_cache.miss")
+            return None
+
+    def put(self, key: str, factors: tuple) -> None:
+        for item in factors:
+            if isinstance(item, np.ndarray):
+                item.setflags(write=False)
+        with self._lock:
+            self._entries[key] = factors
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, A: np.ndarray, method: str, factor_fn: Callable[[], tuple]) -> tuple:
+        """Factorizarea lui A cu metoda dată, calculată doar la prima cerere."""
+        key = f"{method}:{array_hash(A)}"
+        factors = self.get(key)
+        if factors is None:
+            factors = factor_fn()
+            self.put(key, factors)
+        return factors
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache-ul implicit, partajat de solveri
+FACTOR_CACHE = FactorizationCache()
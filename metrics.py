@@ -5,8 +5,13 @@ Calculează metrici de evaluare pentru modele de regresie.
 """
 
 import numpy as np
+from functools import cached_property
 
+from instrumentation import traced
+from linalg_kernels import solve_triangular
 
+
+@traced()
 def compute_residual_norm(A: np.ndarray, x: np.ndarray, b: np.ndarray) -> float:
     """
     Calculează ||Ax - b||₂ (norma L2 a rezidualilor).
@@ -15,6 +20,7 @@ def compute_residual_norm(A: np.ndarray, x: np.ndarray, b: np.ndarray) -> float:
     return np.linalg.norm(residuals, ord=2)
 
 
+@traced()
 def compute_rmse(A: np.ndarray, x: np.ndarray, b: np.ndarray) -> float:
     """
     Calculează RMSE: sqrt(mean((Ax - b)^2)).
@@ -24,6 +30,7 @@ def compute_rmse(A: np.ndarray, x: np.ndarray, b: np.ndarray) -> float:
     return np.sqrt(mse)
 
 
+@traced()
 def compute_condition_number(A: np.ndarray) -> float:
     """
     Calculează numărul de condiție al matricei A.
@@ -34,3 +41,119 @@ def compute_condition_number(A: np.ndarray) -> float:
     except:
         return np.inf
 
+
+def estimate_condition_number(R: np.ndarray, max_iter: int = 5) -> float:
+    """
+    Estimează κ₁(R) = ||R||₁ ||R^{-1}||₁ fără SVD (estimatorul Hager/Higham):
+    câteva rezolvări triunghiulare cu R și R^T, O(n^2) fiecare.
+    Pentru A = QR, κ₂(A) = κ₂(R), iar κ₁(R) diferă de κ₂(R) cu cel mult un factor n.
+    """
+    n = R.shape[0]
+    if np.any(np.diag(R) == 0):
+        return np.inf
+
+    norm_R = np.abs(R).sum(axis=0).max()
+
+    x = np.full(n, 1.0 / n)
+    estimate = 0.0
+    for _ in range(max_iter):
+        y = solve_triangular(R, x)
+        new_estimate = np.abs(y).sum()
+        xi = np.where(y >= 0, 1.0, -1.0)
+        z = solve_triangular(R, xi, trans=True)
+        j = int(np.argmax(np.abs(z)))
+        if new_estimate <= estimate or np.abs(z[j]) <= z @ x:
+            estimate = max(estimate, new_estimate)
+            break
+        estimate = new_estimate
+        x = np.zeros(n)
+        x[j] = 1.0
+
+    return float(norm_R * estimate)
+
+
+class RegressionDiagnostics:
+    """
+    Diagnostice calculate o singură dată din ieșirea solverului (x, R, d).
+    Fiecare statistică se calculează la prima cerere și se memorează.
+    - R: factorul triunghiular (n x n sau m x n, ca la ls_householder);
+    - d: Q^T b (lungime m la Householder -> norma reziduală fără A @ x);
+    - Q: Q subțire, dacă solverul îl are (Gram–Schmidt); altfel A R^{-1}.
+    """
+
+    def __init__(
+        self,
+        A: np.ndarray,
+        b: np.ndarray,
+        x: np.ndarray,
+        R: np.ndarray,
+        d: np.ndarray = None,
+        Q: np.ndarray = None
+    ):
+        self.A = A
+        self.b = b
+        self.x = x
+        self.m, self.n = A.shape
+        self.R = R[:self.n, :self.n]
+        self.d = d
+        self._Q = Q
+
+    @cached_property
+    def residuals(self) -> np.ndarray:
+        """b - Ax (singurul produs A @ x)."""
+        return self.b - self.A @ self.x
+
+    @cached_property
+    def residual_norm(self) -> float:
+        if self.d is not None and len(self.d) == self.m:
+            # Householder: ||Ax - b|| = ||d[n:]||
+            return float(np.linalg.norm(self.d[self.n:]))
+        return float(np.linalg.norm(self.residuals))
+
+    @cached_property
+    def rmse(self) -> float:
+        return float(self.residual_norm / np.sqrt(self.m))
+
+    @cached_property
+    def r_squared(self) -> float:
+        tss = np.sum((self.b - np.mean(self.b)) ** 2)
+        if tss == 0:
+            return np.nan
+        return float(1.0 - self.residual_norm ** 2 / tss)
+
+    @cached_property
+    def condition_estimate(self) -> float:
+        """Estimarea numărului de condiție din R (fără SVD)."""
+        return estimate_condition_number(self.R)
+
+    @cached_property
+    def Q(self) -> np.ndarray:
+        """Q subțire (m x n)."""
+        if self._Q is not None:
+            return self._Q
+        # R^T Q^T = A^T, toate rândurile deodată
+        return solve_triangular(self.R, self.A.T, trans=True).T
+
+    @cached_property
+    def leverage(self) -> np.ndarray:
+        """h_ii = ||Q_i||² pentru fiecare tur."""
+        return np.sum(self.Q ** 2, axis=1)
+
+    @cached_property
+    def cooks_distance(self) -> np.ndarray:
+        """D_i = e_i² / (p s²) · h_ii / (1 - h_ii)²."""
+        dof = self.m - self.n
+        s2 = self.residual_norm ** 2 / dof if dof > 0 else np.nan
+        h = self.leverage
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.residuals ** 2 / (self.n * s2) * h / (1 - h) ** 2
+
+    @traced()
+    def summary(self) -> dict:
+        """Statisticile scalare."""
+        return {
+            "residual_norm": self.residual_norm,
+            "rmse": self.rmse,
+            "r_squared": self.r_squared,
+            "condition_estimate": self.condition_estimate,
+        }
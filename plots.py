@@ -4,69 +4,268 @@ Modul de plotare
 Creează vizualizări matplotlib pentru analiza tururilor F1.
 """
 
-import matplotlib.pyplot as plt
+import contextvars
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
-from typing import List, Optional
-import streamlit as st
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
+
+from instrumentation import count, span, traced
+from track_outline import DEFAULT_TOLERANCE, load_outline, outline_key, save_outline
+
+
+# Numărul maxim de puncte desenate pe o serie (peste el se aplică LTTB)
+MAX_PLOT_POINTS = 2000
+
+# Numărul de figuri randate păstrate în cache (LRU)
+RENDER_CACHE_SIZE = 64
+
+_render_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+def _new_figure(figsize: Tuple[float, float]):
+    """
+    Figură fără pyplot: nu rămâne în starea globală și poate fi randată
+    din fire de execuție diferite.
+    """
+    # matplotlib se importă doar la prima figură
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    return fig, ax
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: alege n_out indici care păstrează forma
+    vizuală a seriei (vârfuri, văi). Primul și ultimul punct se păstrează.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    idx = np.zeros(n_out, dtype=int)
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # media găleții următoare (ultima găleată are doar ultimul punct)
+        nxt_start = stop
+        nxt_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_start:nxt_stop].mean()
+        avg_y = y[nxt_start:nxt_stop].mean()
+
+        # aria triunghiului (a, candidat, media următoare), vectorizat pe găleată
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+
+    return idx
+
+
+def _downsample(x: np.ndarray, y: np.ndarray, max_points: Optional[int]):
+    if max_points is None or len(x) <= max_points:
+        return x, y
+    idx = lttb_downsample(x, y, max_points)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+class _Unhashable(TypeError):
+    """Argumentul nu are o identitate stabilă; figura nu se pune în cache."""
+
+
+def _content_hash(value, h) -> None:
+    """Adaugă conținutul unui argument (array, tabel, listă, scalar, sesiune) în hash."""
+    if isinstance(value, pd.DataFrame):
+        h.update(f"DataFrame{value.shape}{list(value.columns)}".encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (np.ndarray, pd.Series)):
+        arr = np.ascontiguousarray(np.asarray(value))
+        h.update(f"{arr.dtype}{arr.shape}".encode())
+        if arr.dtype == object:
+            h.update(repr(arr.tolist()).encode())
+        else:
+            h.update(arr.tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _content_hash(item, h)
+    elif value is None or isinstance(value, (str, bytes, int, float, complex, bool, np.generic)):
+        h.update(repr(value).encode())
+    else:
+        from data_loader import session_identity
+        identity = session_identity(value)
+        if identity is None:
+            # repr-ul implicit conține adresa obiectului: cheia n-ar fi stabilă
+            raise _Unhashable(f"Cannot cache a figure for argument of type {type(value).__name__}")
+        h.update(f"session|{identity!r}".encode())
+
+
+def _figure_bytes(fig, fmt: str, dpi: int) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    return buffer.getvalue()
+
+
+def render_figure(
+    plot_fn: Callable,
+    *args,
+    fmt: str = "png",
+    dpi: int = 100,
+    **kwargs
+) -> Optional[bytes]:
+    """
+    Randează figura plot_fn(*args, **kwargs) în PNG/SVG și o păstrează într-un
+    cache LRU cheiat după conținutul argumentelor; la aceleași date, figura
+    nu se mai construiește. Sesiunile intră în cheie prin identitatea lor
+    (data_loader.session_identity); argumentele fără identitate stabilă
+    ocolesc cache-ul.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{plot_fn.__module__}.{plot_fn.__qualname__}|{fmt}|{dpi}".encode())
+    try:
+        _content_hash(list(args), h)
+        _content_hash(sorted(kwargs.items()), h)
+    except _Unhashable:
+        count("render_cache.bypass")
+        with span("plots.render_figure", plot=plot_fn.__name__, fmt=fmt):
+            fig = plot_fn(*args, **kwargs)
+            return None if fig is None else _figure_bytes(fig, fmt, dpi)
+    key = h.hexdigest()
+
+    with _render_cache_lock:
+        if key in _render_cache:
+            _render_cache.move_to_end(key)
+            count("render_cache.hit")
+            return _render_cache[key]
+    count("render_cache.miss")
+
+    with span("plots.render_figure", plot=plot_fn.__name__, fmt=fmt):
+        fig = plot_fn(*args, **kwargs)
+        if fig is None:
+            return None
+        data = _figure_bytes(fig, fmt, dpi)
+
+    with _render_cache_lock:
+        _render_cache[key] = data
+        _render_cache.move_to_end(key)
+        while len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+
+    return data
+
+
+def render_figures(
+    jobs: Sequence[Tuple[Callable, tuple, dict]],
+    fmt: str = "png",
+    dpi: int = 100,
+    max_workers: int = 4
+) -> List[Optional[bytes]]:
+    """
+    Randează mai multe figuri în paralel: jobs = [(plot_fn, args, kwargs), ...].
+    Returnează imaginile în ordinea job-urilor.
+    """
+    def _run(job):
+        plot_fn, args, kwargs = job
+        return render_figure(plot_fn, *args, fmt=fmt, dpi=dpi, **kwargs)
+
+    # firele din pool primesc contextul apelantului (eticheta instrumentării)
+    contexts = [contextvars.copy_context() for _ in jobs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda ctx, job: ctx.run(_run, job), contexts, jobs))
 
 
+def clear_render_cache() -> None:
+    with _render_cache_lock:
+        _render_cache.clear()
+
+
+@traced()
 def plot_predictions_vs_actual(
     actual: np.ndarray,
     predicted: np.ndarray,
-    lap_numbers: Optional[np.ndarray] = None
-) -> plt.Figure:
+    lap_numbers: Optional[np.ndarray] = None,
+    max_points: Optional[int] = MAX_PLOT_POINTS
+) -> "Figure":
     """
     Plotează timpii reali versus timpii preziși pe tururi.
+    Seriile mai lungi decât max_points se reduc cu LTTB.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _new_figure(figsize=(10, 6))
     
     if lap_numbers is None:
         lap_numbers = np.arange(1, len(actual) + 1)
     
-    ax.plot(lap_numbers, actual, 'o-', label='Actual', alpha=0.7, markersize=6)
-    ax.plot(lap_numbers, predicted, 's-', label='Predicted', alpha=0.7, markersize=6)
+    x_act, y_act = _downsample(lap_numbers, actual, max_points)
+    x_pred, y_pred = _downsample(lap_numbers, predicted, max_points)
+    ax.plot(x_act, y_act, 'o-', label='Actual', alpha=0.7, markersize=6)
+    ax.plot(x_pred, y_pred, 's-', label='Predicted', alpha=0.7, markersize=6)
     ax.set_xlabel('Lap Number')
     ax.set_ylabel('Lap Time (seconds)')
     ax.set_title('Actual vs Predicted Lap Times')
     ax.legend()
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
+@traced()
 def plot_errors(
     errors: np.ndarray,
-    lap_numbers: Optional[np.ndarray] = None
-) -> plt.Figure:
+    lap_numbers: Optional[np.ndarray] = None,
+    max_points: Optional[int] = MAX_PLOT_POINTS
+) -> "Figure":
     """
     Plotează erorile de predicție pe fiecare tur (linie).
+    Seriile mai lungi decât max_points se reduc cu LTTB.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _new_figure(figsize=(10, 6))
     
     if lap_numbers is None:
         lap_numbers = np.arange(1, len(errors) + 1)
     
-    ax.plot(lap_numbers, errors, 'o-', alpha=0.7, color='coral', markersize=6)
+    x_err, y_err = _downsample(lap_numbers, errors, max_points)
+    ax.plot(x_err, y_err, 'o-', alpha=0.7, color='coral', markersize=6)
     ax.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
     ax.set_xlabel('Lap Number')
     ax.set_ylabel('Error (seconds)')
     ax.set_title('Prediction Error per Lap')
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
+@traced()
 def plot_coefficients(
     coefficients: np.ndarray,
     feature_names: List[str]
-) -> plt.Figure:
+) -> "Figure":
     """
     Afișează magnitudinea coeficienților de regresie (bar chart).
     """
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig, ax = _new_figure(figsize=(12, 6))
     
     # Folosim valorile absolute (magnitudini)
     abs_coeffs = np.abs(coefficients)
@@ -82,67 +281,95 @@ def plot_coefficients(
         ax.text(val, i, f'{orig_val:.4f}', va='center',
                 ha='left', fontsize=9)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def plot_track_map(session, driver_code: Optional[str] = None) -> Optional[plt.Figure]:
+def _load_track_positions(session, driver_code: Optional[str] = None):
+    """
+    Încarcă pozițiile (X, Y) ale celui mai rapid tur al pilotului ales sau
+    ale turului cel mai rapid din sesiune. Returnează (x, y) sau None.
+    """
+    # Pozițiile există doar în sesiunea FastF1 completă
+    from data_loader import get_fastf1_session
+    session = get_fastf1_session(session)
+
+    # Luăm tururile pilotului sau cădem pe cel mai rapid
+    if driver_code:
+        try:
+            laps = session.laps.pick_driver(driver_code)
+            if laps.empty:
+                laps = session.laps.pick_fastest()
+        except Exception:
+            laps = session.laps.pick_fastest()
+    else:
+        laps = session.laps.pick_fastest()
+    
+    if laps.empty:
+        return None
+    
+    # Turul cel mai rapid
+    fastest_lap = laps.pick_fastest()
+    if fastest_lap is None or fastest_lap.empty:
+        return None
+    
+    # Datele de poziție (X, Y)
+    try:
+        pos_data = fastest_lap.get_pos_data()
+    except Exception as e:
+        logger.warning(f"Could not load position data: {str(e)}")
+        return None
+    
+    # Căutăm coloanele X și Y (FastF1 folosește 'X' și 'Y')
+    x_col = None
+    y_col = None
+    for col in ['X', 'x', 'XPosition']:
+        if col in pos_data.columns:
+            x_col = col
+            break
+    for col in ['Y', 'y', 'YPosition']:
+        if col in pos_data.columns:
+            y_col = col
+            break
+    
+    if x_col is None or y_col is None:
+        logger.warning("Position data columns (X, Y) not found.")
+        return None
+    
+    return pos_data[x_col].values, pos_data[y_col].values
+
+
+@traced()
+def plot_track_map(
+    session,
+    driver_code: Optional[str] = None,
+    tolerance: float = DEFAULT_TOLERANCE
+) -> Optional["Figure"]:
     """
     Desenează harta circuitului din pozițiile FastF1.
     Folosește cel mai rapid tur al pilotului ales sau turul cel mai rapid din sesiune.
+    Conturul simplificat (RDP, toleranța dată) se păstrează pe disc per
+    circuit, iar afișările ulterioare nu mai încarcă datele de poziție.
     """
     try:
-        # Luăm tururile pilotului sau cădem pe cel mai rapid
-        if driver_code:
-            try:
-                laps = session.laps.pick_driver(driver_code)
-                if laps.empty:
-                    laps = session.laps.pick_fastest()
-            except Exception:
-                laps = session.laps.pick_fastest()
+        key = outline_key(session)
+        outline = load_outline(key, tolerance)
+
+        if outline is not None:
+            count("track_outline.hit")
         else:
-            laps = session.laps.pick_fastest()
-        
-        if laps.empty:
-            return None
-        
-        # Turul cel mai rapid
-        fastest_lap = laps.pick_fastest()
-        if fastest_lap is None or fastest_lap.empty:
-            return None
-        
-        # Datele de poziție (X, Y)
-        try:
-            pos_data = fastest_lap.get_pos_data()
-        except Exception as e:
-            st.warning(f"Could not load position data: {str(e)}")
-            return None
-        
-        # Căutăm coloanele X și Y (FastF1 folosește 'X' și 'Y')
-        x_col = None
-        y_col = None
-        for col in ['X', 'x', 'XPosition']:
-            if col in pos_data.columns:
-                x_col = col
-                break
-        for col in ['Y', 'y', 'YPosition']:
-            if col in pos_data.columns:
-                y_col = col
-                break
-        
-        if x_col is None or y_col is None:
-            st.warning("Position data columns (X, Y) not found.")
-            return None
-        
-        x = pos_data[x_col].values
-        y = pos_data[y_col].values
-        
-        # Recentram coordonatele pentru vizualizare mai clară
-        x = x - np.mean(x)
-        y = y - np.mean(y)
+            count("track_outline.miss")
+            positions = _load_track_positions(session, driver_code)
+            if positions is None:
+                return None
+            # Recentram și simplificăm coordonatele, apoi le salvăm
+            outline = save_outline(key, positions[0], positions[1], tolerance)
+
+        x = outline[:, 0]
+        y = outline[:, 1]
         
         # Desenăm
-        fig, ax = plt.subplots(figsize=(8, 8))
+        fig, ax = _new_figure(figsize=(8, 8))
         ax.plot(x, y, 'b-', linewidth=2, alpha=0.8)
         ax.set_aspect('equal')
         ax.axis('off')
@@ -160,8 +387,8 @@ def plot_track_map(session, driver_code: Optional[str] = None) -> Optional[plt.F
         except Exception:
             ax.set_title("Circuit Map", fontsize=12, pad=20)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
     except Exception as e:
-        st.warning(f"Error plotting track map: {str(e)}")
+        logger.warning(f"Error plotting track map: {str(e)}")
         return None
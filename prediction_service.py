@@ -0,0 +1,625 @@
+"""
+Serviciu de predicție
+=====================
+Rulează: py prediction_service.py serve [--port 8765]
+         py prediction_service.py register --year 2024 --event Monza --session R --drivers VER LEC --features TyreLife TrackTemp
+         py prediction_service.py predict --year 2024 --event Monza --session R --driver VER --features TyreLife TrackTemp --rows rows.json
+         py prediction_service.py bench --clients 32 --requests 200
+
+Predicții de timp pe tur fără Streamlit: coeficienții modelelor (an,
+eveniment, sesiune, pilot, set de feature-uri) se citesc dintr-un registru
+local, iar cererile concurente se grupează în micro-loturi evaluate vectorizat
+(A @ x, un produs per model). Serviciul își raportează singur throughput-ul și
+latența p50/p99.
+Rândurile unei cereri conțin exact coloanele modelului fără Intercept (vezi
+GET /models/<cheie>); opțional, cererea le numește în "columns".
+"""
+
+import argparse
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib import request as urlrequest
+
+import numpy as np
+
+
+DEFAULT_PORT = 8765
+
+# Limitele implicite ale unui micro-lot
+MAX_BATCH_ROWS = 4096
+MAX_WAIT_MS = 2.0
+
+# Câte latențe recente intră în percentile
+LATENCY_WINDOW = 10000
+
+
+# ---------------------------------------------------------------------------
+# Registrul de modele
+# ---------------------------------------------------------------------------
+
+def get_registry_dir() -> Path:
+    """
+    Returnează (sau creează) directorul registrului de modele.
+    Implicit: <cache FastF1>/models, sau variabila de mediu F1_MODEL_REGISTRY.
+    """
+    env_dir = os.getenv("F1_MODEL_REGISTRY")
+    if env_dir:
+        registry_dir = Path(env_dir)
+    else:
+        from data_loader import get_cache_dir
+        registry_dir = Path(get_cache_dir()) / "models"
+
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    return registry_dir
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+
+def model_key(year: int, event: str, session_type: str, driver: str, features: Sequence[str]) -> str:
+    """
+    Cheia modelului: an, eveniment, tip sesiune, pilot și setul de
+    feature-uri (fără Intercept, în ordinea din build_feature_matrix).
+    """
+    from features import FEATURE_REGISTRY
+
+    selected = [f for f in FEATURE_REGISTRY if f in features]
+    return (f"{int(year)}__{_slug(event)}__{_slug(session_type)}__{_slug(driver)}__"
+            f"{'+'.join(_slug(f) for f in selected)}")
+
+
+def expected_columns(features: Sequence[str]) -> List[str]:
+    """
+    Coloanele lui A (fără Intercept) pentru feature-urile selectate, în
+    ordinea din build_feature_matrix (de ex. Compound -> Compound_MEDIUM, ...).
+    """
+    from features import FEATURE_REGISTRY
+
+    return [c for name, spec in FEATURE_REGISTRY.items() if name in features for c in spec.column_names()]
+
+
+def save_model(
+    year: int,
+    event: str,
+    session_type: str,
+    driver: str,
+    feature_names: List[str],
+    coefficients: np.ndarray,
+    meta: Optional[dict] = None,
+    features: Optional[List[str]] = None
+) -> Path:
+    """
+    Salvează coeficienții unui model. feature_names sunt numele coloanelor
+    din build_feature_matrix (inclusiv 'Intercept'); features sunt
+    feature-urile selectate, dacă diferă de coloane (de ex. Compound ->
+    Compound_MEDIUM, Compound_HARD, ...).
+    Ridică ValueError dacă coloanele nu sunt exact cele ale feature-urilor
+    (de ex. un feature meteo lipsă din tururi), ca modelul să nu fie salvat
+    sub o cheie care promite alte coloane.
+    """
+    if features is None:
+        features = [f for f in feature_names if f != "Intercept"]
+    expected = ["Intercept"] + expected_columns(features)
+    if list(feature_names) != expected or len(coefficients) != len(expected):
+        raise ValueError(f"Model columns {list(feature_names)} do not match the requested features {expected}.")
+
+    key = model_key(year, event, session_type, driver, features)
+    record = {
+        "key": key,
+        "year": int(year),
+        "event": event,
+        "session_type": session_type,
+        "driver": driver,
+        "feature_names": list(feature_names),
+        "coefficients": [float(c) for c in coefficients],
+        "meta": meta or {},
+    }
+
+    path = get_registry_dir() / f"{key}.json"
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".json")
+    os.close(fd)
+    try:
+        Path(tmp).write_text(json.dumps(record, default=str))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    return path
+
+
+def register_session_models(
+    session,
+    year: int,
+    event: str,
+    session_type: str,
+    driver_codes: Sequence[str],
+    selected_features: List[str]
+) -> List[str]:
+    """
+    Ajustează modelele tuturor piloților dintr-o sesiune (un singur apel
+    batched, cu vremea aliniată dacă e nevoie) și le salvează în registru.
+    Nu salvează nimic (ValueError) dacă vreun model nu are exact coloanele
+    feature-urilor cerute. Returnează cheile salvate.
+    """
+    from batch_ls import fit_drivers_batched
+    from metrics import estimate_condition_number
+
+    fitted = fit_drivers_batched(session, driver_codes, selected_features)
+    if not fitted:
+        raise ValueError(f"No model could be fitted for drivers {list(driver_codes)}.")
+    expected = ["Intercept"] + expected_columns(selected_features)
+    mismatched = {code: names for code, (_, _, _, names) in fitted.items() if names != expected}
+    if mismatched:
+        raise ValueError(f"Refusing to register: expected columns {expected}, got "
+                         + "; ".join(f"{code}: {names}" for code, names in mismatched.items()))
+
+    keys = []
+    for code, (x, R, residual_norm, names) in fitted.items():
+        meta = {"residual_norm": residual_norm, "condition_estimate": estimate_condition_number(R)}
+        save_model(year, event, session_type, code, names, x, meta, selected_features)
+        keys.append(model_key(year, event, session_type, code, selected_features))
+    return keys
+
+
+class ModelRegistry:
+    """
+    Modelele din registru, citite de pe disc la prima cerere și ținute în
+    memorie (vectorul de coeficienți și numele coloanelor). Un model salvat
+    din nou (alt fișier, vezi save_model) se recitește la următoarea cerere.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory is not None else get_registry_dir()
+        self._models: Dict[str, Tuple[tuple, Tuple[np.ndarray, List[str]]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, List[str]]]:
+        # cheile sunt generate de model_key; altceva (de ex. '../x') nu e model
+        if not re.fullmatch(r"[a-z0-9_+]+", key):
+            return None
+        path = self.directory / f"{key}.json"
+        try:
+            st = path.stat()
+        except OSError:
+            with self._lock:
+                self._models.pop(key, None)
+            return None
+
+        # save_model înlocuiește fișierul atomic: alt inode, mtime sau mărime
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._models.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        record = json.loads(path.read_text())
+        model = (np.asarray(record["coefficients"], dtype=float), record["feature_names"])
+        with self._lock:
+            self._models[key] = (signature, model)
+        return model
+
+    def list_models(self) -> List[str]:
+        return sorted(p.stem for p in self.directory.glob("*.json"))
+
+    def reload(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+# ---------------------------------------------------------------------------
+# Micro-loturi
+# ---------------------------------------------------------------------------
+
+class ServiceStats:
+    """Numărători și latențele recente ale serviciului."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_batch(self, latencies: List[float], n_rows: int) -> None:
+        with self._lock:
+            self.batches += 1
+            self.requests += len(latencies)
+            self.rows += n_rows
+            self._latencies.extend(latencies)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            latencies = np.array(self._latencies)
+            requests, rows, batches, errors = self.requests, self.rows, self.batches, self.errors
+
+        if len(latencies):
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+        else:
+            p50 = p99 = float("nan")
+        return {
+            "uptime_s": elapsed,
+            "requests": requests,
+            "rows": rows,
+            "batches": batches,
+            "errors": errors,
+            "requests_per_s": requests / elapsed if elapsed > 0 else 0.0,
+            "rows_per_s": rows / elapsed if elapsed > 0 else 0.0,
+            "mean_batch_requests": requests / batches if batches else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p99_ms": float(p99),
+        }
+
+
+class MicroBatcher:
+    """
+    Grupează cererile concurente: un fir de lucru preia cererile din coadă
+    până la max_batch_rows rânduri sau max_wait_ms de la prima cerere, le
+    împarte pe modele și evaluează fiecare model cu un singur A @ x.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        max_batch_rows: int = MAX_BATCH_ROWS,
+        max_wait_ms: float = MAX_WAIT_MS
+    ):
+        self.registry = registry
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1e3
+        self.stats = ServiceStats()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, key: str, rows: np.ndarray, columns: Optional[Sequence[str]] = None) -> Future:
+        """
+        Pune cererea în coadă; Future-ul primește vectorul de predicții.
+        rows are coloanele modelului fără Intercept; columns (opțional) le
+        numește și trebuie să coincidă cu ale modelului.
+        """
+        future = Future()
+        self._queue.put((key, rows, future, time.perf_counter(), columns))
+        return future
+
+    def predict(
+        self,
+        key: str,
+        rows: np.ndarray,
+        timeout: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        return self.submit(key, rows, columns).result(timeout)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        n_rows = len(first[1])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            n_rows += len(item[1])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            try:
+                self._evaluate(batch)
+            except Exception as e:
+                # o eroare neprevăzută pică doar lotul curent, nu firul de lucru
+                self._fail([item for item in batch if not item[2].done()], e)
+
+    def _evaluate(self, batch: list) -> None:
+        by_model: Dict[str, list] = {}
+        for item in batch:
+            by_model.setdefault(item[0], []).append(item)
+
+        latencies = []
+        n_rows = 0
+        for key, items in by_model.items():
+            try:
+                model = self.registry.get(key)
+                if model is None:
+                    raise KeyError(f"Model not found: {key}")
+            except Exception as e:
+                self._fail(items, e)
+                continue
+            x, names = model
+
+            # fiecare cerere se validează separat: una greșită nu pică tot lotul
+            valid, blocks = [], []
+            for item in items:
+                try:
+                    blocks.append(_design_rows(item[1], names, item[4]))
+                except Exception as e:
+                    self._fail([item], e)
+                    continue
+                valid.append(item)
+            if not valid:
+                continue
+
+            predictions = np.vstack(blocks) @ x
+            bounds = np.cumsum([len(block) for block in blocks])[:-1]
+            done = time.perf_counter()
+            for (_, _, future, submitted, _), part in zip(valid, np.split(predictions, bounds)):
+                future.set_result(part)
+                latencies.append(done - submitted)
+            n_rows += len(predictions)
+
+        if latencies:
+            self.stats.record_batch(latencies, n_rows)
+
+    def _fail(self, items: list, error: Exception) -> None:
+        for _, _, future, _, _ in items:
+            future.set_exception(error)
+            self.stats.record_error()
+
+
+def _design_rows(
+    rows: np.ndarray,
+    feature_names: List[str],
+    columns: Optional[Sequence[str]] = None
+) -> np.ndarray:
+    """
+    Rândurile cererii (coloanele modelului fără Intercept, în ordinea din
+    build_feature_matrix) cu coloana de intercept adăugată.
+    """
+    expected = feature_names[1:]
+    if columns is not None and list(columns) != expected:
+        raise ValueError(f"Columns {list(columns)} do not match the model columns {expected}.")
+    rows = np.atleast_2d(np.asarray(rows, dtype=float))
+    if rows.ndim != 2 or rows.shape[1] != len(expected):
+        raise ValueError(f"Expected rows with {len(expected)} columns {expected}, got shape {rows.shape}.")
+    return np.column_stack([np.ones(len(rows)), rows])
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    batcher: MicroBatcher = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send(200, self.batcher.stats.snapshot())
+        elif self.path == "/models":
+            self._send(200, {"models": self.batcher.registry.list_models()})
+        elif self.path.startswith("/models/"):
+            key = self.path[len("/models/"):]
+            model = self.batcher.registry.get(key)
+            if model is None:
+                self._send(404, {"error": f"Model not found: {key}"})
+            else:
+                self._send(200, {"key": key, "columns": model[1][1:]})
+        else:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+            if not isinstance(payload, dict):
+                raise TypeError("the request body must be a JSON object")
+            key = payload.get("key") or model_key(
+                payload["year"], payload["event"], payload["session"], payload["driver"], payload["features"]
+            )
+            rows = np.asarray(payload["rows"], dtype=float)
+            columns = payload.get("columns")
+        except (KeyError, ValueError, TypeError) as e:
+            self._send(400, {"error": f"Bad request: {e}"})
+            return
+
+        try:
+            predictions = self.batcher.predict(key, rows, columns=columns)
+        except KeyError as e:
+            self._send(404, {"error": str(e.args[0])})
+            return
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send(500, {"error": f"Prediction failed: {e}"})
+            return
+        self._send(200, {"key": key, "predictions": predictions.tolist()})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # coada de conexiuni: implicit 5, prea puțin pentru clienți concurenți
+    request_queue_size = 256
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    registry: Optional[ModelRegistry] = None,
+    max_batch_rows: int = MAX_BATCH_ROWS,
+    max_wait_ms: float = MAX_WAIT_MS
+) -> Tuple[ThreadingHTTPServer, MicroBatcher]:
+    """Serverul HTTP (un fir per conexiune) și batcher-ul din spatele lui."""
+    batcher = MicroBatcher(registry or ModelRegistry(), max_batch_rows, max_wait_ms)
+    handler = type("Handler", (_Handler,), {"batcher": batcher})
+    server = _Server((host, port), handler)
+    return server, batcher
+
+
+def _report_stats(batcher: MicroBatcher, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        s = batcher.stats.snapshot()
+        print(f"[stats] {s['requests']} req  {s['requests_per_s']:.0f} req/s  "
+              f"{s['rows_per_s']:.0f} rows/s  batch {s['mean_batch_requests']:.1f} req  "
+              f"p50 {s['latency_p50_ms']:.2f} ms  p99 {s['latency_p99_ms']:.2f} ms  "
+              f"errors {s['errors']}", flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Client și CLI
+# ---------------------------------------------------------------------------
+
+def _http_json(url: str, payload: Optional[dict] = None) -> dict:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urlrequest.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urlrequest.urlopen(req) as response:
+        return json.loads(response.read())
+
+
+def run_load(url: str, key: str, n_features: int, clients: int, requests: int, rows: int) -> float:
+    """Trimite cereri concurente de la `clients` fire; returnează durata."""
+    rng = np.random.default_rng(0)
+    payloads = [{"key": key, "rows": rng.normal(size=(rows, n_features)).tolist()} for _ in range(requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(lambda p: _http_json(f"{url}/predict", p), payloads))
+    return time.perf_counter() - start
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless lap-time prediction service.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="run the HTTP prediction service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--max-batch-rows", type=int, default=MAX_BATCH_ROWS)
+    serve.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    serve.add_argument("--stats-interval", type=float, default=10.0, help="seconds between stats lines (0 = off)")
+
+    register = sub.add_parser("register", help="fit driver models from the table store and save them")
+    register.add_argument("--year", type=int, required=True)
+    register.add_argument("--event", required=True)
+    register.add_argument("--session", default="R")
+    register.add_argument("--drivers", nargs="+", required=True)
+    register.add_argument("--features", nargs="+", required=True)
+
+    predict = sub.add_parser("predict", help="predict lap times for feature rows (JSON list of lists, no intercept)")
+    predict.add_argument("--year", type=int, required=True)
+    predict.add_argument("--event", required=True)
+    predict.add_argument("--session", default="R")
+    predict.add_argument("--driver", required=True)
+    predict.add_argument("--features", nargs="+", required=True)
+    predict.add_argument("--rows", required=True, help="JSON file with the rows, or '-' for stdin")
+    predict.add_argument("--url", help="send to a running service instead of predicting in-process")
+
+    bench = sub.add_parser("bench", help="load a running service with concurrent clients")
+    bench.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    bench.add_argument("--key", help="model key (default: first registered model)")
+    bench.add_argument("--clients", type=int, default=32)
+    bench.add_argument("--requests", type=int, default=2000)
+    bench.add_argument("--rows", type=int, default=1, help="feature rows per request")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server, batcher = make_server(args.host, args.port, None, args.max_batch_rows, args.max_wait_ms)
+        if args.stats_interval > 0:
+            threading.Thread(target=_report_stats, args=(batcher, args.stats_interval), daemon=True).start()
+        print(f"Serving predictions on http://{args.host}:{args.port} (registry: {batcher.registry.directory})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            batcher.close()
+
+    elif args.command == "register":
+        import lap_store
+
+        stored = lap_store.read_session(args.year, args.event, args.session)
+        if stored is None:
+            raise SystemExit(f"Session {args.year} {args.event} {args.session} is not in the table store.")
+        try:
+            keys = register_session_models(stored, args.year, args.event, args.session, args.drivers, args.features)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        for key in keys:
+            print(key)
+
+    elif args.command == "predict":
+        with (open(0) if args.rows == "-" else open(args.rows)) as f:
+            rows = json.load(f)
+        if args.url:
+            payload = {"year": args.year, "event": args.event, "session": args.session,
+                       "driver": args.driver, "features": args.features, "rows": rows}
+            predictions = _http_json(f"{args.url}/predict", payload)["predictions"]
+        else:
+            batcher = MicroBatcher(ModelRegistry())
+            try:
+                key = model_key(args.year, args.event, args.session, args.driver, args.features)
+                predictions = batcher.predict(key, np.asarray(rows, dtype=float)).tolist()
+            finally:
+                batcher.close()
+        print(json.dumps(predictions))
+
+    elif args.command == "bench":
+        key = args.key
+        if key is None:
+            models = _http_json(f"{args.url}/models")["models"]
+            if not models:
+                raise SystemExit("No models registered.")
+            key = models[0]
+        n_features = len(_http_json(f"{args.url}/models/{key}")["columns"])
+        before = _http_json(f"{args.url}/stats")
+        elapsed = run_load(args.url, key, n_features, args.clients, args.requests, args.rows)
+        after = _http_json(f"{args.url}/stats")
+
+        served = after["requests"] - before["requests"]
+        print(f"{served} requests from {args.clients} clients in {elapsed:.2f} s "
+              f"({served / elapsed:.0f} req/s)")
+        print(f"service: p50 {after['latency_p50_ms']:.2f} ms  p99 {after['latency_p99_ms']:.2f} ms  "
+              f"mean batch {after['mean_batch_requests']:.1f} req  errors {after['errors']}")
+
+
+if __name__ == "__main__":
+    main()
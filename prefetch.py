@@ -0,0 +1,277 @@
+"""
+Preîncărcare sesiuni
+====================
+Rulează: py prefetch.py --season 2024 [--types R Q] [--workers 4] [--offline]
+         py prefetch.py --session 2024 Monza R --session 2024 Silverstone R
+
+Încarcă în paralel (cu un număr limitat de fire) sesiunile unui sezon sau o
+listă de (an, eveniment, tip sesiune), cu reîncercări cu backoff exponențial
+și raport de progres. Sesiunile ajung în cache-ul FastF1 și în depozitul
+columnar (lap_store), de unde le citește data_loader.load_session, și se
+înregistrează în manifestul cache_manager.
+În modul offline nu se face nicio cerere în rețea: o sesiune lipsă din
+cache oprește imediat preîncărcarea.
+"""
+
+import argparse
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import lap_store
+from data_loader import record_cached
+
+
+logger = logging.getLogger(__name__)
+
+# Subseturile salvate în depozit (vezi lap_store.write_session)
+DEFAULT_DATASETS = ("laps", "weather")
+
+SessionKey = Tuple[int, str, str]
+
+
+class CacheMiss(Exception):
+    """Sesiunea nu există în cache și modul offline interzice descărcarea."""
+
+
+def fastf1_loader(
+    year: int,
+    event_name: str,
+    session_type: str,
+    datasets: Iterable[str],
+    offline: bool = False
+):
+    """
+    Loader-ul implicit: sesiunea FastF1 cu subseturile cerute. Modul offline
+    se setează global în prefetch, înainte de pornirea firelor.
+    """
+    from data_loader import _load_fastf1
+    return _load_fastf1(year, event_name, session_type, datasets)
+
+
+def season_sessions(
+    year: int,
+    session_types: Sequence[str] = ("R",),
+    include_future: bool = False,
+    offline: bool = False
+) -> List[SessionKey]:
+    """
+    Sesiunile (an, eveniment, tip) ale unui sezon, din calendarul FastF1.
+    În modul offline calendarul se citește doar din cache (CacheMiss dacă
+    lipsește).
+    """
+    from data_loader import _fastf1, set_offline_mode
+    import pandas as pd
+
+    if offline:
+        set_offline_mode(True)
+        try:
+            schedule = _fastf1().get_event_schedule(year, include_testing=False)
+        except Exception as e:
+            raise CacheMiss(f"{year} event schedule: {e}") from e
+        finally:
+            set_offline_mode(False)
+    else:
+        schedule = _fastf1().get_event_schedule(year, include_testing=False)
+    if not include_future:
+        schedule = schedule[schedule["EventDate"] <= pd.Timestamp.now()]
+    return [
+        (int(year), str(event_name), session_type)
+        for event_name in schedule["EventName"]
+        for session_type in session_types
+    ]
+
+
+def _check_loaded(session) -> None:
+    """
+    FastF1 eșuează „soft” (doar log) când datele nu se pot descărca sau
+    lipsesc din cache; verificăm explicit că tururile există.
+    """
+    try:
+        laps = session.laps
+    except Exception as e:
+        raise RuntimeError(f"lap data not loaded ({e})") from e
+    if laps is None or len(laps) == 0:
+        raise RuntimeError("lap data is empty")
+
+
+def _fetch_one(
+    key: SessionKey,
+    loader: Callable,
+    datasets: Tuple[str, ...],
+    offline: bool,
+    retries: int,
+    backoff: float,
+    cancelled: threading.Event
+) -> Dict:
+    """Încarcă o sesiune (cu reîncercări) și o scrie în depozit."""
+    year, event_name, session_type = key
+    start = time.perf_counter()
+    attempt = 0
+
+    while True:
+        if cancelled.is_set():
+            status, error = "failed", "cancelled"
+            break
+        attempt += 1
+        try:
+            session = loader(year, event_name, session_type, datasets, offline=offline)
+            _check_loaded(session)
+            lap_store.write_session(year, event_name, session_type, session)
+            record_cached(year, event_name, session_type, session)
+            status, error = "loaded", None
+            break
+        except Exception as e:
+            if offline:
+                # în cache nu apare nimic între două încercări: fără reîncercări
+                raise CacheMiss(f"{year} {event_name} {session_type}: {e}") from e
+            if attempt > retries or cancelled.is_set():
+                status, error = "failed", str(e)
+                break
+            delay = backoff * 2 ** (attempt - 1) * (1 + random.random())
+            logger.warning(f"{year} {event_name} {session_type}: attempt {attempt} failed ({e}), "
+                           f"retrying in {delay:.1f} s")
+            if cancelled.wait(delay):
+                status, error = "failed", "cancelled"
+                break
+
+    return {
+        "year": year,
+        "event_name": event_name,
+        "session_type": session_type,
+        "status": status,
+        "attempts": attempt,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+    }
+
+
+def prefetch(
+    sessions: Iterable[SessionKey],
+    max_workers: int = 4,
+    retries: int = 3,
+    backoff: float = 2.0,
+    offline: bool = False,
+    datasets: Sequence[str] = DEFAULT_DATASETS,
+    force: bool = False,
+    loader: Optional[Callable] = None,
+    progress: Optional[Callable[[int, int, Dict], None]] = None
+) -> List[Dict]:
+    """
+    Încarcă sesiunile cu cel mult max_workers fire. Sesiunile deja în
+    depozit se sar (în afară de force=True).
+    loader(an, eveniment, tip, datasets, offline=...) returnează o sesiune
+    cu laps/weather_data/event ca fastf1.core.Session; implicit FastF1.
+    progress(gata, total, rezultat) se apelează după fiecare sesiune.
+    Returnează câte un rezultat per sesiune, în ordinea primită. În modul
+    offline ridică CacheMiss la prima sesiune care lipsește din cache.
+    """
+    sessions = list(dict.fromkeys(sessions))
+    datasets = tuple(datasets)
+    total = len(sessions)
+    results: Dict[SessionKey, Dict] = {}
+
+    def report(result: Dict) -> None:
+        done = len(results)
+        if progress is not None:
+            progress(done, total, result)
+        else:
+            logger.info(f"[{done}/{total}] {result['year']} {result['event_name']} "
+                        f"{result['session_type']}: {result['status']}")
+
+    pending = []
+    for key in sessions:
+        if not force and lap_store.has_session(*key):
+            results[key] = {
+                "year": key[0], "event_name": key[1], "session_type": key[2],
+                "status": "cached", "attempts": 0, "seconds": 0.0, "error": None,
+            }
+            report(results[key])
+        else:
+            pending.append(key)
+
+    if pending:
+        restore_online = False
+        if loader is None:
+            loader = fastf1_loader
+            if offline:
+                from data_loader import set_offline_mode
+                set_offline_mode(True)
+                restore_online = True
+
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        try:
+            futures = {
+                executor.submit(_fetch_one, key, loader, datasets, offline, retries, backoff, cancelled): key
+                for key in pending
+            }
+            remaining = set(futures)
+            while remaining:
+                finished, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    results[futures[future]] = result
+                    report(result)
+        except BaseException:
+            # CacheMiss sau Ctrl+C: nu mai pornim sesiunile rămase
+            cancelled.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            if restore_online:
+                set_offline_mode(False)
+
+    return [results[key] for key in sessions]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Prefetch FastF1 sessions into the local caches.")
+    parser.add_argument("--season", type=int, action="append", default=[], help="season year (repeatable)")
+    parser.add_argument("--types", nargs="+", default=["R"], help="session types for --season (e.g. R Q FP1)")
+    parser.add_argument("--session", nargs=3, action="append", default=[], metavar=("YEAR", "EVENT", "TYPE"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=2.0, help="initial retry delay in seconds")
+    parser.add_argument("--datasets", nargs="+", default=list(DEFAULT_DATASETS))
+    parser.add_argument("--offline", action="store_true", help="cache only: never use the network, stop on a miss")
+    parser.add_argument("--force", action="store_true", help="reload sessions already in the table store")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if not args.season and not args.session:
+        parser.error("nothing to prefetch: use --season or --session")
+
+    def progress(done: int, total: int, result: Dict) -> None:
+        line = (f"[{done}/{total}] {result['year']} {result['event_name']} {result['session_type']}: "
+                f"{result['status']} ({result['seconds']:.1f} s, {result['attempts']} attempts)")
+        if result["error"]:
+            line += f" - {result['error']}"
+        print(line, flush=True)
+
+    try:
+        # în modul offline și calendarul se citește doar din cache
+        sessions: List[SessionKey] = []
+        for year in args.season:
+            sessions += season_sessions(year, args.types, offline=args.offline)
+        sessions += [(int(year), event, session_type) for year, event, session_type in args.session]
+        results = prefetch(
+            sessions, args.workers, args.retries, args.backoff, args.offline,
+            args.datasets, args.force, progress=progress
+        )
+    except CacheMiss as e:
+        raise SystemExit(f"Cache miss (offline mode): {e}")
+
+    failed = [r for r in results if r["status"] == "failed"]
+    print(f"\n{len(results) - len(failed)}/{len(results)} sessions available")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Modul CMMP recursiv
+===================
+Estimator RLS în formă rădăcină pătrată (QR) pentru predicție live:
+fereastră glisantă de lungime fixă și/sau factor de uitare exponențial.
+Memorie și cost per tur constante, indiferent de lungimea cursei.
+"""
+
+import numpy as np
+from collections import deque
+from typing import Optional, Tuple
+
+from incremental_qr import IncrementalLS
+
+
+class RecursiveLS:
+    """
+    RLS pe factorul triunghiular al lui [A | b].
+    - forgetting = λ ∈ (0, 1]: la fiecare tur factorul se înmulțește cu sqrt(λ),
+      deci turul de acum k tururi are pondere λ^k;
+    - window = w: se păstrează doar ultimele w tururi (cel vechi se elimină
+      prin downdating);
+    - delta: regularizare inițială sqrt(delta) * I, ca soluția să existe
+      de la primul tur.
+    """
+
+    def __init__(
+        self,
+        n_features: int,
+        forgetting: float = 1.0,
+        window: Optional[int] = None,
+        delta: float = 1e-6
+    ):
+        if not 0 < forgetting <= 1:
+            raise ValueError("Factorul de uitare trebuie să fie în (0, 1].")
+        if window is not None and window <= n_features:
+            raise ValueError("Fereastra trebuie să conțină mai multe tururi decât feature-uri.")
+
+        self.n = n_features
+        self.forgetting = forgetting
+        self.window = window
+        self.model = IncrementalLS(n_features)
+        self.model.Rt[:n_features, :n_features] = np.sqrt(delta) * np.eye(n_features)
+
+        self._rows = deque()
+        self._step = 0
+
+    @property
+    def coefficients(self) -> np.ndarray:
+        return self.model.coefficients
+
+    @property
+    def residual_norm(self) -> float:
+        """Norma reziduală ponderată pe tururile din memorie."""
+        return self.model.residual_norm
+
+    def predict(self, A: np.ndarray) -> np.ndarray:
+        return A @ self.coefficients
+
+    def update(self, a: np.ndarray, y: float) -> float:
+        """
+        Adaugă un tur nou și returnează eroarea a priori y - a^T x
+        (predicția făcută înainte de a vedea turul).
+        """
+        a = np.asarray(a, dtype=float)
+        error = float(y - a @ self.coefficients)
+
+        if self.forgetting < 1.0:
+            self.model.scale(np.sqrt(self.forgetting))
+
+        self.model.add_row(a, y)
+        self._step += 1
+
+        if self.window is not None:
+            self._rows.append((a, float(y), self._step))
+            if len(self._rows) > self.window:
+                a_old, y_old, step_old = self._rows.popleft()
+                # rândul vechi a fost între timp atenuat de (step - step_old) ori
+                scale = np.sqrt(self.forgetting ** (self._step - step_old))
+                self.model.delete_row(scale * a_old, scale * y_old)
+
+        return error
+
+    def fit_stream(self, A: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parcurge tururile în ordine (de ex. matricea din build_feature_matrix).
+        Returnează predicțiile a priori și istoricul coeficienților (m x n).
+        """
+        m = A.shape[0]
+        predictions = np.zeros(m)
+        history = np.zeros((m, self.n))
+
+        for i in range(m):
+            predictions[i] = b[i] - self.update(A[i], b[i])
+            history[i] = self.coefficients
+
+        return predictions, history
@@ -0,0 +1,167 @@
+"""
+Modul Ridge
+===========
+Regresie Ridge pe o grilă întreagă de valori λ dintr-o singură factorizare:
+QR subțire al lui A urmat de SVD-ul factorului R (n x n). Include scorurile
+GCV și LOOCV în formă închisă pentru alegerea lui λ.
+"""
+
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+from instrumentation import traced
+
+
+def _has_intercept(A: np.ndarray) -> bool:
+    return A.shape[1] > 0 and np.all(A[:, 0] == 1.0)
+
+
+# Câte elemente (rânduri x λ) are un bloc al reducerii LOOCV
+LOOCV_BLOCK_ELEMENTS = 1 << 20
+
+
+def _ridge_factor(A: np.ndarray, b: np.ndarray, intercept: bool):
+    """
+    Factorizarea unică: Z = Q R, R = U_r diag(s) V^T  =>  Z = (Q U_r) diag(s) V^T,
+    unde Z, y sunt A, b centrate dacă interceptul nu se penalizează.
+    """
+    if intercept:
+        mu_A = A[:, 1:].mean(axis=0)
+        mu_b = b.mean()
+        Z = A[:, 1:] - mu_A
+        y = b - mu_b
+    else:
+        mu_A = mu_b = None
+        Z = A
+        y = b
+
+    Q, R = np.linalg.qr(Z)
+    U_r, s, Vt = np.linalg.svd(R)
+    U = Q @ U_r
+    return U, s, Vt, y, mu_A, mu_b
+
+
+def _coefficients(shrink, s, Vt, uty, mu_A, mu_b, intercept: bool) -> np.ndarray:
+    coefs = (shrink / np.where(s > 0, s, 1.0) * uty) @ Vt
+    if not intercept:
+        return coefs
+    x0 = mu_b - coefs @ mu_A
+    return np.column_stack([x0, coefs])
+
+
+@traced()
+def ridge_path(
+    A: np.ndarray,
+    b: np.ndarray,
+    lambdas: Sequence[float],
+    intercept: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Coeficienții Ridge pentru fiecare λ din grilă:
+        min ||Ax - b||² + λ ||x||²
+    Dacă prima coloană a lui A este interceptul (coloană de 1), ea nu se
+    penalizează (datele se centrează).
+    LOOCV se reduce pe blocuri de rânduri, fără tablouri m x len(λ) întregi;
+    valorile ajustate și leverage-ul pentru un λ se obțin cu ridge_fit.
+    Returnează X (len(λ) x n), scorurile GCV și LOOCV (len(λ)).
+    """
+    lambdas = np.asarray(lambdas, dtype=float)
+    m, n = A.shape
+    if intercept is None:
+        intercept = _has_intercept(A)
+
+    U, s, Vt, y, mu_A, mu_b = _ridge_factor(A, b, intercept)
+    uty = U.T @ y
+
+    s2 = s ** 2
+    shrink = s2 / (s2 + lambdas[:, None])              # L x p, factorii de filtrare
+
+    # RSS(λ) = ||y||² - ||U^T y||² + ||(1 - f) U^T y||²
+    rss = (y @ y - uty @ uty) + (((1 - shrink) * uty) ** 2).sum(axis=1)
+    dof = shrink.sum(axis=1) + (1 if intercept else 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gcv = m * rss / (m - dof) ** 2
+
+    # LOOCV: e_i / (1 - h_ii), h_ii = 1/m (intercept) + Σ_j U_ij² f_j,
+    # acumulat pe blocuri de rânduri (memorie O(bloc x L))
+    weighted_uty = (shrink * uty).T                    # p x L
+    rows = max(1, LOOCV_BLOCK_ELEMENTS // max(len(lambdas), 1))
+    press = np.zeros(len(lambdas))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, m, rows):
+            U_blk = U[start:start + rows]
+            residuals = y[start:start + rows, None] - U_blk @ weighted_uty
+            leverage = (U_blk ** 2) @ shrink.T
+            if intercept:
+                leverage += 1.0 / m
+            press += ((residuals / (1 - leverage)) ** 2).sum(axis=0)
+    loocv = press / m
+
+    X = _coefficients(shrink, s, Vt, uty, mu_A, mu_b, intercept)
+    return X, gcv, loocv
+
+
+def ridge_fit(
+    A: np.ndarray,
+    b: np.ndarray,
+    lam: float,
+    intercept: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Modelul Ridge complet pentru un singur λ.
+    Returnează coeficienții x (n), valorile ajustate A x, reziduurile b - A x
+    și leverage-ul h_ii (câte m valori).
+    """
+    m, n = A.shape
+    if intercept is None:
+        intercept = _has_intercept(A)
+
+    U, s, Vt, y, mu_A, mu_b = _ridge_factor(A, b, intercept)
+    uty = U.T @ y
+
+    s2 = s ** 2
+    shrink = s2 / (s2 + lam)
+    x = _coefficients(shrink[None, :], s, Vt, uty, mu_A, mu_b, intercept)[0]
+
+    fitted = A @ x
+    residuals = b - fitted
+    leverage = (U ** 2) @ shrink
+    if intercept:
+        leverage += 1.0 / m
+
+    return x, fitted, residuals, leverage
+
+
+def default_lambdas(A: np.ndarray, num: int = 60) -> np.ndarray:
+    """Grilă logaritmică relativă la cea mai mare valoare singulară a lui A."""
+    scale = np.linalg.norm(A, ord=2) ** 2
+    return np.logspace(-8, 1, num) * scale
+
+
+def ridge_select(
+    A: np.ndarray,
+    b: np.ndarray,
+    lambdas: Optional[Sequence[float]] = None,
+    criterion: str = "gcv"
+) -> Tuple[np.ndarray, float, np.ndarray]:
+    """
+    Alege λ după GCV sau LOOCV.
+    Returnează coeficienții, λ ales și scorurile pe grilă.
+    """
+    if criterion not in ("gcv", "loocv"):
+        raise ValueError(f"Unknown criterion: {criterion}")
+    if lambdas is None:
+        lambdas = default_lambdas(A)
+    lambdas = np.asarray(lambdas, dtype=float)
+
+    X, gcv, loocv = ridge_path(A, b, lambdas)
+    scores = gcv if criterion == "gcv" else loocv
+    best = int(np.nanargmin(scores))
+
+    return X[best], float(lambdas[best]), scores
+
+
+def ls_ridge(A: np.ndarray, b: np.ndarray, lam: float) -> np.ndarray:
+    """Coeficienții Ridge pentru un singur λ."""
+    return ridge_fit(A, b, lam)[0]
@@ -0,0 +1,310 @@
+"""
+Tabel de sezon
+==============
+Rulează: py season_table.py --season 2024 [--types R] [--float32] [--output sezon_2024.arrow]
+
+Concatenează tururile mai multor sesiuni din depozitul columnar într-un
+singur tabel compact: șirurile (Driver, Team, Compound, ...) devin
+categorice, coloanele cu valori întregi devin întregi mici, iar timpii rămân
+timedelta (int64); valorile nu se schimbă. Cu --float32 coloanele reale care
+nu sunt măsurători (FLOAT64_COLUMNS) trec în float32, cu pierdere de precizie.
+Tururile se sortează după (sesiune, pilot, stint, tur) și un index de
+offset-uri (început, sfârșit) pe fiecare grup face ca tururile unui pilot
+sau ale unui stint să fie o felie, nu o căutare plus copii.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import lap_store
+from weather import align_weather
+
+
+# Coloanele care identifică sesiunea în tabel
+SESSION_COLUMNS = ["Year", "EventName", "SessionType"]
+
+# Ordinea tururilor: fiecare (sesiune, pilot, stint) e un bloc contiguu
+SORT_COLUMNS = ["Year", "EventName", "SessionType", "Driver", "Stint", "LapNumber"]
+
+# Coloane care rămân float64 și cu float32=True: măsurătorile din care se
+# construiesc feature-urile pentru CMMP
+FLOAT64_COLUMNS: List[str] = [
+    "TyreLife", "LapNumber", "AirTemp", "TrackTemp", "WindSpeed", "Humidity",
+    "Pressure", "WindDirection", "SpeedI1", "SpeedI2", "SpeedFL", "SpeedST",
+]
+
+SessionKey = Tuple[int, str, str]
+
+
+def stored_sessions(years: Iterable[int], session_types: Optional[Sequence[str]] = None) -> List[SessionKey]:
+    """Sesiunile (an, eveniment, tip) din depozit pentru anii dați."""
+    sessions = []
+    store_dir = lap_store.get_store_dir()
+    for year in years:
+        for meta_path in sorted((store_dir / str(year)).glob("*/*/meta.json")):
+            meta = json.loads(meta_path.read_text())
+            if session_types is None or meta["session_type"] in session_types:
+                sessions.append((int(meta["year"]), meta["event_name"], meta["session_type"]))
+    return sessions
+
+
+def _is_boolean_object(series: pd.Series) -> bool:
+    values = series.dropna()
+    return len(values) > 0 and values.map(type).isin([bool, np.bool_]).all()
+
+
+def compact_laps(laps: pd.DataFrame, float32: bool = False) -> pd.DataFrame:
+    """
+    Reduce memoria tabelului de tururi fără a schimba valorile:
+    obiecte bool/None -> boolean, șiruri -> category, float64 -> întreg mic
+    (doar valori întregi fără NaN), int64 -> cel mai mic întreg.
+    Coloanele timedelta / datetime rămân neschimbate (deja int64).
+    Cu float32=True celelalte coloane float64 (în afară de FLOAT64_COLUMNS)
+    devin float32: mai puțină memorie, dar valorile se rotunjesc.
+    """
+    columns = {}
+    for name, col in laps.items():
+        dtype = col.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            columns[name] = col
+        elif dtype == object or pd.api.types.is_string_dtype(dtype):
+            if _is_boolean_object(col):
+                columns[name] = col.astype("boolean")
+            else:
+                columns[name] = col.astype("category")
+        elif pd.api.types.is_float_dtype(dtype):
+            values = col.to_numpy()
+            if len(values) and not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+                columns[name] = pd.to_numeric(col, downcast="integer")
+            elif float32 and name not in FLOAT64_COLUMNS:
+                columns[name] = col.astype(np.float32)
+            else:
+                columns[name] = col
+        elif pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+            columns[name] = pd.to_numeric(col, downcast="integer")
+        else:
+            columns[name] = col
+    return pd.DataFrame(columns, index=laps.index)
+
+
+def memory_report(laps: pd.DataFrame) -> pd.DataFrame:
+    """Memoria pe coloană (octeți total și pe tur), inclusiv șirurile."""
+    usage = laps.memory_usage(deep=True, index=True)
+    n = max(len(laps), 1)
+    report = pd.DataFrame({
+        "dtype": [str(laps.index.dtype)] + [str(laps[c].dtype) for c in laps.columns],
+        "bytes": usage.to_numpy(),
+    }, index=usage.index)
+    report["bytes_per_lap"] = report["bytes"] / n
+    return report
+
+
+def _group_offsets(codes: List[np.ndarray], n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Începutul și sfârșitul fiecărui bloc de rânduri cu aceleași coduri."""
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for c in codes:
+        change[1:] |= c[1:] != c[:-1]
+    starts = np.flatnonzero(change)
+    stops = np.append(starts[1:], n)
+    return starts, stops
+
+
+class SeasonTable:
+    """
+    Tururile mai multor sesiuni într-un singur DataFrame compact, sortat
+    după (sesiune, pilot, stint, tur), cu offset-urile fiecărui grup:
+        stint_offsets[(sesiune, pilot, stint)] = (început, sfârșit)
+        driver_offsets[(sesiune, pilot)] = (început, sfârșit)
+    unde sesiunea este (an, eveniment, tip).
+    """
+
+    def __init__(self, laps: pd.DataFrame, sort: bool = True):
+        if sort:
+            by = [c for c in SORT_COLUMNS if c in laps.columns]
+            laps = laps.sort_values(by, kind="stable", na_position="last").reset_index(drop=True)
+        self.laps = laps
+        self._build_index()
+
+    def _build_index(self) -> None:
+        laps = self.laps
+        n = len(laps)
+        session_codes = [pd.factorize(laps[c])[0] for c in SESSION_COLUMNS]
+        driver_codes = pd.factorize(laps["Driver"])[0]
+        stint = laps["Stint"].to_numpy(dtype=float, na_value=np.nan) if "Stint" in laps else np.zeros(n)
+        stint_codes = np.where(np.isnan(stint), -1, stint).astype(np.int64)
+
+        years = laps["Year"].to_numpy()
+        events = laps["EventName"].astype(str).to_numpy()
+        types = laps["SessionType"].astype(str).to_numpy()
+        drivers = laps["Driver"].astype(str).to_numpy()
+
+        self.stint_offsets: Dict[Tuple[SessionKey, str, Optional[int]], Tuple[int, int]] = {}
+        starts, stops = _group_offsets(session_codes + [driver_codes, stint_codes], n)
+        for start, stop in zip(starts, stops):
+            session = (int(years[start]), events[start], types[start])
+            key_stint = int(stint_codes[start]) if stint_codes[start] >= 0 else None
+            self.stint_offsets[(session, drivers[start], key_stint)] = (int(start), int(stop))
+
+        self.driver_offsets: Dict[Tuple[SessionKey, str], Tuple[int, int]] = {}
+        starts, stops = _group_offsets(session_codes + [driver_codes], n)
+        for start, stop in zip(starts, stops):
+            session = (int(years[start]), events[start], types[start])
+            self.driver_offsets[(session, drivers[start])] = (int(start), int(stop))
+
+        self._sessions = list(dict.fromkeys(key[0] for key in self.driver_offsets))
+        # numărul pilotului (1) -> codul (VER), per sesiune
+        self._driver_numbers: Dict[Tuple[SessionKey, str], str] = {}
+        if "DriverNumber" in laps:
+            numbers = laps["DriverNumber"].astype(str).to_numpy()
+            for (session, driver), (start, _) in self.driver_offsets.items():
+                self._driver_numbers[(session, numbers[start])] = driver
+
+    # --- acces -------------------------------------------------------------
+
+    @property
+    def sessions(self) -> List[SessionKey]:
+        return list(self._sessions)
+
+    def _resolve_session(self, session: Union[SessionKey, str]) -> SessionKey:
+        """Sesiunea ca (an, eveniment, tip) sau doar numele evenimentului, dacă e unic."""
+        if isinstance(session, tuple):
+            return session
+        matches = [s for s in self._sessions if s[1] == session]
+        if len(matches) != 1:
+            raise KeyError(f"Event {session!r} matches {len(matches)} sessions; pass (year, event, type).")
+        return matches[0]
+
+    def _resolve_driver(self, session: SessionKey, driver: str) -> str:
+        driver = str(driver)
+        return self._driver_numbers.get((session, driver), driver) if driver.isdigit() else driver
+
+    def drivers(self, session: Union[SessionKey, str]) -> List[str]:
+        session = self._resolve_session(session)
+        return [d for (s, d) in self.driver_offsets if s == session]
+
+    def driver_laps(self, session: Union[SessionKey, str], driver: str) -> pd.DataFrame:
+        """Tururile pilotului (cod sau număr) în sesiune: o felie, fără copie."""
+        session = self._resolve_session(session)
+        key = (session, self._resolve_driver(session, driver))
+        if key not in self.driver_offsets:
+            return self.laps.iloc[0:0]
+        start, stop = self.driver_offsets[key]
+        return self.laps.iloc[start:stop]
+
+    def stint_laps(self, session: Union[SessionKey, str], driver: str, stint: Optional[int]) -> pd.DataFrame:
+        """Tururile unui stint al pilotului: o felie, fără copie."""
+        session = self._resolve_session(session)
+        key = (session, self._resolve_driver(session, driver), stint)
+        if key not in self.stint_offsets:
+            return self.laps.iloc[0:0]
+        start, stop = self.stint_offsets[key]
+        return self.laps.iloc[start:stop]
+
+    def memory_report(self) -> pd.DataFrame:
+        return memory_report(self.laps)
+
+    def bytes_per_lap(self) -> float:
+        return float(self.laps.memory_usage(deep=True, index=True).sum()) / max(len(self.laps), 1)
+
+    # --- disc ----------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Salvează tabelul ca Arrow IPC (categoricele devin dicționare)."""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        table = pa.Table.from_pandas(self.laps, preserve_index=False)
+        feather.write_feather(table, str(path), compression="uncompressed")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SeasonTable":
+        """Citește un tabel salvat (memory-mapped); e deja sortat."""
+        import pyarrow.feather as feather
+
+        laps = feather.read_table(str(path), memory_map=True).to_pandas()
+        return cls(laps, sort=False)
+
+
+def build_season_table(
+    sessions: Iterable[SessionKey],
+    weather_method: Optional[str] = "asof",
+    float32: bool = False
+) -> Tuple[SeasonTable, pd.DataFrame]:
+    """
+    Construiește tabelul de sezon din sesiunile aflate în depozit (cele
+    lipsă se sar). Cu weather_method fiecare tur primește și vremea aliniată;
+    float32 se transmite lui compact_laps.
+    Returnează tabelul și raportul de memorie (octeți pe tur înainte și după
+    compactare).
+    """
+    frames = []
+    raw_bytes = 0
+    for year, event_name, session_type in sessions:
+        stored = lap_store.read_session(year, event_name, session_type)
+        if stored is None:
+            continue
+        laps = stored.laps
+        if weather_method is not None and stored.weather_data is not None:
+            laps = align_weather(laps, stored.weather_data, weather_method)
+        laps = pd.DataFrame(laps)
+        raw_bytes += int(laps.memory_usage(deep=True, index=True).sum())
+        laps.insert(0, "SessionType", session_type)
+        laps.insert(0, "EventName", event_name)
+        laps.insert(0, "Year", int(year))
+        # coloanele categorice au categorii diferite per sesiune: le compactăm după concat
+        frames.append(compact_laps(laps, float32))
+
+    if not frames:
+        raise ValueError("None of the requested sessions are in the table store.")
+
+    laps = pd.concat(frames, ignore_index=True)
+    table = SeasonTable(compact_laps(laps, float32))
+
+    n = max(len(table.laps), 1)
+    compact_bytes = float(table.laps.memory_usage(deep=True, index=True).sum())
+    summary = pd.DataFrame({
+        "laps": [len(table.laps)],
+        "sessions": [len(table.sessions)],
+        "raw_bytes_per_lap": [raw_bytes / n],
+        "bytes_per_lap": [compact_bytes / n],
+        "reduction": [raw_bytes / compact_bytes if compact_bytes else np.nan],
+    })
+    return table, summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a compact season-wide lap table from the table store.")
+    parser.add_argument("--season", type=int, action="append", required=True)
+    parser.add_argument("--types", nargs="+", default=["R"])
+    parser.add_argument("--weather", default="asof", help="weather alignment method, or 'none'")
+    parser.add_argument("--float32", action="store_true",
+                        help="store non-measurement float columns as float32 (lossy)")
+    parser.add_argument("--output", help="write the table as Arrow IPC")
+    parser.add_argument("--columns", action="store_true", help="print the per-column memory report")
+    args = parser.parse_args(argv)
+
+    sessions = stored_sessions(args.season, args.types)
+    table, summary = build_season_table(
+        sessions, None if args.weather == "none" else args.weather, args.float32
+    )
+
+    s = summary.iloc[0]
+    print(f"{int(s['laps'])} laps from {int(s['sessions'])} sessions: "
+          f"{s['raw_bytes_per_lap']:.0f} -> {s['bytes_per_lap']:.0f} bytes/lap ({s['reduction']:.1f}x)")
+    if args.columns:
+        print(table.memory_report().to_string())
+    if args.output:
+        table.save(args.output)
+        print(f"Table written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Adaptor Streamlit
+=================
+Strat subțire peste modulele de bază pentru paginile Streamlit: mesajele
+din logging (warning / error) se afișează cu st.warning / st.error, iar
+încărcarea sesiunilor primește cache-ul st.cache_data. Modulele de bază
+(data_loader, features, plots) nu importă Streamlit.
+Cu instrumentarea pornită (F1_TRACE=1), performance_panel() arată
+span-urile și numărătorii de cache ai rerun-ului curent al sesiunii
+(eticheta instrumentării e per st.session_state, deci sesiunile nu își
+șterg una alteia urmele). Fiecare pagină care rulează etape instrumentate
+(încărcare, feature-uri, solveri, figuri; pagina de analiză din pages/)
+apelează begin_rerun() imediat după st.set_page_config și
+performance_panel() la final, ca Home.py.
+"""
+
+import json
+import logging
+import uuid
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import streamlit as st
+
+import data_loader
+import instrumentation
+from data_loader import get_laps_data, get_telemetry_data, required_datasets
+from features import ALLOWED_FEATURES, FEATURES, build_feature_matrix
+from metrics import RegressionDiagnostics
+from plots import (
+    plot_coefficients,
+    plot_errors,
+    plot_predictions_vs_actual,
+    plot_track_map,
+    render_figure,
+    render_figures,
+)
+
+
+# Loggerii modulelor de bază afișați în pagină
+CORE_LOGGERS = ("data_loader", "features", "plots", "lap_store", "weather", "telemetry")
+
+
+class StreamlitHandler(logging.Handler):
+    """Trimite înregistrările de log în pagina Streamlit curentă."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if record.levelno >= logging.ERROR:
+            st.error(message)
+        elif record.levelno >= logging.WARNING:
+            st.warning(message)
+        else:
+            st.info(message)
+
+
+def install_logging(level: int = logging.WARNING) -> None:
+    """Atașează (o singură dată) StreamlitHandler loggerilor de bază."""
+    for name in CORE_LOGGERS:
+        logger = logging.getLogger(name)
+        if not any(isinstance(h, StreamlitHandler) for h in logger.handlers):
+            handler = StreamlitHandler()
+            handler.setLevel(level)
+            logger.addHandler(handler)
+        if logger.level == logging.NOTSET or logger.level > level:
+            logger.setLevel(level)
+
+
+@st.cache_data(ttl=3600)  # Cache o oră
+def load_session(
+    year: int,
+    event_name: str,
+    session_type: str,
+    use_store: bool = True,
+    datasets: Optional[Tuple[str, ...]] = None
+):
+    """data_loader.load_session cu cache Streamlit."""
+    return data_loader.load_session(year, event_name, session_type, use_store, datasets)
+
+
+def load_session_for_features(
+    year: int,
+    event_name: str,
+    session_type: str,
+    selected_features: Iterable[str],
+    track_map: bool = False
+):
+    """
+    Încarcă sesiunea (prin cache) doar cu subseturile cerute de
+    feature-urile selectate.
+    """
+    datasets = required_datasets(selected_features, track_map=track_map)
+    return load_session(year, event_name, session_type, datasets=datasets)
+
+
+def diagnostics_panel(
+    A: np.ndarray,
+    b: np.ndarray,
+    x: np.ndarray,
+    R: np.ndarray,
+    d: Optional[np.ndarray] = None,
+    Q: Optional[np.ndarray] = None,
+    lap_numbers: Optional[Iterable[float]] = None,
+    top: int = 5
+) -> RegressionDiagnostics:
+    """
+    Diagnosticele modelului din ieșirea solverului (ls_householder: x, R, d;
+    Gram–Schmidt: și Q): RMSE, R², condiționarea estimată din R și tururile
+    cu cea mai mare distanță Cook. Returnează RegressionDiagnostics, ca
+    pagina să refolosească statisticile deja calculate.
+    """
+    import pandas as pd
+
+    diagnostics = RegressionDiagnostics(A, b, x, R, d, Q)
+    summary = diagnostics.summary()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("RMSE", f"{summary['rmse']:.3f} s")
+    col2.metric("R²", f"{summary['r_squared']:.3f}")
+    col3.metric("Residual norm", f"{summary['residual_norm']:.3f}")
+    col4.metric("Condition (est.)", f"{summary['condition_estimate']:.2e}")
+
+    index = pd.Index(list(lap_numbers) if lap_numbers is not None else np.arange(diagnostics.m), name="LapNumber")
+    influence = pd.DataFrame(
+        {"Leverage": diagnostics.leverage, "CooksDistance": diagnostics.cooks_distance},
+        index=index
+    )
+    st.dataframe(influence.nlargest(top, "CooksDistance").round(4))
+    return diagnostics
+
+
+_SCOPE_KEY = "_f1_trace_scope"
+
+
+def begin_rerun() -> None:
+    """
+    Apelat la începutul scriptului: urmele sesiunii Streamlit curente
+    pornesc de la zero la fiecare rerun (celelalte sesiuni nu sunt atinse).
+    """
+    if not instrumentation.is_enabled():
+        return
+    if _SCOPE_KEY not in st.session_state:
+        st.session_state[_SCOPE_KEY] = uuid.uuid4().hex
+    scope = st.session_state[_SCOPE_KEY]
+    instrumentation.set_scope(scope)
+    instrumentation.reset(scope)
+
+
+def performance_panel(expanded: bool = False) -> None:
+    """
+    Panou „Performance”: timpul și memoria pe etape din rerun-ul curent,
+    numărătorii de cache hit / miss și descărcarea urmei (Chrome trace).
+    Nu afișează nimic dacă instrumentarea e oprită.
+    """
+    if not instrumentation.is_enabled():
+        return
+    import pandas as pd
+
+    scope = st.session_state.get(_SCOPE_KEY)
+    with st.expander("Performance", expanded=expanded):
+        rows = instrumentation.summary(scope)
+        if not rows:
+            st.info("No spans recorded in this rerun.")
+        else:
+            table = pd.DataFrame(rows).set_index("name")
+            columns = ["calls", "total_ms", "self_ms", "mean_ms", "max_ms"]
+            if table["mem_peak_bytes"].notna().any():
+                table["mem_peak_MB"] = table["mem_peak_bytes"] / 1e6
+                columns.append("mem_peak_MB")
+            st.dataframe(table[columns].round(2))
+
+        counters = instrumentation.counters(scope)
+        if counters:
+            st.dataframe(pd.Series(counters, name="count").sort_index())
+
+        st.download_button(
+            "Download trace (chrome://tracing)",
+            json.dumps(instrumentation.chrome_trace(scope)),
+            file_name="f1_trace.json",
+            mime="application/json",
+        )
+
+
+install_logging()
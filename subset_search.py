@@ -0,0 +1,151 @@
+"""
+Modul de căutare a subseturilor de feature-uri
+==============================================
+Factorizează o singură dată matricea cu toate feature-urile candidate
+(QR cu pivotare de coloane, care relevă rangul), elimină coloanele
+dependente liniar (de ex. AirTemp constant) și evaluează fiecare subset
+pe factorul triunghiular (n+1) x (n+1), fără a mai reveni la cele m tururi.
+Subseturile se ordonează după RMSE, AIC sau BIC.
+"""
+
+import itertools
+import numpy as np
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from tsqr import tsqr_factor
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def qr_column_pivoting(
+    A: np.ndarray,
+    tol: Optional[float] = None,
+    n_fixed: int = 1
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    QR Householder cu pivotare de coloane: A[:, perm] = Q R.
+    La fiecare pas se alege coloana cu cea mai mare normă reziduală relativă
+    la norma ei inițială (invariant la scara feature-urilor). Primele n_fixed
+    coloane (interceptul) rămân pe loc. Factorizarea se oprește când norma
+    relativă scade sub tol; rank este numărul de coloane independente.
+    """
+    A = A.astype(float).copy()
+    m, n = A.shape
+    if tol is None:
+        tol = max(m, n) * np.finfo(float).eps
+
+    perm = np.arange(n)
+    scale = np.linalg.norm(A, axis=0)
+    scale[scale == 0] = 1.0
+
+    rank = 0
+    for k in range(min(m, n)):
+        residual = np.linalg.norm(A[k:, k:], axis=0) / scale[k:]
+
+        if k >= n_fixed:
+            j = k + int(np.argmax(residual))
+            if j != k:
+                A[:, [k, j]] = A[:, [j, k]]
+                perm[[k, j]] = perm[[j, k]]
+                scale[[k, j]] = scale[[j, k]]
+                residual[[0, j - k]] = residual[[j - k, 0]]
+
+        if residual[0] <= tol:
+            break
+
+        # reflectorul Householder pentru coloana k
+        v = A[k:, k].copy()
+        sigma = np.linalg.norm(v) * (1.0 if v[0] >= 0 else -1.0)
+        v[0] += sigma
+        A[k:, k:] -= np.outer(v, (v @ A[k:, k:]) * (2.0 / (v @ v)))
+        A[k+1:, k] = 0.0
+        rank = k + 1
+
+    return A, perm, rank
+
+
+def _scores(rss: float, m: int, k: int) -> dict:
+    mse = max(rss, 0.0) / m
+    log_mse = np.log(mse) if mse > 0 else -np.inf
+    return {
+        "rss": rss,
+        "rmse": np.sqrt(mse),
+        "aic": m * log_mse + 2 * k,
+        "bic": m * log_mse + k * np.log(m),
+    }
+
+
+def search_subsets(
+    A: np.ndarray,
+    b: np.ndarray,
+    feature_names: List[str],
+    criterion: str = "bic",
+    max_size: Optional[int] = None,
+    tol: Optional[float] = None
+) -> Tuple["pd.DataFrame", List[str]]:
+    """
+    Evaluează toate subseturile de feature-uri (interceptul, prima coloană,
+    e mereu inclus). Returnează tabelul subseturilor ordonat după criteriu
+    și lista coloanelor eliminate ca dependente liniar.
+    """
+    if criterion not in ("rmse", "aic", "bic"):
+        raise ValueError(f"Unknown criterion: {criterion}")
+
+    m = A.shape[0]
+
+    # Pas 1: rangul și coloanele independente (pivotare)
+    _, perm, rank = qr_column_pivoting(A, tol)
+    kept = sorted(perm[:rank])
+    dropped = [feature_names[j] for j in sorted(perm[rank:])]
+
+    # Pas 2: factorul triunghiular al lui [A_kept | b], o singură dată
+    Rt = tsqr_factor([(A[:, kept], b)])
+    names = [feature_names[j] for j in kept]
+    p = len(kept)
+    rhs = Rt[:, p]
+
+    # Pas 3: fiecare subset pe factorul mic (p+1) x (p+1)
+    candidates = list(range(1, p))
+    if max_size is None:
+        max_size = len(candidates)
+
+    records = []
+    for size in range(0, max_size + 1):
+        for subset in itertools.combinations(candidates, size):
+            cols = [0, *subset]
+            small = np.linalg.qr(np.column_stack([Rt[:, cols], rhs]), mode="r")
+            k = len(cols)
+            rss = float(small[k, k] ** 2) if small.shape[0] > k else 0.0
+            records.append({
+                "features": [names[j] for j in subset],
+                "n_params": k,
+                **_scores(rss, m, k),
+            })
+
+    import pandas as pd
+
+    results = pd.DataFrame(records).sort_values(criterion, kind="stable").reset_index(drop=True)
+    return results, dropped
+
+
+def search_feature_subsets(
+    laps: "pd.DataFrame",
+    candidate_features: Optional[List[str]] = None,
+    criterion: str = "bic",
+    max_size: Optional[int] = None
+) -> Tuple[Optional["pd.DataFrame"], List[str]]:
+    """
+    Construiește matricea cu toate feature-urile candidate o singură dată
+    și caută cel mai bun subset.
+    """
+    from features import ALLOWED_FEATURES, build_feature_matrix
+
+    if candidate_features is None:
+        candidate_features = ALLOWED_FEATURES
+
+    A, b, names = build_feature_matrix(laps, None, candidate_features)
+    if A is None:
+        return None, []
+
+    return search_subsets(A, b, names, criterion=criterion, max_size=max_size)
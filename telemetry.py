@@ -0,0 +1,163 @@
+"""
+Modul de telemetrie
+===================
+Reeșantionează telemetria pe o grilă fixă de distanță, tur cu tur, sau o
+reduce la agregate pe tur, ca memoria să nu crească odată cu cursa.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterator, List, Optional, Tuple
+
+
+# Canalele de telemetrie FastF1 păstrate la reeșantionare
+TELEMETRY_CHANNELS = ["Speed", "RPM", "nGear", "Throttle", "Brake", "DRS"]
+
+# Canale cu valori discrete (treaptă, stare DRS, frână on/off): nu se
+# interpolează liniar, ci iau ultima valoare înregistrată înainte de punct
+DISCRETE_CHANNELS = {"nGear", "DRS", "Brake"}
+
+
+def iter_lap_telemetry(laps) -> Iterator[Tuple[float, pd.DataFrame]]:
+    """
+    Parcurge tururile (fastf1.core.Laps) și produce, pe rând, numărul turului
+    și telemetria lui cu coloana Distance. Un singur tur e în memorie odată.
+    """
+    for _, lap in laps.iterlaps():
+        try:
+            car_data = lap.get_car_data().add_distance()
+        except Exception:
+            continue
+        if car_data.empty:
+            continue
+        yield lap['LapNumber'], car_data
+
+
+def resample_on_distance(
+    telemetry: pd.DataFrame,
+    step: float = 10.0,
+    channels: Optional[List[str]] = None,
+    dtype=np.float32
+) -> pd.DataFrame:
+    """
+    Interpolează liniar canalele unui tur pe grila 0, step, 2*step, ... (metri).
+    Canalele din DISCRETE_CHANNELS iau valoarea eșantionului anterior, ca
+    să nu apară trepte sau stări DRS intermediare.
+    """
+    if channels is None:
+        channels = TELEMETRY_CHANNELS
+    channels = [c for c in channels if c in telemetry.columns]
+
+    distance = telemetry['Distance'].to_numpy(dtype=float)
+    # np.interp cere abscise crescătoare
+    order = np.argsort(distance, kind="stable")
+    distance = distance[order]
+
+    grid = np.arange(0.0, distance[-1] + step / 2, step)
+    # eșantionul anterior fiecărui punct al grilei (primul, înaintea lui)
+    previous = np.clip(np.searchsorted(distance, grid, side="right") - 1, 0, len(distance) - 1)
+
+    resampled = {'Distance': grid.astype(dtype)}
+    for col in channels:
+        values = telemetry[col].to_numpy(dtype=float)[order]
+        if col in DISCRETE_CHANNELS:
+            resampled[col] = values[previous].astype(dtype)
+        else:
+            resampled[col] = np.interp(grid, distance, values).astype(dtype)
+
+    return pd.DataFrame(resampled)
+
+
+def lap_aggregates(
+    telemetry: pd.DataFrame,
+    channels: Optional[List[str]] = None
+) -> dict:
+    """
+    Agregate pe un tur: media și maximul fiecărui canal, viteza minimă.
+    """
+    if channels is None:
+        channels = TELEMETRY_CHANNELS
+    channels = [c for c in channels if c in telemetry.columns]
+
+    row = {}
+    for col in channels:
+        values = telemetry[col].to_numpy(dtype=float)
+        row[f'{col}Mean'] = np.nanmean(values)
+        row[f'{col}Max'] = np.nanmax(values)
+    if 'Speed' in channels:
+        row['SpeedMin'] = np.nanmin(telemetry['Speed'].to_numpy(dtype=float))
+    return row
+
+
+def iter_resampled_laps(
+    laps,
+    step: float = 10.0,
+    channels: Optional[List[str]] = None,
+    dtype=np.float32,
+    aggregate: bool = False
+) -> Iterator[pd.DataFrame]:
+    """
+    Produce, tur cu tur, telemetria reeșantionată pe grila de distanță (cu
+    coloana LapNumber) sau, cu aggregate=True, rândul de agregate al turului.
+    Un singur tur e în memorie odată.
+    """
+    for lap_number, car_data in iter_lap_telemetry(laps):
+        if aggregate:
+            row = {col: np.asarray([value], dtype=dtype)
+                   for col, value in lap_aggregates(car_data, channels).items()}
+            frame = pd.DataFrame(row)
+        else:
+            frame = resample_on_distance(car_data, step, channels, dtype)
+        frame.insert(0, 'LapNumber', lap_number)
+        yield frame
+
+
+def resample_laps(
+    laps,
+    step: float = 10.0,
+    channels: Optional[List[str]] = None,
+    dtype=np.float32,
+    aggregate: bool = False
+) -> pd.DataFrame:
+    """
+    Telemetria tuturor tururilor, reeșantionată pe grila de distanță
+    (câte un bloc per tur, cu coloana LapNumber) sau, cu aggregate=True,
+    câte un rând de agregate per tur.
+    Blocurile din iter_resampled_laps se copiază pe rând într-un buffer per
+    coloană, prealocat după primul tur și numărul de tururi (dublat la
+    nevoie), fără lista tuturor tururilor și fără pd.concat.
+    """
+    try:
+        n_laps = max(len(laps), 1)
+    except TypeError:
+        n_laps = 1
+
+    buffers: dict = {}
+    size = capacity = 0
+    for frame in iter_resampled_laps(laps, step, channels, dtype, aggregate):
+        n = len(frame)
+        if size + n > capacity:
+            capacity = max(2 * capacity, size + n, n * n_laps)
+            for col, buffer in buffers.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:size] = buffer[:size]
+                buffers[col] = grown
+        for col in frame.columns:
+            values = frame[col].to_numpy()
+            if col not in buffers:
+                # canal apărut abia acum: rândurile anterioare rămân NaN
+                buffers[col] = np.full(capacity, np.nan, dtype=np.result_type(values.dtype, np.float32))
+            buffers[col][size:size + n] = values
+        for col in buffers.keys() - set(frame.columns):
+            buffers[col][size:size + n] = np.nan
+        size += n
+
+    if size == 0:
+        return pd.DataFrame()
+
+    # estimarea din primul tur poate depăși mult: nu ținem memoria nefolosită
+    trim = size < 0.75 * capacity
+    return pd.DataFrame(
+        {col: buffer[:size].copy() if trim else buffer[:size] for col, buffer in buffers.items()},
+        copy=False
+    )
@@ -0,0 +1,31 @@
+"""
+Configurare pytest: modulele proiectului sunt în rădăcina depozitului
+(fără pachet instalat), iar datele de test sunt sintetice (fără rețea).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def householder():
+    """Modulul Householder (numele fișierului conține spații)."""
+    from benchmark import _load_householder
+    return _load_householder()
+
+
+def lstsq(A, b):
+    """Soluția de referință numpy."""
+    return np.linalg.lstsq(A, b, rcond=None)[0]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from batch_ls import ls_batched, stack_problems
+from conftest import lstsq
+
+
+def test_ls_batched_matches_lstsq_for_mixed_shapes(rng):
+    shapes = [(30, 3), (80, 5), (12, 2), (50, 5)]
+    problems = [(rng.standard_normal(s), rng.standard_normal(s[0])) for s in shapes]
+
+    X, R, residual_norms = ls_batched(problems)
+
+    for (A, b), x, r, norm in zip(problems, X, R, residual_norms):
+        expected = lstsq(A, b)
+        np.testing.assert_allclose(x, expected, atol=1e-10)
+        assert r.shape == (A.shape[1], A.shape[1])
+        assert norm == pytest.approx(np.linalg.norm(A @ expected - b))
+
+
+def test_zero_column_gets_zero_coefficient(rng):
+    A = rng.standard_normal((40, 4))
+    A[:, 2] = 0.0
+    b = rng.standard_normal(40)
+
+    X, _, residual_norms = ls_batched([(A, b)])
+
+    expected = lstsq(np.delete(A, 2, axis=1), b)
+    assert X[0][2] == 0.0
+    np.testing.assert_allclose(np.delete(X[0], 2), expected, atol=1e-10)
+    assert residual_norms[0] == pytest.approx(np.linalg.norm(np.delete(A, 2, axis=1) @ expected - b))
+
+
+def test_stack_problems_rejects_underdetermined(rng):
+    with pytest.raises(ValueError):
+        stack_problems([(rng.standard_normal((3, 3)), rng.standard_normal(3))])
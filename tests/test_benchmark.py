@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from benchmark import make_problem, solver_cases
+
+
+@pytest.fixture
+def cases(householder):
+    return solver_cases(householder)
+
+
+def test_every_case_is_accurate(cases):
+    A, b = make_problem(200, 6)
+    x_ref = np.linalg.lstsq(A, b, rcond=None)[0]
+
+    for name, case in cases.items():
+        args = case.setup(A, b)
+        x, accuracy = case.check(A, b, args, case.solve(*args))
+        if x is not None:
+            np.testing.assert_allclose(x, x_ref, atol=1e-10, err_msg=name)
+        assert all(value < 1e-10 for value in accuracy.values()), name
+
+
+
+def test_setup_builds_fixed_triangular_factor(cases):
+    A, b = make_problem(100, 4)
+    case = cases["back_substitution"]
+
+    R1, d1 = case.setup(A, b)
+    R2, _ = case.setup(A, b)
+
+    np.testing.assert_array_equal(R1, R2)
+    assert np.allclose(R1, np.triu(R1))
+    np.testing.assert_allclose(R1 @ case.solve(R1, d1), d1)
@@ -0,0 +1,172 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import lap_store
+from cache_manager import HTTP_CACHE_NAME, CacheManager, FileLock, parse_size, session_key
+
+
+def _locked_increments(lock_path, counter_path, n):
+    """Citire-modificare-scriere sub lock; fără excludere s-ar pierde incrementări."""
+    for _ in range(n):
+        with FileLock(lock_path, timeout=60):
+            value = int(open(counter_path).read())
+            time.sleep(0.0005)
+            with open(counter_path, "w") as f:
+                f.write(str(value + 1))
+
+
+def test_file_lock_mutual_exclusion_across_processes(tmp_path):
+    lock_path = tmp_path / "counter.lock"
+    counter_path = tmp_path / "counter"
+    counter_path.write_text("0")
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(_locked_increments, lock_path, counter_path, 40) for _ in range(4)]
+        for future in futures:
+            future.result()
+
+    assert int(counter_path.read_text()) == 160
+    assert not lock_path.exists()
+
+
+def test_file_lock_times_out_while_held(tmp_path):
+    lock_path = tmp_path / "held.lock"
+    with FileLock(lock_path):
+        other = FileLock(lock_path, timeout=0.2)
+        with pytest.raises(TimeoutError):
+            other.__enter__()
+    assert not lock_path.exists()
+
+
+def test_file_lock_breaks_stale_lock(tmp_path):
+    lock_path = tmp_path / "stale.lock"
+    lock_path.write_text("12345:dead")
+    old = time.time() - 3600
+    os.utime(lock_path, (old, old))
+
+    with FileLock(lock_path, timeout=1, stale=60):
+        assert lock_path.read_text() != "12345:dead"
+    assert not lock_path.exists()
+
+
+def test_file_lock_keeps_lock_taken_over(tmp_path):
+    """La ieșire lock-ul se șterge doar dacă tokenul e încă al nostru."""
+    lock_path = tmp_path / "taken.lock"
+    with FileLock(lock_path):
+        lock_path.write_text("other:token")
+    assert lock_path.read_text() == "other:token"
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("F1_TABLE_STORE", str(tmp_path / "tables"))
+    return tmp_path
+
+
+def _store_session(year, event, session_type, n_bytes):
+    path = lap_store.session_path(year, event, session_type)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "laps.arrow").write_bytes(b"\0" * n_bytes)
+
+
+def test_eviction_keeps_cache_under_budget(cache_dir):
+    manager = CacheManager(str(cache_dir), budget=2500)
+    events = ["Bahrain", "Jeddah", "Melbourne", "Suzuka"]
+
+    evicted = []
+    for event in events:
+        _store_session(2024, event, "R", 1000)
+        evicted += manager.record_session(2024, event, "R")
+        time.sleep(0.01)
+        assert manager.total_bytes() <= 2500
+
+    # cele mai vechi sesiuni (LRU) pleacă primele, de pe disc și din manifest
+    assert evicted == [session_key(2024, "Bahrain", "R"), session_key(2024, "Jeddah", "R")]
+    assert sorted(manager.entries()) == [session_key(2024, "Melbourne", "R"), session_key(2024, "Suzuka", "R")]
+    assert not lap_store.session_path(2024, "Bahrain", "R").exists()
+    assert lap_store.session_path(2024, "Suzuka", "R").exists()
+
+
+def test_enforce_budget_evicts_least_recently_used(cache_dir):
+    manager = CacheManager(str(cache_dir), budget=0)
+    for event in ["Bahrain", "Jeddah", "Melbourne"]:
+        _store_session(2024, event, "R", 1000)
+        manager.record_session(2024, event, "R")
+        time.sleep(0.01)
+    assert len(manager.entries()) == 3
+
+    evicted = manager.enforce_budget(1500)
+
+    assert len(evicted) == 2
+    remaining = manager.entries()
+    assert len(remaining) == 1
+    assert next(iter(remaining.values()))["event_name"] == "Melbourne"
+    assert manager.total_bytes() <= 1500
+
+
+def test_manifest_shared_between_managers(cache_dir):
+    first = CacheManager(str(cache_dir), budget=0)
+    _store_session(2023, "Monaco", "Q", 10)
+    first.record_session(2023, "Monaco", "Q")
+
+    second = CacheManager(str(cache_dir), budget=0)
+    assert second.is_cached(2023, "Monaco", "Q")
+
+
+@pytest.mark.parametrize("text, expected", [("0", 0), ("512", 512), ("10G", 10 * 2**30), ("1.5m", 3 * 2**19)])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+def _write_http_cache(cache_dir, n_bytes):
+    (cache_dir / HTTP_CACHE_NAME).write_bytes(b"\0" * n_bytes)
+
+
+def test_http_cache_counts_against_budget(cache_dir):
+    _write_http_cache(cache_dir, 1500)
+    manager = CacheManager(str(cache_dir), budget=2500)
+
+    _store_session(2024, "Bahrain", "R", 1000)
+    assert manager.record_session(2024, "Bahrain", "R") == []
+    _store_session(2024, "Jeddah", "R", 1000)
+    evicted = manager.record_session(2024, "Jeddah", "R")
+
+    # sesiunea LRU ajunge: cache-ul HTTP rămâne
+    assert evicted == [session_key(2024, "Bahrain", "R")]
+    assert (cache_dir / HTTP_CACHE_NAME).exists()
+    assert manager.total_bytes() == 2500
+    assert manager.status()["total_bytes"] == 2500
+
+
+def test_http_cache_cleared_when_sessions_are_not_enough(cache_dir):
+    _write_http_cache(cache_dir, 1500)
+    (cache_dir / (HTTP_CACHE_NAME + "-journal")).write_bytes(b"\0" * 10)
+    manager = CacheManager(str(cache_dir), budget=2000)
+    _store_session(2024, "Bahrain", "R", 1000)
+
+    # sesiunea nouă nu se evacuează, iar cu ea singură cache-ul HTTP depășește bugetul
+    evicted = manager.record_session(2024, "Bahrain", "R")
+
+    assert evicted == [HTTP_CACHE_NAME]
+    assert not (cache_dir / HTTP_CACHE_NAME).exists()
+    assert not (cache_dir / (HTTP_CACHE_NAME + "-journal")).exists()
+    assert manager.is_cached(2024, "Bahrain", "R")
+    assert manager.total_bytes() == 1000
+
+
+def test_http_cache_larger_than_budget_does_not_evict_sessions(cache_dir):
+    manager = CacheManager(str(cache_dir), budget=0)
+    for event in ["Bahrain", "Jeddah"]:
+        _store_session(2024, event, "R", 1000)
+        manager.record_session(2024, event, "R")
+    _write_http_cache(cache_dir, 5000)
+    assert manager.total_bytes() == 7000
+
+    evicted = manager.enforce_budget(3000)
+
+    assert evicted == [HTTP_CACHE_NAME]
+    assert len(manager.entries()) == 2
+    assert manager.total_bytes() == 2000
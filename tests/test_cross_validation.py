@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from conftest import lstsq
+from cross_validation import cross_validate, kfold_labels, loo_cv
+
+
+@pytest.fixture
+def data(rng):
+    m = 90
+    A = np.column_stack([np.ones(m), rng.standard_normal((m, 3))])
+    b = A @ np.array([80.0, 0.3, -0.2, 0.1]) + 0.2 * rng.standard_normal(m)
+    return A, b
+
+
+@pytest.mark.parametrize("k", [2, 5, 9])
+def test_cross_validate_matches_refit(data, k):
+    A, b = data
+    labels = kfold_labels(len(b), k, seed=1)
+
+    keys, rmse, coefs = cross_validate(A, b, labels)
+
+    assert len(keys) == k
+    for g, key in enumerate(keys):
+        held_out = labels == key
+        x = lstsq(A[~held_out], b[~held_out])
+        np.testing.assert_allclose(coefs[g], x, atol=1e-10)
+        expected = np.sqrt(np.mean((A[held_out] @ x - b[held_out]) ** 2))
+        assert rmse[g] == pytest.approx(expected, rel=1e-10)
+
+
+def test_cross_validate_string_labels(data):
+    A, b = data
+    labels = np.array(["Bahrain", "Jeddah", "Monaco"] * 30)
+
+    keys, rmse, _ = cross_validate(A, b, labels)
+
+    assert keys == ["Bahrain", "Jeddah", "Monaco"]
+    assert np.all(np.isfinite(rmse))
+
+
+def test_cross_validate_needs_two_folds(data):
+    A, b = data
+    with pytest.raises(ValueError):
+        cross_validate(A, b, np.zeros(len(b)))
+
+
+def test_loo_cv_matches_brute_force(data):
+    A, b = data
+
+    loo_residuals, rmse = loo_cv(A, b)
+
+    for i in range(len(b)):
+        keep = np.arange(len(b)) != i
+        x = lstsq(A[keep], b[keep])
+        assert loo_residuals[i] == pytest.approx(b[i] - A[i] @ x, abs=1e-10)
+    assert rmse == pytest.approx(np.sqrt(np.mean(loo_residuals ** 2)))
+
+
+def test_kfold_labels_are_balanced():
+    labels = kfold_labels(103, 5)
+    counts = np.bincount(labels)
+    assert counts.max() - counts.min() <= 1
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURES, add_lap_context, build_feature_matrix
+from prediction_service import expected_columns
+
+
+def _session_laps(rng, compounds, n_laps=20, event="Bahrain"):
+    """Tururi sintetice pentru doi piloți, câte un stint pe compound."""
+    frames = []
+    for driver in ("VER", "HAM"):
+        stint_length = n_laps // len(compounds)
+        lap = np.arange(1, n_laps + 1)
+        stint = np.minimum((lap - 1) // stint_length, len(compounds) - 1) + 1
+        frames.append(pd.DataFrame({
+            "EventName": event,
+            "Driver": driver,
+            "LapNumber": lap.astype(float),
+            "Stint": stint.astype(float),
+            "Compound": [compounds[s - 1] for s in stint],
+            "TyreLife": (lap - (stint - 1) * stint_length).astype(float),
+            "TrackTemp": rng.uniform(30, 45, n_laps),
+            "AirTemp": rng.uniform(20, 30, n_laps),
+            "WindSpeed": rng.uniform(0, 5, n_laps),
+            "LapTime": pd.to_timedelta(rng.uniform(90, 95, n_laps), unit="s"),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.parametrize("compounds", [["SOFT"], ["MEDIUM", "HARD"], ["INTERMEDIATE", "WET", "SOFT"]])
+def test_columns_are_the_same_for_every_session(rng, compounds):
+    reference = _session_laps(rng, ["SOFT", "MEDIUM", "HARD"])
+    other = _session_laps(rng, compounds, event="Monaco")
+
+    A_ref, _, names_ref = build_feature_matrix(reference, None, FEATURES)
+    A, _, names = build_feature_matrix(other, None, FEATURES)
+
+    assert names == names_ref == ["Intercept"] + expected_columns(FEATURES)
+    assert A.shape[1] == A_ref.shape[1]
+
+
+def test_compound_one_hot_against_soft(rng):
+    laps = _session_laps(rng, ["SOFT", "MEDIUM", "WET", "HARD"])
+
+    A, _, names = build_feature_matrix(laps, None, ["Compound"])
+
+    assert names == ["Intercept", "Compound_MEDIUM", "Compound_HARD", "Compound_INTERMEDIATE", "Compound_WET"]
+    compound = laps["Compound"].to_numpy()
+    for j, name in enumerate(names[1:], start=1):
+        np.testing.assert_array_equal(A[:, j], compound == name.split("_", 1)[1])
+    assert not A[compound == "SOFT", 1:].any()
+
+
+def test_selection_order_does_not_change_columns(rng):
+    laps = _session_laps(rng, ["SOFT", "HARD"])
+
+    _, _, names = build_feature_matrix(laps, None, ["FuelLoad", "TyreLife", "Compound"])
+    _, _, names_reversed = build_feature_matrix(laps, None, ["Compound", "TyreLife", "FuelLoad"])
+
+    assert names == names_reversed
+
+
+def test_matrix_is_float64_fortran_without_nan(rng):
+    laps = _session_laps(rng, ["SOFT", "HARD"])
+    laps.loc[3, "TrackTemp"] = np.nan
+    laps.loc[5, "LapTime"] = pd.NaT
+
+    A, b, _ = build_feature_matrix(laps, None, FEATURES)
+
+    assert A.dtype == np.float64 and A.flags.f_contiguous
+    assert A.shape[0] == len(b) == len(laps) - 1
+    assert np.isfinite(A).all()
+
+
+def test_lap_context_is_computed_before_filtering(rng):
+    laps = _session_laps(rng, ["SOFT", "HARD"])
+    context = add_lap_context(laps)
+    # primul tur al fiecărui stint (out-lap) și ultimul tur al cursei dispar la filtrare
+    first_of_stint = context["LapNumber"] == context["StintStartLap"]
+    filtered = context[~first_of_stint & (context["LapNumber"] < 20)]
+
+    A, _, names = build_feature_matrix(filtered, None, ["LapsSincePit", "FuelLoad"])
+
+    laps_since_pit = A[:, names.index("LapsSincePit")]
+    fuel = A[:, names.index("FuelLoad")]
+    np.testing.assert_array_equal(laps_since_pit, filtered["LapNumber"] - filtered["StintStartLap"])
+    assert laps_since_pit.min() == 1.0
+    np.testing.assert_allclose(fuel, 1.0 - (filtered["LapNumber"] - 1.0) / 20.0)
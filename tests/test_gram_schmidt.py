@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from conftest import lstsq
+from gram_schmidt import ls_gram_schmidt, qr_block_gram_schmidt, qr_gram_schmidt
+
+
+def _orthogonality_loss(Q):
+    Q = Q.astype(np.float64)
+    return np.linalg.norm(Q.T @ Q - np.eye(Q.shape[1]))
+
+
+def _conditioned(rng, m, n, cond):
+    U, _ = np.linalg.qr(rng.standard_normal((m, n)))
+    V, _ = np.linalg.qr(rng.standard_normal((n, n)))
+    return U @ np.diag(np.logspace(0, np.log10(cond), n)) @ V.T
+
+
+def _positive_r(A):
+    R = np.linalg.qr(A, mode="r")
+    return R * np.sign(np.diag(R))[:, None]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 32, 100])
+def test_block_gram_schmidt_float64(rng, block_size):
+    A = _conditioned(rng, 400, 40, 1e6)
+
+    Q, R = qr_block_gram_schmidt(A, block_size)
+
+    assert _orthogonality_loss(Q) < 1e-13
+    np.testing.assert_allclose(R, _positive_r(A), atol=1e-12)
+    np.testing.assert_allclose(Q @ R, A, atol=1e-12)
+
+
+@pytest.mark.parametrize("cond", [1e1, 1e4, 1e6])
+def test_float32_orthogonality_no_worse_than_lapack_float32(rng, cond):
+    A = _conditioned(rng, 2000, 60, cond)
+
+    Q, R = qr_block_gram_schmidt(A, 16, np.float32)
+
+    assert Q.dtype == np.float32 and R.dtype == np.float64
+    Q_ref, _ = np.linalg.qr(A.astype(np.float32))
+    assert _orthogonality_loss(Q) <= 2 * _orthogonality_loss(Q_ref)
+    # R se acumulează în float64: eroarea e sub precizia float32 a lui Q
+    R_exact = _positive_r(A)
+    assert np.linalg.norm(R - R_exact) / np.linalg.norm(R_exact) < 1e-7
+
+
+def test_ls_gram_schmidt_float32_matches_lstsq(rng):
+    A = np.column_stack([np.ones(500), rng.standard_normal((500, 7))])
+    b = A @ rng.standard_normal(8) + 0.1 * rng.standard_normal(500)
+
+    x, _, _ = ls_gram_schmidt(A, b, block_size=4, dtype=np.float32)
+
+    np.testing.assert_allclose(x, lstsq(A, b), rtol=1e-5, atol=1e-6)
+
+
+def test_modified_gram_schmidt_matches_lstsq(rng):
+    A = rng.standard_normal((80, 6))
+    b = rng.standard_normal(80)
+
+    x, _, _ = ls_gram_schmidt(A, b)
+
+    np.testing.assert_allclose(x, lstsq(A, b), atol=1e-10)
+
+
+@pytest.mark.parametrize("qr", [qr_gram_schmidt, lambda A: qr_block_gram_schmidt(A, 2)])
+def test_rank_deficient_raises(rng, qr):
+    A = rng.standard_normal((30, 4))
+    A[:, 3] = A[:, 0] + A[:, 1]
+    A[:, 2] = 0.0
+    with pytest.raises(ValueError):
+        qr(A)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from conftest import lstsq
+
+
+@pytest.mark.parametrize("shape", [(50, 5), (300, 37), (40, 39)])
+@pytest.mark.parametrize("block_size", [1, 4, 16, 64])
+def test_blocked_tort_matches_unblocked(householder, rng, shape, block_size):
+    A = rng.standard_normal(shape)
+    R, U, beta = householder.tort_householder(A)
+    R_b, U_b, beta_b = householder.tort_householder_blocked(A, block_size)
+
+    np.testing.assert_allclose(R_b, R, atol=1e-10)
+    np.testing.assert_allclose(U_b, U, atol=1e-10)
+    np.testing.assert_allclose(beta_b, beta, atol=1e-10)
+
+
+@pytest.mark.parametrize("block_size", [None, 3, 32])
+def test_ls_householder_matches_lstsq(householder, rng, block_size):
+    A = rng.standard_normal((200, 12))
+    b = rng.standard_normal(200)
+
+    x, _, _ = householder.ls_householder(A, b, block_size)
+
+    np.testing.assert_allclose(x, lstsq(A, b), atol=1e-10)
+
+
+@pytest.mark.parametrize("block_size", [None, 4])
+def test_ls_householder_multiple_rhs(householder, rng, block_size):
+    A = rng.standard_normal((120, 6))
+    B = rng.standard_normal((120, 3))
+
+    X, _, _ = householder.ls_householder(A, B, block_size)
+
+    np.testing.assert_allclose(X, lstsq(A, B), atol=1e-10)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from conftest import lstsq
+from incremental_qr import IncrementalLS
+
+
+@pytest.fixture
+def data(rng):
+    m, n = 2000, 5
+    A = np.column_stack([np.ones(m), rng.standard_normal((m, n - 1))])
+    b = A @ rng.standard_normal(n) + rng.standard_normal(m)
+    return A, b
+
+
+def test_add_rows_matches_lstsq(data):
+    A, b = data
+    model = IncrementalLS(A.shape[1])
+    for a, y in zip(A[:200], b[:200]):
+        model.add_row(a, y)
+
+    x = lstsq(A[:200], b[:200])
+    np.testing.assert_allclose(model.coefficients, x, atol=1e-10)
+    assert model.residual_norm == pytest.approx(np.linalg.norm(A[:200] @ x - b[:200]))
+    assert model.n_rows == 200
+
+
+def test_sliding_window_does_not_drift(data):
+    """Mii de actualizări + downdating: soluția rămâne cea a ferestrei."""
+    A, b = data
+    window = 40
+    model = IncrementalLS(A.shape[1])
+
+    for i in range(len(b)):
+        model.add_row(A[i], b[i])
+        if i >= window:
+            model.delete_row(A[i - window], b[i - window])
+        if i >= window and i % 250 == 0:
+            rows = slice(i - window + 1, i + 1)
+            np.testing.assert_allclose(model.coefficients, lstsq(A[rows], b[rows]), atol=1e-9)
+
+    rows = slice(len(b) - window, len(b))
+    x = lstsq(A[rows], b[rows])
+    np.testing.assert_allclose(model.coefficients, x, atol=1e-9)
+    assert model.residual_norm == pytest.approx(np.linalg.norm(A[rows] @ x - b[rows]), rel=1e-8)
+
+
+def test_from_householder_then_delete(householder, data):
+    A, b = data
+    A, b = A[:100], b[:100]
+    _, R, d = householder.ls_householder(A, b)
+
+    model = IncrementalLS.from_householder(R, d)
+    for a, y in zip(A[:30], b[:30]):
+        model.delete_row(a, y)
+
+    np.testing.assert_allclose(model.coefficients, lstsq(A[30:], b[30:]), atol=1e-10)
+
+
+def test_delete_row_with_exact_fit(rng):
+    """rho = 0 (potrivire exactă) înainte și după eliminare."""
+    A = rng.standard_normal((12, 4))
+    x_true = np.array([1.0, -2.0, 3.0, 0.5])
+    b = A @ x_true
+    model = IncrementalLS(4)
+    for a, y in zip(A, b):
+        model.add_row(a, y)
+
+    model.delete_row(A[0], b[0])
+    np.testing.assert_allclose(model.coefficients, x_true, atol=1e-10)
+
+    # un tur cu zgomot adăugat și apoi eliminat readuce potrivirea exactă
+    model.add_row(A[0], b[0] + 1.0)
+    assert model.residual_norm > 0.1
+    model.delete_row(A[0], b[0] + 1.0)
+    np.testing.assert_allclose(model.coefficients, x_true, atol=1e-10)
+    # rho se obține dintr-o diferență de pătrate: precizie ~ sqrt(eps) * ||b||
+    assert model.residual_norm < 1e-6
+
+
+def test_delete_unknown_row_raises(data):
+    A, b = data
+    model = IncrementalLS(A.shape[1])
+    for a, y in zip(A[:20], b[:20]):
+        model.add_row(a, y)
+    before = model.Rt.copy()
+
+    with pytest.raises(ValueError):
+        model.delete_row(100 * A[50], b[50])
+    np.testing.assert_array_equal(model.Rt, before)
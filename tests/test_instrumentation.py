@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+import instrumentation
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    monkeypatch.setattr(instrumentation, "MAX_SPANS", 5)
+    monkeypatch.setattr(instrumentation, "MAX_SCOPES", 3)
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.set_scope(None)
+    instrumentation.reset()
+
+
+def _record(scope, n_spans, counter="cache.hit"):
+    instrumentation.set_scope(scope)
+    for i in range(n_spans):
+        with instrumentation.span("stage", i=i):
+            pass
+    instrumentation.count(counter)
+
+
+def test_spans_per_scope_are_bounded(tracing):
+    _record("a", 20)
+    _record(None, 20)
+
+    recent = instrumentation.spans("a")
+    assert len(recent) == 5
+    # se păstrează cele mai recente
+    assert [r["attrs"]["i"] for r in recent] == list(range(15, 20))
+    assert len(instrumentation.spans()) == 10
+
+
+def test_oldest_scope_is_dropped(tracing):
+    for scope in ("a", "b", "c", "d"):
+        _record(scope, 2)
+    _record(None, 2)
+
+    assert instrumentation.spans("a") == []
+    assert "cache.hit" not in instrumentation.counters("a")
+    assert all(len(instrumentation.spans(scope)) == 2 for scope in ("b", "c", "d"))
+    assert instrumentation.counters()["cache.hit"] == 4
+
+
+def test_reset_and_export_drop_scope(tracing, tmp_path):
+    _record("a", 3)
+    _record("b", 3)
+
+    instrumentation.reset("a")
+    assert instrumentation.spans("a") == []
+    assert len(instrumentation.spans("b")) == 3
+
+    path = tmp_path / "trace.jsonl"
+    instrumentation.export_jsonl(str(path), scope="b")
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["type"] for line in lines] == ["span"] * 3 + ["counters"]
+    assert lines[-1]["counters"] == {"cache.hit": 1}
+    assert instrumentation.spans() == []
+    assert instrumentation.counters() == {}
+
+
+def test_export_all_clears_memory(tracing, tmp_path):
+    _record("a", 2)
+    _record(None, 2)
+
+    path = tmp_path / "trace.json"
+    instrumentation.export(str(path))
+    trace = json.loads(path.read_text())
+    assert sum(e["ph"] == "X" for e in trace["traceEvents"]) == 4
+    assert instrumentation.spans() == []
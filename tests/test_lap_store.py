@@ -0,0 +1,142 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import lap_store
+
+
+KEY = (2024, "Emilia Romagna Grand Prix", "R")
+
+
+class _Session:
+    def __init__(self, laps, weather=None):
+        self.name = "Race"
+        self.laps = laps
+        self.weather_data = weather
+        self.event = pd.Series({"EventName": KEY[1], "Location": "Imola", "Country": "Italy",
+                                "RoundNumber": np.int64(7)})
+
+
+def _laps(n=50):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Driver": pd.array(["VER", "LEC"] * (n // 2), dtype="object"),
+        "LapNumber": np.arange(1, n + 1, dtype=np.float64),
+        "Stint": np.repeat([1, 2], n // 2).astype(np.int64),
+        "LapTime": pd.to_timedelta(rng.uniform(80.0, 90.0, size=n), unit="s"),
+        "LapStartTime": pd.to_timedelta(np.arange(n) * 85.0, unit="s"),
+        "LapStartDate": pd.Timestamp("2024-05-19 13:00") + pd.to_timedelta(np.arange(n) * 85.0, unit="s"),
+        "TyreLife": rng.uniform(1.0, 30.0, size=n).astype(np.float32),
+        "IsPersonalBest": rng.random(n) < 0.1,
+    })
+
+
+def _weather():
+    return pd.DataFrame({
+        "Time": pd.to_timedelta([0.0, 60.0, 120.0], unit="s"),
+        "AirTemp": [24.0, 24.5, 25.0],
+        "Rainfall": [False, False, True],
+    })
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("F1_TABLE_STORE", str(tmp_path))
+    return tmp_path
+
+
+def test_round_trip_keeps_dtypes(store):
+    laps, weather = _laps(), _weather()
+    path = lap_store.write_session(*KEY, _Session(laps, weather))
+
+    assert path.parent.parent.parent == store
+    stored = lap_store.read_session(*KEY)
+    pd.testing.assert_frame_equal(stored.laps, laps)
+    pd.testing.assert_frame_equal(stored.weather_data, weather)
+    assert stored.laps["LapTime"].dtype == "timedelta64[ns]"
+    assert stored.laps["TyreLife"].dtype == np.float32
+    assert stored.name == "Race"
+    assert stored.event["EventName"] == KEY[1]
+    assert stored.event["RoundNumber"] == 7
+    assert stored.event["year"] == 2024
+
+
+def test_session_without_weather(store):
+    lap_store.write_session(*KEY, _Session(_laps(), None))
+    assert lap_store.read_session(*KEY).weather_data is None
+
+
+def test_missing_session_is_a_miss(store):
+    assert not lap_store.has_session(*KEY)
+    assert lap_store.read_session(*KEY) is None
+
+
+def test_tables_without_meta_read_as_miss(store, monkeypatch):
+    write_atomic = lap_store._write_atomic
+
+    def crash_on_meta(path, write_fn):
+        if path.name == "meta.json":
+            raise KeyboardInterrupt
+        write_atomic(path, write_fn)
+
+    monkeypatch.setattr(lap_store, "_write_atomic", crash_on_meta)
+    with pytest.raises(KeyboardInterrupt):
+        lap_store.write_session(*KEY, _Session(_laps(), _weather()))
+
+    path = lap_store.session_path(*KEY)
+    # tabelele sunt scrise, dar fără meta.json sesiunea nu există
+    assert (path / "laps.arrow").exists() and (path / "weather.arrow").exists()
+    assert not lap_store.has_session(*KEY)
+    assert lap_store.read_session(*KEY) is None
+
+
+def test_failed_write_leaves_previous_table(store, monkeypatch):
+    import pyarrow.feather as feather
+
+    laps = _laps()
+    lap_store.write_session(*KEY, _Session(laps, _weather()))
+    path = lap_store.session_path(*KEY)
+    before = (path / "laps.arrow").read_bytes()
+
+    def partial_write(table, dest, **kwargs):
+        with open(dest, "wb") as f:
+            f.write(b"ARROW1 partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(feather, "write_feather", partial_write)
+    with pytest.raises(OSError):
+        lap_store.write_table(*KEY, "laps", laps.iloc[:3])
+
+    assert (path / "laps.arrow").read_bytes() == before
+    assert sorted(p.name for p in path.iterdir()) == ["laps.arrow", "meta.json", "weather.arrow"]
+    pd.testing.assert_frame_equal(lap_store.read_session(*KEY).laps, laps)
+
+
+def test_meta_is_written_last(store, monkeypatch):
+    order = []
+    write_atomic = lap_store._write_atomic
+
+    def recording(path, write_fn):
+        order.append(path.name)
+        write_atomic(path, write_fn)
+
+    monkeypatch.setattr(lap_store, "_write_atomic", recording)
+    lap_store.write_session(*KEY, _Session(_laps(), _weather()))
+    assert order == ["laps.arrow", "weather.arrow", "meta.json"]
+    assert json.loads((lap_store.session_path(*KEY) / "meta.json").read_text())["session_type"] == "R"
+
+
+def test_read_is_memory_mapped(store):
+    import pyarrow as pa
+
+    n = 1_000_000
+    laps = pd.DataFrame({"LapNumber": np.arange(n, dtype=np.float64), "Sector1": np.ones(n)})
+    lap_store.write_session(*KEY, _Session(laps))
+
+    allocated = pa.total_allocated_bytes()
+    stored = lap_store.read_session(*KEY)
+    # coloanele numerice vin din fișierul mapat, nu din memoria pyarrow
+    assert pa.total_allocated_bytes() - allocated < laps.memory_usage().sum() / 10
+    np.testing.assert_array_equal(stored.laps["LapNumber"].to_numpy(), laps["LapNumber"].to_numpy())
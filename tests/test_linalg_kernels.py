@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from gram_schmidt import ls_gram_schmidt
+from linalg_kernels import FactorizationCache, solve_triangular
+
+
+@pytest.mark.parametrize("trans", [False, True])
+@pytest.mark.parametrize("block_size", [1, 3, 64])
+def test_solve_triangular_multiple_rhs(rng, trans, block_size):
+    R = np.triu(rng.standard_normal((20, 20))) + 5 * np.eye(20)
+    B = rng.standard_normal((20, 4))
+
+    X = solve_triangular(R, B, trans=trans, block_size=block_size)
+
+    np.testing.assert_allclose((R.T if trans else R) @ X, B, atol=1e-10)
+    np.testing.assert_allclose(solve_triangular(R, B[:, 0], trans=trans, block_size=block_size), X[:, 0])
+
+
+def test_solve_triangular_singular_raises():
+    with pytest.raises(ValueError):
+        solve_triangular(np.diag([1.0, 0.0, 2.0]), np.ones(3))
+
+
+def test_cached_factors_are_read_only_and_reused(householder, rng):
+    A = rng.standard_normal((60, 4))
+    b = rng.standard_normal(60)
+    cache = FactorizationCache()
+
+    x1, R, _ = householder.ls_householder(A, b, cache=cache)
+    x2, R_again, _ = householder.ls_householder(A, 2 * b, cache=cache)
+
+    assert cache.hits == 1 and cache.misses == 1
+    assert R_again is R
+    np.testing.assert_allclose(x2, 2 * x1, atol=1e-12)
+    with pytest.raises(ValueError):
+        R[0, 0] = 1.0
+
+
+def test_cache_lru_eviction(rng):
+    cache = FactorizationCache(max_entries=2)
+    matrices = [rng.standard_normal((30, 3)) for _ in range(3)]
+    for A in matrices:
+        ls_gram_schmidt(A, np.ones(30), block_size=2, cache=cache)
+
+    ls_gram_schmidt(matrices[0], np.ones(30), block_size=2, cache=cache)
+
+    assert cache.misses == 4 and cache.hits == 0
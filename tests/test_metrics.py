@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from conftest import lstsq
+from metrics import RegressionDiagnostics, estimate_condition_number
+
+
+def _factor(rng, m, n, spread):
+    A = rng.normal(size=(m, n)) * np.logspace(0, spread, n)
+    return A, np.linalg.qr(A, mode="r")
+
+
+@pytest.mark.parametrize("n", [3, 10, 30])
+@pytest.mark.parametrize("spread", [0, 3, 8])
+def test_condition_estimate_matches_cond_1(rng, n, spread):
+    _, R = _factor(rng, 200, n, spread)
+    estimate = estimate_condition_number(R)
+    exact = np.linalg.cond(R, 1)
+
+    # Hager/Higham dă o margine inferioară, de obicei exactă
+    assert estimate <= exact * (1 + 1e-10)
+    assert estimate >= exact / 3
+
+
+def test_condition_estimate_singular():
+    R = np.triu(np.ones((3, 3)))
+    R[1, 1] = 0.0
+    assert estimate_condition_number(R) == np.inf
+
+
+def _problem(rng, m=120):
+    A = np.column_stack([np.ones(m), rng.uniform(1, 30, m), np.arange(1.0, m + 1)])
+    b = A @ np.array([90.0, 0.05, -0.02]) + rng.normal(scale=0.3, size=m)
+    return A, b
+
+
+def _direct(A, b):
+    """Formulele directe: H = A (A^T A)^{-1} A^T, D_i din reziduali și h_ii."""
+    m, n = A.shape
+    x = lstsq(A, b)
+    e = b - A @ x
+    h = np.diag(A @ np.linalg.solve(A.T @ A, A.T))
+    s2 = e @ e / (m - n)
+    return {
+        "x": x,
+        "residuals": e,
+        "residual_norm": np.linalg.norm(e),
+        "rmse": np.sqrt(np.mean(e ** 2)),
+        "r_squared": 1 - e @ e / np.sum((b - b.mean()) ** 2),
+        "leverage": h,
+        "cooks_distance": e ** 2 / (n * s2) * h / (1 - h) ** 2,
+    }
+
+
+def _check(diagnostics, expected):
+    np.testing.assert_allclose(diagnostics.residuals, expected["residuals"], atol=1e-9)
+    for name in ("residual_norm", "rmse", "r_squared"):
+        assert getattr(diagnostics, name) == pytest.approx(expected[name], rel=1e-9)
+    np.testing.assert_allclose(diagnostics.leverage, expected["leverage"], rtol=1e-9)
+    np.testing.assert_allclose(diagnostics.cooks_distance, expected["cooks_distance"], rtol=1e-7)
+    assert diagnostics.leverage.sum() == pytest.approx(diagnostics.n)
+
+
+def test_diagnostics_from_householder_output(rng, householder):
+    A, b = _problem(rng)
+    x, R, d = householder.ls_householder(A, b)
+    expected = _direct(A, b)
+    np.testing.assert_allclose(x, expected["x"], rtol=1e-9)
+
+    diagnostics = RegressionDiagnostics(A, b, x, R, d)
+    _check(diagnostics, expected)
+    assert diagnostics.condition_estimate == pytest.approx(np.linalg.cond(R[:3, :3], 1), rel=1e-9)
+
+
+def test_diagnostics_with_thin_q(rng):
+    A, b = _problem(rng)
+    Q, R = np.linalg.qr(A)
+    x = np.linalg.solve(R, Q.T @ b)
+
+    diagnostics = RegressionDiagnostics(A, b, x, R, Q=Q)
+    assert diagnostics.Q is Q
+    _check(diagnostics, _direct(A, b))
+
+
+def test_diagnostics_are_memoized(rng):
+    A, b = _problem(rng)
+    Q, R = np.linalg.qr(A)
+    x = np.linalg.solve(R, Q.T @ b)
+    diagnostics = RegressionDiagnostics(A, b, x, R)
+
+    assert diagnostics.leverage is diagnostics.leverage
+    summary = diagnostics.summary()
+    assert set(summary) == {"residual_norm", "rmse", "r_squared", "condition_estimate"}
+    assert summary["rmse"] == diagnostics.rmse
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import plots
+from plots import lttb_downsample, render_figure
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 100), (1001, 3), (50, 49), (7, 5)])
+def test_lttb_keeps_endpoints_and_count(rng, n, n_out):
+    x = np.sort(rng.uniform(0, 100, n))
+    y = rng.standard_normal(n)
+
+    idx = lttb_downsample(x, y, n_out)
+
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_spike():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[567] = 10.0
+
+    idx = lttb_downsample(x, y, 50)
+
+    assert 567 in idx
+
+
+@pytest.mark.parametrize("n_out", [2, 1000, 5000])
+def test_lttb_returns_all_points_when_not_reducing(n_out):
+    x = np.arange(1000.0)
+    np.testing.assert_array_equal(lttb_downsample(x, x, n_out), np.arange(1000))
+
+
+def _line_plot(frame, color="red"):
+    _line_plot.calls += 1
+    fig, ax = plots._new_figure((3, 2))
+    ax.plot(frame["x"], frame["y"], color=color)
+    return fig
+
+
+def test_render_cache_keys_on_content():
+    plots.clear_render_cache()
+    _line_plot.calls = 0
+    frame = pd.DataFrame({"x": [0.0, 1.0, 2.0], "y": [1.0, 3.0, 2.0]})
+
+    first = render_figure(_line_plot, frame)
+    again = render_figure(_line_plot, frame.copy())
+    other = render_figure(_line_plot, frame.assign(y=[1.0, 3.0, 2.5]))
+
+    assert first == again
+    assert other != first
+    assert _line_plot.calls == 2
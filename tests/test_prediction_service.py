@@ -0,0 +1,152 @@
+import json
+import threading
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+import numpy as np
+import pytest
+
+from prediction_service import MicroBatcher, ModelRegistry, make_server, model_key, save_model
+
+
+FEATURES = ["TyreLife", "LapNumber"]
+COLUMNS = ["Intercept", "TyreLife", "LapNumber"]
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setenv("F1_MODEL_REGISTRY", str(tmp_path))
+    save_model(2024, "Bahrain", "R", "VER", COLUMNS, np.array([90.0, 0.05, -0.02]), features=FEATURES)
+    save_model(2024, "Bahrain", "R", "HAM", COLUMNS, np.array([91.0, 0.04, -0.03]), features=FEATURES)
+    return ModelRegistry(tmp_path)
+
+
+@pytest.fixture
+def batcher(registry):
+    # o așteptare lungă, ca toate cererile testului să intre în același lot
+    batcher = MicroBatcher(registry, max_batch_rows=10000, max_wait_ms=200)
+    yield batcher
+    batcher.close()
+
+
+def _key(driver):
+    return model_key(2024, "Bahrain", "R", driver, FEATURES)
+
+
+def test_predictions_match_coefficients(batcher, registry):
+    rows = np.array([[5.0, 10.0], [12.0, 30.0]])
+    futures = [batcher.submit(_key(d), rows) for d in ("VER", "HAM", "VER")]
+
+    for driver, future in zip(("VER", "HAM", "VER"), futures):
+        x, _ = registry.get(_key(driver))
+        np.testing.assert_allclose(future.result(5), x[0] + rows @ x[1:])
+
+
+def test_single_row_request(batcher, registry):
+    x, _ = registry.get(_key("VER"))
+    result = batcher.predict(_key("VER"), [3.0, 7.0], timeout=5, columns=FEATURES)
+    np.testing.assert_allclose(result, [x @ [1.0, 3.0, 7.0]])
+
+
+def test_malformed_request_fails_alone(batcher, registry):
+    good = [batcher.submit(_key("VER"), np.ones((4, 2))) for _ in range(3)]
+    wrong_width = batcher.submit(_key("VER"), np.ones((4, 3)))
+    wrong_names = batcher.submit(_key("HAM"), np.ones((2, 2)), columns=["LapNumber", "TyreLife"])
+    unknown = batcher.submit(model_key(2024, "Bahrain", "R", "XXX", FEATURES), np.ones((1, 2)))
+    good.append(batcher.submit(_key("HAM"), np.ones((2, 2)), columns=FEATURES))
+
+    expected = [registry.get(_key("VER"))[0].sum()] * 3 + [registry.get(_key("HAM"))[0].sum()]
+    for future, value in zip(good, expected):
+        np.testing.assert_allclose(future.result(5), value)
+    with pytest.raises(ValueError):
+        wrong_width.result(5)
+    with pytest.raises(ValueError):
+        wrong_names.result(5)
+    with pytest.raises(KeyError):
+        unknown.result(5)
+
+    stats = batcher.stats.snapshot()
+    assert stats["errors"] == 3
+    assert stats["requests"] == len(good)
+
+
+def test_save_model_rejects_mismatched_columns(tmp_path, monkeypatch):
+    monkeypatch.setenv("F1_MODEL_REGISTRY", str(tmp_path))
+    with pytest.raises(ValueError):
+        save_model(2024, "Bahrain", "R", "VER", ["Intercept", "TyreLife"], np.zeros(2), features=FEATURES)
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_registry_rejects_path_like_keys(registry):
+    assert registry.get("../" + _key("VER")) is None
+    assert registry.get(_key("VER")) is not None
+
+
+def test_model_key_is_order_independent():
+    assert _key("VER") == model_key(2024, "Bahrain", "R", "VER", list(reversed(FEATURES)))
+    assert _key("VER") != model_key(2023, "Bahrain", "R", "VER", FEATURES)
+    assert _key("VER") != model_key(2024, "Bahrain", "Q", "VER", FEATURES)
+
+
+def test_registry_reloads_saved_model(registry, tmp_path):
+    old, _ = registry.get(_key("VER"))
+    save_model(2024, "Bahrain", "R", "VER", COLUMNS, np.array([80.0, 0.1, 0.0]), features=FEATURES)
+    new, _ = registry.get(_key("VER"))
+    np.testing.assert_allclose(new, [80.0, 0.1, 0.0])
+    assert not np.allclose(old, new)
+
+    (tmp_path / f"{_key('VER')}.json").unlink()
+    assert registry.get(_key("VER")) is None
+
+
+class _CorruptRegistry:
+    """Un model cu mai mulți coeficienți decât coloane: A @ x eșuează."""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def get(self, key):
+        if key == _key("HAM"):
+            return np.zeros(5), COLUMNS
+        return self.registry.get(key)
+
+
+def test_unexpected_error_fails_batch_not_worker(registry):
+    batcher = MicroBatcher(_CorruptRegistry(registry), max_wait_ms=50)
+    try:
+        broken = batcher.submit(_key("HAM"), np.ones((2, 2)))
+        with pytest.raises(ValueError):
+            broken.result(5)
+        # firul de lucru trăiește: cererile următoare primesc răspuns
+        x, _ = registry.get(_key("VER"))
+        np.testing.assert_allclose(batcher.predict(_key("VER"), np.ones((1, 2)), timeout=5), [x.sum()])
+    finally:
+        batcher.close()
+
+
+def test_http_rejects_non_object_payload(registry):
+    server, batcher = make_server(port=0, registry=registry)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/predict"
+
+    def post(payload):
+        req = urlrequest.Request(url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+        try:
+            with urlrequest.urlopen(req, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urlerror.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        for payload in ([[1.0, 2.0]], "rows", 3):
+            status, body = post(payload)
+            assert status == 400
+            assert "JSON object" in body["error"]
+        status, body = post({"key": _key("VER"), "rows": [[1.0, 1.0]]})
+        assert status == 200
+        np.testing.assert_allclose(body["predictions"], [registry.get(_key("VER"))[0].sum()])
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.close()
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import lap_store
+import prefetch as prefetch_module
+from cache_manager import CacheManager
+from prefetch import CacheMiss, prefetch
+
+
+SESSIONS = [(2024, f"Event {i}", "R") for i in range(6)]
+
+
+class StubSession:
+    """Sesiune sintetică cu laps/weather_data/event ca fastf1.core.Session."""
+
+    def __init__(self, event_name, n_laps=5):
+        self.name = "Race"
+        self.event = pd.Series({"EventName": event_name, "Location": "X", "Country": "Y", "RoundNumber": 1})
+        self.laps = pd.DataFrame({
+            "Driver": ["VER"] * n_laps,
+            "LapNumber": np.arange(1, n_laps + 1, dtype=np.float64),
+            "LapTime": pd.to_timedelta(90 + np.arange(n_laps, dtype=np.float64), unit="s"),
+        })
+        self.weather_data = pd.DataFrame({
+            "Time": pd.to_timedelta([0, 60], unit="s"),
+            "AirTemp": [25.0, 25.5],
+        })
+
+
+class StubLoader:
+    """Loader care numără apelurile concurente și poate eșua de câteva ori."""
+
+    def __init__(self, failures=0, delay=0.0, n_laps=5):
+        self.failures = failures
+        self.delay = delay
+        self.n_laps = n_laps
+        self.calls = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, year, event_name, session_type, datasets, offline=False):
+        key = (year, event_name, session_type)
+        with self.lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+            attempt = self.calls[key]
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if attempt <= self.failures:
+                raise ConnectionError(f"attempt {attempt} failed")
+            return StubSession(event_name, self.n_laps)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    """Depozitul columnar și cache-ul FastF1 în directoare temporare."""
+    monkeypatch.setenv("F1_TABLE_STORE", str(tmp_path / "tables"))
+    monkeypatch.setenv("FASTF1_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setattr("cache_manager._managers", {})
+    return tmp_path
+
+
+def test_worker_limit(stores):
+    loader = StubLoader(delay=0.05)
+    results = prefetch(SESSIONS, max_workers=2, loader=loader, progress=lambda *a: None)
+
+    assert [r["status"] for r in results] == ["loaded"] * len(SESSIONS)
+    assert loader.max_active == 2
+
+
+def test_retries_with_backoff(stores, monkeypatch):
+    # fără jitter: așteptările sunt exact backoff, 2*backoff, ...
+    monkeypatch.setattr(prefetch_module.random, "random", lambda: 0.0)
+    loader = StubLoader(failures=2)
+    results = prefetch(SESSIONS[:1], retries=3, backoff=0.05, loader=loader, progress=lambda *a: None)
+
+    assert results[0]["status"] == "loaded"
+    assert results[0]["attempts"] == 3
+    assert loader.calls[SESSIONS[0]] == 3
+    assert 0.15 <= results[0]["seconds"] < 1.0
+
+
+def test_fails_after_retries_exhausted(stores):
+    loader = StubLoader(failures=10)
+    results = prefetch(SESSIONS[:2], retries=2, backoff=0.001, loader=loader, progress=lambda *a: None)
+
+    assert [r["status"] for r in results] == ["failed", "failed"]
+    assert all(r["attempts"] == 3 for r in results)
+    assert "failed" in results[0]["error"]
+    assert not lap_store.has_session(*SESSIONS[0])
+
+
+def test_empty_laps_count_as_failure(stores):
+    loader = StubLoader(n_laps=0)
+    results = prefetch(SESSIONS[:1], retries=0, loader=loader, progress=lambda *a: None)
+
+    assert results[0]["status"] == "failed"
+    assert "empty" in results[0]["error"]
+
+
+def test_offline_cache_miss_fails_fast(stores):
+    loader = StubLoader(failures=10, delay=0.01)
+    start = time.perf_counter()
+    with pytest.raises(CacheMiss):
+        prefetch(SESSIONS, max_workers=2, retries=5, backoff=10.0, offline=True,
+                 loader=loader, progress=lambda *a: None)
+
+    # fără reîncercări (backoff de 10 s) și fără sesiunile rămase
+    assert time.perf_counter() - start < 5.0
+    assert all(n == 1 for n in loader.calls.values())
+    assert len(loader.calls) < len(SESSIONS)
+
+
+def test_results_in_store_and_manifest(stores):
+    loader = StubLoader()
+    progress = []
+    prefetch(SESSIONS[:3], loader=loader, progress=lambda done, total, r: progress.append((done, total)))
+
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+    manager = CacheManager(stores / "cache")
+    for key in SESSIONS[:3]:
+        stored = lap_store.read_session(*key)
+        assert stored is not None
+        assert len(stored.laps) == 5
+        assert stored.event["EventName"] == key[1]
+        assert stored.weather_data is not None
+        assert manager.is_cached(*key)
+
+
+def test_cached_sessions_are_skipped_unless_forced(stores):
+    loader = StubLoader()
+    prefetch(SESSIONS[:2], loader=loader, progress=lambda *a: None)
+
+    again = prefetch(SESSIONS[:2], loader=loader, progress=lambda *a: None)
+    assert [r["status"] for r in again] == ["cached", "cached"]
+    assert all(n == 1 for n in loader.calls.values())
+
+    forced = prefetch(SESSIONS[:2], force=True, loader=loader, progress=lambda *a: None)
+    assert [r["status"] for r in forced] == ["loaded", "loaded"]
+    assert all(n == 2 for n in loader.calls.values())
+
+
+def test_duplicate_sessions_load_once(stores):
+    loader = StubLoader()
+    results = prefetch(SESSIONS[:1] * 3, loader=loader, progress=lambda *a: None)
+
+    assert len(results) == 1
+    assert loader.calls == {SESSIONS[0]: 1}
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from recursive_ls import RecursiveLS
+
+
+@pytest.fixture
+def data(rng):
+    m = 1500
+    A = np.column_stack([np.ones(m), rng.standard_normal((m, 2))])
+    b = A @ np.array([90.0, 0.4, -0.3]) + 0.1 * rng.standard_normal(m)
+    return A, b
+
+
+def test_window_matches_lstsq_after_many_steps(data):
+    A, b = data
+    window = 30
+    model = RecursiveLS(3, window=window, delta=1e-12)
+
+    model.fit_stream(A, b)
+
+    rows = slice(len(b) - window, len(b))
+    x = np.linalg.lstsq(A[rows], b[rows], rcond=None)[0]
+    np.testing.assert_allclose(model.coefficients, x, atol=1e-8)
+
+
+def test_forgetting_matches_weighted_lstsq(data):
+    A, b = data
+    lam = 0.98
+    model = RecursiveLS(3, forgetting=lam, delta=1e-12)
+
+    model.fit_stream(A, b)
+
+    w = np.sqrt(lam ** np.arange(len(b) - 1, -1, -1))
+    x = np.linalg.lstsq(A * w[:, None], b * w, rcond=None)[0]
+    np.testing.assert_allclose(model.coefficients, x, atol=1e-8)
+
+
+def test_window_with_forgetting_matches_weighted_lstsq(data):
+    A, b = data
+    lam, window = 0.95, 50
+    model = RecursiveLS(3, forgetting=lam, window=window, delta=1e-12)
+
+    model.fit_stream(A, b)
+
+    rows = slice(len(b) - window, len(b))
+    w = np.sqrt(lam ** np.arange(window - 1, -1, -1))
+    x = np.linalg.lstsq(A[rows] * w[:, None], b[rows] * w, rcond=None)[0]
+    np.testing.assert_allclose(model.coefficients, x, atol=1e-8)
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        RecursiveLS(3, forgetting=0.0)
+    with pytest.raises(ValueError):
+        RecursiveLS(3, window=3)
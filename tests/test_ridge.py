@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from ridge import ls_ridge, ridge_fit, ridge_path, ridge_select
+
+
+def _ridge_brute_force(A, b, lam, intercept):
+    """Ridge prin ecuațiile normale (interceptul, dacă există, nepenalizat)."""
+    penalty = lam * np.eye(A.shape[1])
+    if intercept:
+        penalty[0, 0] = 0.0
+    return np.linalg.solve(A.T @ A + penalty, A.T @ b)
+
+
+@pytest.fixture
+def data(rng):
+    m, n = 120, 5
+    A = np.column_stack([np.ones(m), rng.standard_normal((m, n - 1))])
+    b = A @ rng.standard_normal(n) + 0.5 * rng.standard_normal(m)
+    return A, b
+
+
+LAMBDAS = np.logspace(-4, 3, 15)
+
+
+@pytest.mark.parametrize("intercept", [True, False])
+def test_ridge_path_matches_normal_equations(data, intercept):
+    A, b = data
+    if not intercept:
+        A = A[:, 1:]
+
+    X, _, _ = ridge_path(A, b, LAMBDAS)
+
+    for lam, x in zip(LAMBDAS, X):
+        np.testing.assert_allclose(x, _ridge_brute_force(A, b, lam, intercept), atol=1e-9)
+
+
+def test_ridge_path_zero_lambda_is_least_squares(data):
+    A, b = data
+    X, _, _ = ridge_path(A, b, [0.0])
+    np.testing.assert_allclose(X[0], np.linalg.lstsq(A, b, rcond=None)[0], atol=1e-10)
+
+
+def test_gcv_matches_definition(data):
+    A, b = data
+    m = len(b)
+    _, gcv, _ = ridge_path(A, b, LAMBDAS)
+
+    for lam, score in zip(LAMBDAS, gcv):
+        x = _ridge_brute_force(A, b, lam, True)
+        # hat matrix pe datele centrate, plus 1/m pentru intercept
+        Z = A[:, 1:] - A[:, 1:].mean(axis=0)
+        H = Z @ np.linalg.solve(Z.T @ Z + lam * np.eye(Z.shape[1]), Z.T) + 1.0 / m
+        rss = np.sum((b - A @ x) ** 2)
+        assert score == pytest.approx(m * rss / (m - np.trace(H)) ** 2, rel=1e-9)
+
+
+@pytest.mark.parametrize("block_elements", [1, 37, 1 << 20])
+def test_loocv_matches_brute_force(data, monkeypatch, block_elements):
+    import ridge
+
+    monkeypatch.setattr(ridge, "LOOCV_BLOCK_ELEMENTS", block_elements)
+    A, b = data
+    lambdas = LAMBDAS[::4]
+    _, _, loocv = ridge_path(A, b, lambdas)
+
+    for lam, score in zip(lambdas, loocv):
+        errors = []
+        for i in range(len(b)):
+            keep = np.arange(len(b)) != i
+            x = ls_ridge(A[keep], b[keep], lam)
+            errors.append(b[i] - A[i] @ x)
+        assert score == pytest.approx(np.mean(np.square(errors)), rel=1e-9)
+
+
+def test_ridge_fit_matches_path(data):
+    A, b = data
+    X, _, loocv = ridge_path(A, b, LAMBDAS)
+    k = 6
+
+    x, fitted, residuals, leverage = ridge_fit(A, b, LAMBDAS[k])
+
+    np.testing.assert_allclose(x, X[k], atol=1e-12)
+    np.testing.assert_allclose(fitted + residuals, b, atol=1e-12)
+    assert np.mean((residuals / (1 - leverage)) ** 2) == pytest.approx(loocv[k], rel=1e-9)
+
+
+@pytest.mark.parametrize("criterion", ["gcv", "loocv"])
+def test_ridge_select_picks_minimum(data, criterion):
+    A, b = data
+    x, lam, scores = ridge_select(A, b, LAMBDAS, criterion)
+
+    best = int(np.nanargmin(scores))
+    assert lam == LAMBDAS[best]
+    np.testing.assert_allclose(x, ls_ridge(A, b, lam), atol=1e-12)
+
+
+def test_ridge_select_rejects_unknown_criterion(data):
+    with pytest.raises(ValueError):
+        ridge_select(*data, LAMBDAS, criterion="aic")
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import lap_store
+from season_table import FLOAT64_COLUMNS, SeasonTable, build_season_table, compact_laps
+
+
+SESSIONS = [(2024, "Bahrain Grand Prix", "R"), (2024, "Saudi Arabian Grand Prix", "R")]
+DRIVERS = {"VER": "1", "LEC": "16", "NOR": "4"}
+
+
+class _Session:
+    def __init__(self, event_name, laps):
+        self.name = "Race"
+        self.laps = laps
+        self.weather_data = None
+        self.event = pd.Series({"EventName": event_name})
+
+
+def _laps(rng, n_laps=40):
+    frames = []
+    # tururile vin amestecate, ca în FastF1 (ordonate după timp, nu după pilot)
+    for driver, number in DRIVERS.items():
+        pit = int(rng.integers(10, 30))
+        frames.append(pd.DataFrame({
+            "Driver": driver,
+            "DriverNumber": number,
+            "Team": "Team " + driver,
+            "LapNumber": np.arange(1.0, n_laps + 1),
+            "Stint": np.where(np.arange(n_laps) < pit, 1.0, 2.0),
+            "Compound": np.where(np.arange(n_laps) < pit, "MEDIUM", "HARD"),
+            "TyreLife": np.concatenate([np.arange(1.0, pit + 1), np.arange(1.0, n_laps - pit + 1)]),
+            "LapTime": pd.to_timedelta(rng.uniform(90.0, 95.0, n_laps), unit="s"),
+            "Sector1Time": pd.to_timedelta(rng.uniform(28.0, 31.0, n_laps), unit="s"),
+            "SpeedST": rng.uniform(280.0, 330.0, n_laps),
+            "Position": rng.integers(1, 21, n_laps).astype(float),
+            "FuelLoad": rng.uniform(10.0, 110.0, n_laps) / 3,
+            "IsPersonalBest": pd.array(rng.random(n_laps) < 0.1, dtype=object),
+        }))
+    return pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=0).reset_index(drop=True)
+
+
+@pytest.fixture
+def season(rng, tmp_path, monkeypatch):
+    monkeypatch.setenv("F1_TABLE_STORE", str(tmp_path))
+    originals = {}
+    for key in SESSIONS:
+        originals[key] = _laps(rng)
+        lap_store.write_session(*key, _Session(key[1], originals[key]))
+    table, summary = build_season_table(SESSIONS, weather_method=None)
+    return table, summary, originals
+
+
+def _comparable(df):
+    """Valorile, fără dtype-urile compactate (categorice -> șiruri)."""
+    out = df.reset_index(drop=True).copy()
+    for name, col in out.items():
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            out[name] = col.astype(str)
+        elif pd.api.types.is_numeric_dtype(col.dtype) and not pd.api.types.is_bool_dtype(col.dtype):
+            out[name] = col.astype(float)
+        elif col.dtype == "boolean" or (col.dtype == object and col.map(type).eq(bool).all()):
+            out[name] = col.astype(bool)
+    return out
+
+
+def test_slices_are_views(season):
+    table, _, _ = season
+    base = table.laps["LapTime"].to_numpy()
+    for session in table.sessions:
+        for driver in table.drivers(session):
+            laps = table.driver_laps(session, driver)
+            assert np.shares_memory(laps["LapTime"].to_numpy(), base)
+            for stint in (1, 2):
+                stint_laps = table.stint_laps(session, driver, stint)
+                assert len(stint_laps) > 0
+                assert np.shares_memory(stint_laps["SpeedST"].to_numpy(), table.laps["SpeedST"].to_numpy())
+
+
+def test_slices_match_original_laps(season):
+    table, summary, originals = season
+    assert summary["laps"].iloc[0] == sum(len(laps) for laps in originals.values())
+    assert table.sessions == SESSIONS
+
+    for key, original in originals.items():
+        assert sorted(table.drivers(key)) == sorted(DRIVERS)
+        for driver, number in DRIVERS.items():
+            expected = original[original["Driver"] == driver].sort_values(["Stint", "LapNumber"])
+            got = table.driver_laps(key, driver)[expected.columns]
+            pd.testing.assert_frame_equal(_comparable(got), _comparable(expected), check_dtype=False)
+            # numărul pilotului duce la același bloc
+            assert table.driver_laps(key, number).index.equals(table.driver_laps(key, driver).index)
+            for stint in (1.0, 2.0):
+                part = expected[expected["Stint"] == stint]
+                got = table.stint_laps(key, driver, int(stint))[expected.columns]
+                pd.testing.assert_frame_equal(_comparable(got), _comparable(part), check_dtype=False)
+
+    assert table.driver_laps(SESSIONS[0], "HAM").empty
+    assert len(table.driver_laps("Bahrain Grand Prix", "VER")) == 40
+
+
+def test_compact_float32_within_tolerance(rng):
+    laps = _laps(rng)
+    compact = compact_laps(laps, float32=True)
+
+    assert compact["FuelLoad"].dtype == np.float32
+    assert compact["Position"].dtype == np.int8
+    assert compact["Compound"].dtype == "category"
+    assert compact["IsPersonalBest"].dtype == "boolean"
+    for name in FLOAT64_COLUMNS:
+        if name in laps and laps[name].dtype == np.float64 and compact[name].dtype.kind == "f":
+            assert compact[name].dtype == np.float64
+    assert compact.memory_usage(deep=True).sum() < laps.memory_usage(deep=True).sum()
+
+    for name in laps.columns:
+        before, after = laps[name], compact[name]
+        if pd.api.types.is_float_dtype(before.dtype):
+            np.testing.assert_allclose(after.to_numpy(dtype=float), before.to_numpy(), rtol=1e-6)
+        elif pd.api.types.is_timedelta64_dtype(before.dtype):
+            pd.testing.assert_series_equal(after, before)
+        else:
+            assert list(after.astype(object)) == list(before.astype(object))
+
+
+def test_save_and_load(season, tmp_path):
+    table, _, _ = season
+    path = tmp_path / "season.arrow"
+    table.save(path)
+    loaded = SeasonTable.load(path)
+
+    pd.testing.assert_frame_equal(loaded.laps, table.laps)
+    assert loaded.driver_offsets == table.driver_offsets
+    assert loaded.stint_offsets == table.stint_offsets
@@ -0,0 +1,96 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from conftest import lstsq
+from subset_search import qr_column_pivoting, search_subsets
+
+
+NAMES = ["Intercept", "TyreLife", "LapNumber", "TrackTemp", "AirTemp"]
+
+
+def _problem(rng, m=200):
+    A = np.column_stack([np.ones(m), rng.uniform(1, 30, m), np.arange(1.0, m + 1), rng.uniform(30, 45, m),
+                         rng.uniform(20, 28, m)])
+    b = A @ np.array([90.0, 0.05, -0.02, 0.1, 0.0]) + rng.normal(scale=0.3, size=m)
+    return A, b
+
+
+def test_pivoting_factorizes_permuted_matrix(rng):
+    A, _ = _problem(rng)
+    A[:, 2] *= 1e4
+    R, perm, rank = qr_column_pivoting(A)
+
+    assert rank == A.shape[1]
+    assert sorted(perm) == list(range(A.shape[1]))
+    np.testing.assert_allclose(np.triu(R[:rank]), R[:rank])
+    Ap = A[:, perm]
+    np.testing.assert_allclose(R[:rank].T @ R[:rank], Ap.T @ Ap, rtol=1e-9, atol=1e-6 * np.abs(Ap.T @ Ap).max())
+
+
+@pytest.mark.parametrize("n_fixed", [1, 2])
+def test_fixed_columns_stay_in_place(rng, n_fixed):
+    A, _ = _problem(rng)
+    # coloana 1 e aproape coliniară cu interceptul: nefixată, ar ajunge ultima
+    A[:, 1] = A[:, 0] * 5 + rng.normal(scale=1e-3, size=len(A))
+    _, perm, _ = qr_column_pivoting(A, n_fixed=n_fixed)
+    assert list(perm[:n_fixed]) == list(range(n_fixed))
+
+
+def test_constant_column_is_dropped(rng):
+    A, b = _problem(rng)
+    A[:, 4] = 24.0
+    _, perm, rank = qr_column_pivoting(A)
+    assert rank == 4
+    assert perm[0] == 0 and perm[-1] == 4
+
+    results, dropped = search_subsets(A, b, NAMES)
+    assert dropped == ["AirTemp"]
+    assert all("AirTemp" not in f for f in results["features"])
+
+
+def test_collinear_column_is_dropped(rng):
+    A, b = _problem(rng)
+    A[:, 3] = 2 * A[:, 1] - A[:, 2]
+    _, _, rank = qr_column_pivoting(A)
+    assert rank == 4
+
+    results, dropped = search_subsets(A, b, NAMES)
+    assert len(dropped) == 1 and dropped[0] in ("TyreLife", "LapNumber", "TrackTemp")
+    # 3 feature-uri rămase -> 2^3 subseturi
+    assert len(results) == 8
+
+
+@pytest.mark.parametrize("criterion", ["rmse", "aic", "bic"])
+def test_scores_match_lstsq(rng, criterion):
+    A, b = _problem(rng)
+    m = len(b)
+    results, dropped = search_subsets(A, b, NAMES, criterion=criterion)
+
+    assert dropped == []
+    assert len(results) == 2 ** (len(NAMES) - 1)
+    assert results[criterion].is_monotonic_increasing
+    for _, row in results.iterrows():
+        cols = [0] + [NAMES.index(f) for f in row["features"]]
+        x = lstsq(A[:, cols], b)
+        rss = float(np.sum((b - A[:, cols] @ x) ** 2))
+        k = len(cols)
+        assert row["n_params"] == k
+        assert row["rss"] == pytest.approx(rss, rel=1e-8)
+        assert row["rmse"] == pytest.approx(np.sqrt(rss / m), rel=1e-8)
+        assert row["aic"] == pytest.approx(m * np.log(rss / m) + 2 * k, rel=1e-8)
+        assert row["bic"] == pytest.approx(m * np.log(rss / m) + k * np.log(m), rel=1e-8)
+
+
+def test_max_size_limits_subsets(rng):
+    A, b = _problem(rng)
+    results, _ = search_subsets(A, b, NAMES, max_size=1)
+    expected = [c for size in range(2) for c in itertools.combinations(NAMES[1:], size)]
+    assert sorted(map(tuple, results["features"])) == sorted(expected)
+
+
+def test_unknown_criterion(rng):
+    A, b = _problem(rng)
+    with pytest.raises(ValueError):
+        search_subsets(A, b, NAMES, criterion="r2")
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telemetry import DISCRETE_CHANNELS, iter_resampled_laps, lap_aggregates, resample_laps, resample_on_distance
+
+
+def _telemetry():
+    return pd.DataFrame({
+        "Distance": [0.0, 7.0, 14.0, 21.0, 30.0],
+        "Speed": [100.0, 110.0, 120.0, 130.0, 140.0],
+        "nGear": [3, 3, 4, 4, 5],
+        "DRS": [0, 0, 12, 12, 8],
+        "Brake": [True, False, False, True, True],
+    })
+
+
+def test_grid_and_linear_channels():
+    telemetry = _telemetry()
+    resampled = resample_on_distance(telemetry, step=5.0)
+
+    grid = np.arange(0.0, 31.0, 5.0)
+    np.testing.assert_array_equal(resampled["Distance"], grid)
+    expected = np.interp(grid, telemetry["Distance"], telemetry["Speed"])
+    np.testing.assert_allclose(resampled["Speed"], expected, rtol=1e-6)
+
+
+def test_discrete_channels_take_previous_sample():
+    telemetry = _telemetry()
+    resampled = resample_on_distance(telemetry, step=5.0)
+
+    for col in DISCRETE_CHANNELS:
+        values = resampled[col].to_numpy()
+        # doar valori înregistrate, fără trepte / coduri DRS intermediare
+        assert set(values) <= set(telemetry[col].astype(float))
+    np.testing.assert_array_equal(resampled["nGear"], [3, 3, 3, 4, 4, 4, 5])
+    np.testing.assert_array_equal(resampled["DRS"], [0, 0, 0, 12, 12, 12, 8])
+
+
+def test_unsorted_distance():
+    telemetry = _telemetry().iloc[[2, 0, 4, 1, 3]]
+    np.testing.assert_array_equal(
+        resample_on_distance(telemetry, step=5.0)["nGear"],
+        resample_on_distance(_telemetry(), step=5.0)["nGear"],
+    )
+
+
+class _Lap(dict):
+    def __init__(self, number, car_data):
+        super().__init__(LapNumber=float(number))
+        self.car_data = car_data
+
+    def get_car_data(self):
+        return self
+
+    def add_distance(self):
+        return self.car_data
+
+
+class _Laps:
+    """Înlocuitor pentru fastf1.core.Laps: doar iterlaps() și len()."""
+
+    def __init__(self, laps):
+        self.laps = laps
+
+    def __len__(self):
+        return len(self.laps)
+
+    def iterlaps(self):
+        for i, lap in enumerate(self.laps):
+            yield i, lap
+
+
+def _laps(rng, lengths):
+    laps = []
+    for number, length in enumerate(lengths, start=1):
+        distance = np.cumsum(rng.uniform(1.0, 8.0, size=30))
+        distance *= length / distance[-1]
+        laps.append(_Lap(number, pd.DataFrame({
+            "Distance": distance,
+            "Speed": rng.uniform(80.0, 320.0, size=30),
+            "RPM": rng.uniform(9000.0, 12000.0, size=30),
+            "nGear": rng.integers(2, 9, size=30),
+        })))
+    return _Laps(laps)
+
+
+@pytest.mark.parametrize("lengths", [[100.0] * 4, [60.0, 150.0, 400.0, 90.0]])
+def test_resample_laps_matches_per_lap_frames(rng, lengths):
+    laps = _laps(rng, lengths)
+    result = resample_laps(laps, step=5.0)
+
+    expected = []
+    for lap in laps.laps:
+        frame = resample_on_distance(lap.car_data, step=5.0)
+        frame.insert(0, "LapNumber", lap["LapNumber"])
+        expected.append(frame)
+    pd.testing.assert_frame_equal(result, pd.concat(expected, ignore_index=True))
+    assert result["Speed"].dtype == np.float32
+
+
+def test_resample_laps_aggregate(rng):
+    laps = _laps(rng, [100.0, 120.0, 80.0])
+    result = resample_laps(laps, aggregate=True)
+
+    assert list(result["LapNumber"]) == [1.0, 2.0, 3.0]
+    for (_, row), lap in zip(result.iterrows(), laps.laps):
+        for col, value in lap_aggregates(lap.car_data).items():
+            assert row[col] == pytest.approx(value, rel=1e-6)
+    assert result["SpeedMax"].dtype == np.float32
+
+
+def test_iter_resampled_laps_is_lazy(rng):
+    laps = _laps(rng, [100.0, 120.0])
+    frames = iter_resampled_laps(laps, step=10.0)
+    first = next(frames)
+    assert set(first["LapNumber"]) == {1.0}
+    assert len(list(frames)) == 1
+
+
+def test_resample_laps_without_telemetry():
+    assert resample_laps(_Laps([])).empty
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from conftest import lstsq
+from tsqr import iter_row_chunks, ls_tsqr
+
+
+@pytest.mark.parametrize("chunk_size", [7, 50, 1000])
+def test_ls_tsqr_matches_lstsq(rng, chunk_size):
+    A = rng.standard_normal((500, 6))
+    b = rng.standard_normal(500)
+
+    x, R, _, residual_norm = ls_tsqr(iter_row_chunks(A, b, chunk_size))
+
+    expected = lstsq(A, b)
+    np.testing.assert_allclose(x, expected, atol=1e-10)
+    assert residual_norm == pytest.approx(np.linalg.norm(A @ expected - b))
+    assert np.all(np.diag(R) > 0)
+
+
+def test_ls_tsqr_process_pool_matches_serial(rng):
+    A = rng.standard_normal((400, 5))
+    b = rng.standard_normal(400)
+
+    x_serial, _, _, _ = ls_tsqr(iter_row_chunks(A, b, 40))
+    x_pool, _, _, _ = ls_tsqr(iter_row_chunks(A, b, 40), n_jobs=2)
+
+    np.testing.assert_allclose(x_pool, x_serial, atol=1e-12)
+
+
+def test_ls_tsqr_without_rows_raises():
+    with pytest.raises(ValueError):
+        ls_tsqr(iter([]))
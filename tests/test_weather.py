@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from weather import align_weather
+
+
+def _weather(rng, n=40, start=100.0):
+    t = start + np.cumsum(rng.uniform(30.0, 90.0, size=n))
+    return pd.DataFrame({
+        "Time": pd.to_timedelta(t, unit="s"),
+        "TrackTemp": rng.uniform(30.0, 45.0, size=n),
+        "AirTemp": rng.uniform(20.0, 28.0, size=n),
+        "WindSpeed": rng.uniform(0.0, 5.0, size=n),
+    })
+
+
+def _laps(rng, n=30):
+    # primele tururi încep înaintea primului eșantion meteo (t = 100 s)
+    lap_time = rng.uniform(85.0, 95.0, size=n)
+    end = np.cumsum(lap_time)
+    return pd.DataFrame({
+        "LapNumber": np.arange(1, n + 1, dtype=float),
+        "Time": pd.to_timedelta(end, unit="s"),
+        "LapStartTime": pd.to_timedelta(end - lap_time, unit="s"),
+        "LapTime": pd.to_timedelta(lap_time, unit="s"),
+    })
+
+
+def _samples(weather, col):
+    t = weather["Time"].dt.total_seconds().to_numpy()
+    v = weather[col].to_numpy(dtype=float)
+    keep = ~np.isnan(v)
+    order = np.argsort(t[keep], kind="stable")
+    return t[keep][order], v[keep][order]
+
+
+def _value(t, v, at):
+    """Semnalul liniar pe porțiuni, constant în afara eșantioanelor (buclă simplă)."""
+    if at <= t[0]:
+        return v[0]
+    if at >= t[-1]:
+        return v[-1]
+    for i in range(len(t) - 1):
+        if t[i] <= at <= t[i + 1]:
+            if t[i + 1] == t[i]:
+                return v[i + 1]
+            return v[i] + (v[i + 1] - v[i]) * (at - t[i]) / (t[i + 1] - t[i])
+
+
+def _reference(laps, weather, method, col):
+    t, v = _samples(weather, col)
+    second = pd.Timedelta(seconds=1)
+    out = []
+    for _, lap in laps.iterrows():
+        # Timedelta.total_seconds() rotunjește la microsecunde
+        end = lap["Time"] / second
+        start = lap["LapStartTime"] / second if pd.notna(lap["LapStartTime"]) \
+            else end - lap["LapTime"] / second
+        if np.isnan(start):
+            out.append(np.nan)
+        elif method == "asof":
+            before = [i for i in range(len(t)) if t[i] <= start]
+            out.append(v[before[-1]] if before else v[0])
+        elif method == "interpolate":
+            out.append(_value(t, v, (start + end) / 2))
+        else:
+            # trapez exact: punctele de frângere ale semnalului din interiorul turului
+            points = np.concatenate([[start], t[(t > start) & (t < end)], [end]])
+            values = [_value(t, v, p) for p in points]
+            out.append(np.trapezoid(values, points) / (end - start))
+    return np.array(out)
+
+
+@pytest.mark.parametrize("method", ["asof", "interpolate", "mean"])
+def test_matches_per_lap_reference(rng, method):
+    laps, weather = _laps(rng), _weather(rng)
+    aligned = align_weather(laps, weather, method=method)
+
+    assert (laps["LapStartTime"].dt.total_seconds() < 100.0).any()
+    for col in ("TrackTemp", "AirTemp", "WindSpeed"):
+        np.testing.assert_allclose(aligned[col], _reference(laps, weather, method, col), rtol=1e-10)
+
+
+@pytest.mark.parametrize("method", ["asof", "interpolate", "mean"])
+def test_unsorted_and_duplicated_weather_rows(rng, method):
+    laps, weather = _laps(rng), _weather(rng)
+    shuffled = pd.concat([weather, weather.iloc[::3]]).sample(frac=1.0, random_state=1)
+
+    expected = align_weather(laps, weather, method=method)
+    aligned = align_weather(laps, shuffled, method=method)
+    for col in ("TrackTemp", "AirTemp", "WindSpeed"):
+        np.testing.assert_allclose(aligned[col], expected[col], rtol=1e-10)
+        np.testing.assert_allclose(aligned[col], _reference(laps, shuffled, method, col), rtol=1e-10)
+
+
+@pytest.mark.parametrize("method", ["asof", "interpolate", "mean"])
+def test_laps_before_first_sample_take_first_value(rng, method):
+    laps, weather = _laps(rng, n=3), _weather(rng, start=1000.0)
+    aligned = align_weather(laps, weather, method=method)
+
+    first = weather["TrackTemp"].iloc[0]
+    np.testing.assert_allclose(aligned["TrackTemp"], first)
+
+
+def test_missing_start_times_and_values(rng):
+    laps, weather = _laps(rng), _weather(rng)
+    laps.loc[[2, 5], "LapStartTime"] = pd.NaT
+    laps.loc[5, "LapTime"] = pd.NaT
+    weather.loc[[4, 9], "AirTemp"] = np.nan
+
+    for method in ("asof", "interpolate", "mean"):
+        aligned = align_weather(laps, weather, method=method)
+        assert np.isnan(aligned["AirTemp"].iloc[5])
+        np.testing.assert_allclose(aligned["AirTemp"], _reference(laps, weather, method, "AirTemp"), rtol=1e-10)
+
+
+def test_unknown_method(rng):
+    with pytest.raises(ValueError):
+        align_weather(_laps(rng), _weather(rng), method="nearest")
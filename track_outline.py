@@ -0,0 +1,127 @@
+"""
+Modul contur circuit
+====================
+Cache pe disc pentru conturul simplificat al circuitelor, ca harta să nu mai
+încarce datele de poziție FastF1 la fiecare afișare. Conturul se simplifică
+cu Ramer–Douglas–Peucker la o toleranță configurabilă.
+"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+# Toleranța implicită RDP, în unitățile FastF1 (1/10 m)
+DEFAULT_TOLERANCE = 10.0
+
+
+def get_outline_dir() -> Path:
+    """
+    Returnează (sau creează) directorul cache-ului de contururi.
+    Implicit: <cache FastF1>/outlines, sau variabila de mediu F1_OUTLINE_CACHE.
+    """
+    env_dir = os.getenv("F1_OUTLINE_CACHE")
+    if env_dir:
+        outline_dir = Path(env_dir)
+    else:
+        from data_loader import get_cache_dir
+        outline_dir = Path(get_cache_dir()) / "outlines"
+
+    outline_dir.mkdir(parents=True, exist_ok=True)
+    return outline_dir
+
+
+def rdp_simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplifică o polilinie (k x 2) cu Ramer–Douglas–Peucker, păstrând
+    punctele aflate la mai mult de `tolerance` de coarda curentă.
+    Varianta iterativă, cu distanțele fiecărui segment calculate vectorizat.
+    """
+    n = len(points)
+    if n < 3:
+        return points.copy()
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+
+        chord = points[j] - points[i]
+        rel = points[i+1:j] - points[i]
+        chord_len = np.hypot(chord[0], chord[1])
+
+        if chord_len == 0:
+            # capete identice (circuit închis): distanța până la punct
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(chord[0] * rel[:, 1] - chord[1] * rel[:, 0]) / chord_len
+
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            split = i + 1 + k
+            keep[split] = True
+            stack.append((i, split))
+            stack.append((split, j))
+
+    return points[keep]
+
+
+def outline_key(session) -> str:
+    """
+    Cheia circuitului: locația (sau numele evenimentului) și anul, luate din
+    session.event, fără a încărca date de poziție.
+    """
+    event = session.event
+    name = None
+    for field in ("Location", "EventName"):
+        try:
+            name = event[field]
+        except Exception:
+            continue
+        if name:
+            break
+    year = getattr(event, "year", "")
+    return re.sub(r"[^a-z0-9]+", "_", f"{name or 'circuit'}_{year}".lower()).strip("_")
+
+
+def _outline_path(key: str, tolerance: float) -> Path:
+    return get_outline_dir() / f"{key}_tol{tolerance:g}.npy"
+
+
+def load_outline(key: str, tolerance: float = DEFAULT_TOLERANCE) -> Optional[np.ndarray]:
+    """Conturul din cache (k x 2, centrat) sau None."""
+    path = _outline_path(key, tolerance)
+    if not path.exists():
+        return None
+    return np.load(path)
+
+
+def save_outline(key: str, x: np.ndarray, y: np.ndarray,
+                 tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Centrează și simplifică pozițiile brute, apoi salvează conturul.
+    Returnează conturul simplificat.
+    """
+    points = np.column_stack([x - np.mean(x), y - np.mean(y)]).astype(float)
+    outline = rdp_simplify(points, tolerance)
+
+    path = _outline_path(key, tolerance)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".npy")
+    os.close(fd)
+    try:
+        np.save(tmp, outline)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    return outline
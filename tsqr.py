@@ -0,0 +1,179 @@
+"""
+Modul TSQR
+==========
+QR pentru matrice înalte și înguste (tall-skinny), pe bucăți de rânduri:
+fiecare bucată a lui [A | b] se reduce la un factor triunghiular
+(n+1) x (n+1), iar factorii se combină în arbore. Memoria depinde de mărimea
+bucății, nu de numărul total de tururi; bucățile pot fi procesate în paralel.
+"""
+
+import numpy as np
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from gram_schmidt import back_substitution
+from instrumentation import traced
+
+
+def _triangular_factor(M: np.ndarray) -> np.ndarray:
+    """Factorul R (pătrat, completat cu zerouri) al lui M."""
+    k = M.shape[1]
+    R = np.linalg.qr(M, mode="r")
+    if R.shape[0] < k:
+        R = np.vstack([R, np.zeros((k - R.shape[0], k))])
+    return R
+
+
+def _chunk_factor(chunk: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """Factorul triunghiular al bucății [A_i | b_i] (rulează și în alt proces)."""
+    A, b = chunk
+    return _triangular_factor(np.column_stack([A, b]).astype(float))
+
+
+def combine_factors(R_top: np.ndarray, R_bottom: np.ndarray) -> np.ndarray:
+    """Nodul arborelui: factorul lui [R_top; R_bottom]."""
+    return _triangular_factor(np.vstack([R_top, R_bottom]))
+
+
+class _TreeReducer:
+    """
+    Reducere în arbore binar pe măsură ce sosesc factorii bucăților:
+    la fiecare nivel se ține cel mult un factor (ca un numărător binar),
+    deci memoria este O(log k · n^2) pentru k bucăți.
+    """
+
+    def __init__(self):
+        self.levels: List[Optional[np.ndarray]] = []
+
+    def push(self, R: np.ndarray) -> None:
+        level = 0
+        while level < len(self.levels) and self.levels[level] is not None:
+            R = combine_factors(self.levels[level], R)
+            self.levels[level] = None
+            level += 1
+        if level == len(self.levels):
+            self.levels.append(R)
+        else:
+            self.levels[level] = R
+
+    def result(self) -> Optional[np.ndarray]:
+        R = None
+        for R_level in self.levels:
+            if R_level is None:
+                continue
+            R = R_level if R is None else combine_factors(R_level, R)
+        return R
+
+
+def iter_row_chunks(
+    A: np.ndarray,
+    b: np.ndarray,
+    chunk_size: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Împarte (A, b) în bucăți de chunk_size rânduri (fără copii)."""
+    for start in range(0, A.shape[0], chunk_size):
+        yield A[start:start + chunk_size], b[start:start + chunk_size]
+
+
+def tsqr_factor(
+    chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+    n_jobs: int = 1
+) -> np.ndarray:
+    """
+    Factorul triunghiular al lui [A | b] din bucăți (A_i, b_i).
+    Cu n_jobs > 1 bucățile se factorizează într-un pool de procese, cu cel
+    mult 2 * n_jobs bucăți în așteptare (ca un generator să nu fie citit
+    integral în memorie).
+    """
+    reducer = _TreeReducer()
+
+    if n_jobs <= 1:
+        for chunk in chunks:
+            reducer.push(_chunk_factor(chunk))
+    else:
+        # multiprocessing se importă doar când e nevoie de pool
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            pending = []
+            for chunk in chunks:
+                pending.append(executor.submit(_chunk_factor, chunk))
+                if len(pending) >= 2 * n_jobs:
+                    reducer.push(pending.pop(0).result())
+            for future in pending:
+                reducer.push(future.result())
+
+    R = reducer.result()
+    if R is None:
+        raise ValueError("Nu există rânduri de factorizat.")
+    return R
+
+
+@traced()
+def ls_tsqr(
+    chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+    n_jobs: int = 1
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """
+    Rezolvă min ||Ax - b|| cu TSQR, A și b fiind date pe bucăți.
+    Returnează x, R (n x n, diagonală pozitivă, ca la Gram–Schmidt),
+    d = Q^T b (n) și norma reziduală.
+    """
+    Rt = tsqr_factor(chunks, n_jobs)
+    n = Rt.shape[0] - 1
+
+    # Semne normalizate: R este unic cu diagonala pozitivă
+    signs = np.where(np.diag(Rt) < 0, -1.0, 1.0)
+    Rt = Rt * signs[:, None]
+
+    R = Rt[:n, :n]
+    d = Rt[:n, n]
+    residual_norm = float(abs(Rt[n, n]))
+
+    x = back_substitution(R, d)
+    return x, R, d, residual_norm
+
+
+def iter_session_chunks(
+    sessions: Sequence[Tuple[int, str, str]],
+    selected_features: List[str],
+    weather_method: Optional[str] = "asof"
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Câte o bucată (A, b) pentru fiecare sesiune (an, eveniment, tip) din
+    depozitul columnar; o singură sesiune e în memorie odată.
+    """
+    import lap_store
+    from features import add_lap_context, build_feature_matrix
+    from weather import align_weather
+
+    expected_names = None
+
+    for year, event_name, session_type in sessions:
+        stored = lap_store.read_session(year, event_name, session_type)
+        if stored is None:
+            continue
+
+        laps = stored.laps
+        if weather_method is not None and stored.weather_data is not None:
+            laps = align_weather(laps, stored.weather_data, weather_method)
+        laps = add_lap_context(laps)
+
+        valid = laps['LapTime'].notna()
+        if 'IsAccurate' in laps.columns:
+            valid &= laps['IsAccurate'] == True
+        laps = laps[valid]
+        if laps.empty:
+            continue
+
+        A, b, names = build_feature_matrix(laps, None, selected_features)
+        if A is None:
+            continue
+        # toate bucățile trebuie să aibă aceleași coloane
+        if expected_names is None:
+            expected_names = names
+        elif names != expected_names:
+            raise ValueError(
+                f"Feature columns differ for {year} {event_name} {session_type}: "
+                f"{names} vs {expected_names}"
+            )
+        yield A, b
@@ -0,0 +1,110 @@
+"""
+Modul de aliniere vreme-tururi
+==============================
+Atașează fiecărui tur valorile meteo (TrackTemp, AirTemp, WindSpeed) din
+session.weather_data, printr-o singură căutare sortată (as-of join) pentru
+toate tururile și toți piloții deodată.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+
+# Coloanele meteo folosite ca feature-uri
+WEATHER_COLUMNS = ["TrackTemp", "AirTemp", "WindSpeed"]
+
+# Metode de aliniere suportate
+ALIGN_METHODS = ["asof", "interpolate", "mean"]
+
+
+def _to_seconds(values) -> np.ndarray:
+    """Timedelta / numeric -> secunde float (NaT -> NaN)."""
+    series = pd.Series(values)
+    if pd.api.types.is_timedelta64_dtype(series):
+        return series.dt.total_seconds().to_numpy(dtype=float, copy=True)
+    return series.to_numpy(dtype=float, copy=True)
+
+
+def _cumulative_integral(t: np.ndarray, v: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """
+    Integrala de la t[0] la `at` a semnalului liniar pe porțiuni (t, v),
+    prelungit constant în afara intervalului eșantionat.
+    """
+    seg = np.concatenate([[0.0], np.cumsum(np.diff(t) * (v[1:] + v[:-1]) / 2)])
+
+    at_clip = np.clip(at, t[0], t[-1])
+    k = np.clip(np.searchsorted(t, at_clip, side="right") - 1, 0, len(t) - 1)
+    v_at = np.interp(at_clip, t, v)
+    inside = seg[k] + (at_clip - t[k]) * (v[k] + v_at) / 2
+
+    # porțiunile din afara eșantioanelor au valoarea de la capăt
+    return inside + np.minimum(at - t[0], 0) * v[0] + np.maximum(at - t[-1], 0) * v[-1]
+
+
+def align_weather(
+    laps: pd.DataFrame,
+    weather: pd.DataFrame,
+    method: str = "asof",
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Returnează laps cu coloanele meteo aliniate pe fiecare tur:
+    - asof: ultimul eșantion de la începutul turului (LapStartTime);
+    - interpolate: interpolare liniară la mijlocul turului;
+    - mean: media semnalului interpolat pe durata turului.
+    """
+    if method not in ALIGN_METHODS:
+        raise ValueError(f"Unknown weather alignment method: {method}")
+    if columns is None:
+        columns = WEATHER_COLUMNS
+    columns = [c for c in columns if c in weather.columns]
+
+    if weather.empty or len(columns) == 0:
+        return laps
+
+    # Eșantioanele meteo sortate o singură dată
+    weather = weather.sort_values("Time")
+    t = _to_seconds(weather["Time"])
+
+    lap_end = _to_seconds(laps["Time"])
+    lap_start = _to_seconds(laps["LapStartTime"]) if "LapStartTime" in laps.columns \
+        else np.full(len(laps), np.nan)
+    if "LapTime" in laps.columns:
+        # LapStartTime lipsă -> Time - LapTime
+        missing = np.isnan(lap_start)
+        lap_start[missing] = lap_end[missing] - _to_seconds(laps["LapTime"])[missing]
+    valid = ~np.isnan(lap_start)
+
+    aligned = {}
+    for col in columns:
+        v_mask = weather[col].notna().to_numpy()
+        tv = t[v_mask]
+        v = weather[col].to_numpy(dtype=float)[v_mask]
+        out = np.full(len(laps), np.nan)
+
+        if len(tv) == 0:
+            aligned[col] = out
+            continue
+
+        if method == "asof":
+            idx = np.searchsorted(tv, lap_start[valid], side="right") - 1
+            # turul de dinainte de primul eșantion primește primul eșantion
+            out[valid] = v[np.clip(idx, 0, len(tv) - 1)]
+
+        elif method == "interpolate":
+            mid = (lap_start[valid] + lap_end[valid]) / 2
+            out[valid] = np.interp(mid, tv, v)
+
+        else:
+            start = lap_start[valid]
+            end = lap_end[valid]
+            duration = end - start
+            integral = _cumulative_integral(tv, v, end) - _cumulative_integral(tv, v, start)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = np.where(duration > 0, integral / duration, np.interp(start, tv, v))
+            out[valid] = mean
+
+        aligned[col] = out
+
+    return laps.assign(**aligned)